@@ -1,7 +1,11 @@
 from dataclasses import dataclass
-from vi import Agent, Config, Simulation
+from vi import Agent, Config
 from pygame.math import Vector2
 import random
+from flock_engine import BatchedFlockingSimulation, EngineAgent
+from obstacle_field import bake_obstacle_field
+from spatial import use_spatial_hash
+from headless import HeadlessCapableSimulation
 
 @dataclass
 class FlockingConfig(Config):
@@ -9,6 +13,7 @@ class FlockingConfig(Config):
     alignment_weight: float = 1
     cohesion_weight: float = 1.5
     separation_weight: float = 2 # higher to stop clustering
+    headless: bool = False  # Run without a window or frame pacing (batch runs)
     obstacle_weight: float = 5
 
 # class FlockingAgent(Agent[FlockingConfig]): this line stops me running it
@@ -28,19 +33,13 @@ class FlockingAgent(Agent):
         v_align = Vector2()
         v_cohesion = Vector2()
         v_sep = Vector2()
-        v_obstacle = Vector2()
 
         # get neighbours nearby
         neighbours = list(self.in_proximity_accuracy())
         num_neighbours = len(neighbours)
 
-        # obstacle avoidance
-        obstacle_intersections = list(self.obstacle_intersections())
-        if obstacle_intersections:
-            for intersection in obstacle_intersections:
-                avoid_direction = self.pos - intersection
-                if avoid_direction.length_squared() > 0:
-                    v_obstacle += avoid_direction.normalize()
+        # obstacle avoidance, looked up from the field baked before the run
+        v_obstacle = self.shared.obstacle_field.avoidance_at(self.pos)
 
         # if there are no neighbours, move straight at current velocity
         if num_neighbours == 0:
@@ -91,8 +90,25 @@ class FlockingAgent(Agent):
                 self.move = self.config.movement_speed * aim.normalize()
         self.pos += self.move
 
+# Choose which flocking engine to use
+engine = "agent"  # Change to "numpy" to move all boids in one batched step (for thousands of boids)
+
 def create_simulation_base():
-    return Simulation(
+    if engine == "numpy":
+        return BatchedFlockingSimulation(
+            FlockingConfig(
+                image_rotation=True,
+                movement_speed=1.75,
+                radius=50,
+                alignment_weight=1,
+                cohesion_weight=1,
+                separation_weight=2,
+                obstacle_weight=5),
+            wrap=False,
+            separation_softening=1,
+        ).batch_spawn_agents(100, EngineAgent, images=["images/triangle.png"])
+
+    return use_spatial_hash(HeadlessCapableSimulation(
         FlockingConfig(
             image_rotation=True,
             movement_speed=1.75,
@@ -101,7 +117,7 @@ def create_simulation_base():
             cohesion_weight=1,
             separation_weight=2,
             obstacle_weight=5)
-    ).batch_spawn_agents(100, FlockingAgent, images=["images/triangle.png"])
+    )).batch_spawn_agents(100, FlockingAgent, images=["images/triangle.png"])
 
 def u_shape():
     sim = create_simulation_base()
@@ -152,10 +168,13 @@ def square():
 choice = "square"  # Change to "x", "line", or "square"
 
 if choice == "u":
-    u_shape().run()
+    sim = u_shape()
 elif choice == "x":
-    x_shape().run()
+    sim = x_shape()
 elif choice == "line":
-    vertical_line().run()
+    sim = vertical_line()
 elif choice == "square":
-    square().run()
\ No newline at end of file
+    sim = square()
+
+# obstacles never move, so bake their avoidance field once before running
+bake_obstacle_field(sim).run()
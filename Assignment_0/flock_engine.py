@@ -0,0 +1,340 @@
+from vi import Agent
+import numpy as np
+from headless import HeadlessCapableSimulation
+
+# boids closer than this push each other away (same cutoff as FlockingAgent)
+SEPARATION_DISTANCE = 25
+
+# upper bound on candidate pairs held in memory at once during a step
+MAX_PAIRS_PER_BATCH = 2_000_000
+
+
+def normalize_rows(vectors):
+    """
+    normalizes every non-zero row of an (N, 2) array, zero rows stay zero
+    """
+    lengths = np.hypot(vectors[:, 0], vectors[:, 1])
+    out = np.zeros_like(vectors)
+    nonzero = lengths > 0
+    out[nonzero] = vectors[nonzero] / lengths[nonzero, None]
+    return out
+
+
+class FlockEngine:
+    """
+    struct-of-arrays flocking engine
+    positions and velocities of all boids live in two (N, 2) float arrays and
+    alignment, cohesion and separation are computed for the whole flock at once
+
+    with a skin (config.neighbour_skin) the neighbour search uses a Verlet list:
+    every pair closer than radius + skin is stored once, and each step only the
+    stored pairs are measured, each distance serving both boids of the pair.
+    the list is rebuilt once some boid has moved more than skin / 2 since it was
+    built, before any pair outside it could have come within radius
+    """
+
+    def __init__(self, config, wrap=True, separation_softening=0.0, skin=None):
+        self.config = config
+        self.width, self.height = config.window.as_tuple()
+        # flocking.py wraps boids around the window, experiment.py does not
+        self.wrap = wrap
+        # added to dist^2 in the separation term (experiment.py uses 1)
+        self.separation_softening = separation_softening
+        self.obstacle_weight = getattr(config, "obstacle_weight", 0)
+        # 0 searches the grid for neighbours every step
+        self.skin = getattr(config, "neighbour_skin", 0) if skin is None else skin
+        self.pos = np.zeros((0, 2))
+        self.vel = np.zeros((0, 2))
+        # Verlet list: (i, j) arrays with i < j, and the positions it was built from
+        self._pairs = None
+        self._pairs_pos = None
+        self.rebuilds = 0
+
+    @property
+    def count(self):
+        return len(self.pos)
+
+    def load(self, positions, velocities):
+        """
+        replaces the flock with the given positions and velocities
+        """
+        self.pos = np.array(positions, dtype=float).reshape(-1, 2)
+        self.vel = np.array(velocities, dtype=float).reshape(-1, 2)
+        self._pairs = None
+
+    def spawn(self, count, rng=None):
+        """
+        adds boids at random positions moving in random directions at movement_speed
+        """
+        rng = rng or np.random.default_rng(self.config.seed)
+        positions = rng.uniform((0, 0), (self.width, self.height), size=(count, 2))
+        angles = rng.uniform(0, 2 * np.pi, size=count)
+        velocities = self.config.movement_speed * np.column_stack((np.cos(angles), np.sin(angles)))
+        self.load(np.vstack((self.pos, positions)), np.vstack((self.vel, velocities)))
+        return self
+
+    def wrap_positions(self):
+        """
+        vectorized there_is_no_escape: boids leaving one side re-enter on the other
+        """
+        x, y = self.pos[:, 0], self.pos[:, 1]
+        x[x < 0] = self.width
+        x[x > self.width] = 0
+        y[y < 0] = self.height
+        y[y > self.height] = 0
+
+    def neighbour_pairs(self):
+        """
+        yields batches of (i, j, dx, dy) for every ordered pair of boids closer than
+        config.radius, where (dx, dy) = pos[i] - pos[j]
+        """
+        if self.count < 2 or self.config.radius <= 0:
+            return
+        if self.skin > 0:
+            yield from self._verlet_pairs()
+        else:
+            yield from self._grid_pairs(self.config.radius)
+
+    def _verlet_pairs(self):
+        radius = self.config.radius
+        cutoff = radius + self.skin
+        if self._pairs is None:
+            self._build_pairs(cutoff)
+        else:
+            moved = self.pos - self._pairs_pos
+            wrapped = np.empty(0, dtype=np.int64)
+            if self.wrap:
+                # a boid that wrapped around jumped a window size, its own movement is the rest
+                size = np.array((self.width, self.height), dtype=float)
+                laps = np.round(moved / size)
+                moved -= laps * size
+                wrapped = np.flatnonzero(laps.any(axis=1))
+            if (moved * moved).sum(axis=1).max() > (self.skin / 2) ** 2:
+                self._build_pairs(cutoff)
+            elif len(wrapped):
+                self._refresh_pairs(wrapped, cutoff)
+
+        pairs_i, pairs_j = self._pairs
+        xs, ys = self.pos[:, 0], self.pos[:, 1]
+        batch = MAX_PAIRS_PER_BATCH // 2
+        for start in range(0, len(pairs_i), batch):
+            i = pairs_i[start:start + batch]
+            j = pairs_j[start:start + batch]
+            dx = xs[i] - xs[j]
+            dy = ys[i] - ys[j]
+            close = np.flatnonzero(dx * dx + dy * dy <= radius * radius)
+            i, j, dx, dy = i[close], j[close], dx[close], dy[close]
+            # each pair was measured once, both boids get it
+            yield (np.concatenate((i, j)), np.concatenate((j, i)),
+                   np.concatenate((dx, -dx)), np.concatenate((dy, -dy)))
+
+    def _refresh_pairs(self, boids, cutoff):
+        """
+        replaces the pairs of the given boids (which wrapped around and have different
+        neighbours now) with pairs measured from their current positions
+        """
+        n = self.count
+        if len(boids) * n > MAX_PAIRS_PER_BATCH:
+            self._build_pairs(cutoff)
+            return
+        pairs_i, pairs_j = self._pairs
+        keep = ~(np.isin(pairs_i, boids) | np.isin(pairs_j, boids))
+
+        i = np.repeat(boids, n)
+        j = np.tile(np.arange(n), len(boids))
+        dx = self.pos[i, 0] - self.pos[j, 0]
+        dy = self.pos[i, 1] - self.pos[j, 1]
+        # a pair of two refreshed boids turns up twice, keep it once
+        refreshed = np.zeros(n, dtype=bool)
+        refreshed[boids] = True
+        close = (dx * dx + dy * dy <= cutoff * cutoff) & (i != j) & ~(refreshed[j] & (j < i))
+        i, j = i[close], j[close]
+
+        self._pairs = (np.concatenate((pairs_i[keep], np.minimum(i, j))),
+                       np.concatenate((pairs_j[keep], np.maximum(i, j))))
+        self._pairs_pos[boids] = self.pos[boids]
+
+    def _build_pairs(self, cutoff):
+        pairs_i, pairs_j = [np.empty(0, dtype=np.int64)], [np.empty(0, dtype=np.int64)]
+        for i, j, _, _ in self._grid_pairs(cutoff):
+            once = i < j
+            pairs_i.append(i[once])
+            pairs_j.append(j[once])
+        self._pairs = (np.concatenate(pairs_i), np.concatenate(pairs_j))
+        self._pairs_pos = self.pos.copy()
+        self.rebuilds += 1
+
+    def _grid_pairs(self, radius):
+        """
+        neighbour_pairs for pairs closer than radius, searched from scratch
+        boids are binned into a grid with cell size radius so only the 3x3 block
+        of cells around a boid has to be checked
+        """
+        n = self.count
+
+        origin = self.pos.min(axis=0)
+        cells_xy = ((self.pos - origin) // radius).astype(np.int64)
+        grid_w = int(cells_xy[:, 0].max()) + 1
+        grid_h = int(cells_xy[:, 1].max()) + 1
+        cell = cells_xy[:, 1] * grid_w + cells_xy[:, 0]
+
+        # work on boids sorted by cell so every cell is one contiguous slice
+        order = np.argsort(cell, kind="stable")
+        cells_xy = cells_xy[order]
+        xs = np.ascontiguousarray(self.pos[order, 0])
+        ys = np.ascontiguousarray(self.pos[order, 1])
+        cell_count = np.bincount(cell, minlength=grid_w * grid_h)
+        cell_start = np.cumsum(cell_count) - cell_count
+
+        # candidate cell of every boid for each of the 9 surrounding offsets
+        boids = np.arange(n)
+        candidates_i = []
+        candidates_cell = []
+        for dy in (-1, 0, 1):
+            for dx in (-1, 0, 1):
+                nx = cells_xy[:, 0] + dx
+                ny = cells_xy[:, 1] + dy
+                valid = (nx >= 0) & (nx < grid_w) & (ny >= 0) & (ny < grid_h)
+                candidates_i.append(boids[valid])
+                candidates_cell.append(ny[valid] * grid_w + nx[valid])
+        candidates_i = np.concatenate(candidates_i)
+        candidates_cell = np.concatenate(candidates_cell)
+
+        counts = cell_count[candidates_cell]
+        keep = counts > 0
+        candidates_i, candidates_cell, counts = candidates_i[keep], candidates_cell[keep], counts[keep]
+
+        # expand (boid, cell) candidates into (boid, boid) pairs in bounded batches
+        ends = np.cumsum(counts)
+        batch_start = 0
+        while batch_start < len(counts):
+            done = ends[batch_start - 1] if batch_start else 0
+            batch_end = int(np.searchsorted(ends, done + MAX_PAIRS_PER_BATCH, side="right"))
+            batch_end = max(batch_end, batch_start + 1)
+
+            batch_counts = counts[batch_start:batch_end]
+            i = np.repeat(candidates_i[batch_start:batch_end], batch_counts)
+            shift = cell_start[candidates_cell[batch_start:batch_end]] - (np.cumsum(batch_counts) - batch_counts)
+            j = np.arange(len(i)) + np.repeat(shift, batch_counts)
+
+            dx = xs[i] - xs[j]
+            dy = ys[i] - ys[j]
+            close = np.flatnonzero((dx * dx + dy * dy <= radius * radius) & (i != j))
+            yield order[i[close]], order[j[close]], dx[close], dy[close]
+
+            batch_start = batch_end
+
+    def step(self, avoidance=None):
+        """
+        advances every boid by one tick
+        avoidance is an optional (N, 2) array with each boid's summed obstacle
+        avoidance directions, weighted by config.obstacle_weight
+        """
+        n = self.count
+        if n == 0:
+            return
+        config = self.config
+        if self.wrap:
+            self.wrap_positions()
+
+        num_neighbours = np.zeros(n)
+        v_align = np.zeros((n, 2))
+        v_cohesion = np.zeros((n, 2))
+        v_sep = np.zeros((n, 2))
+        for i, j, dx, dy in self.neighbour_pairs():
+            num_neighbours += np.bincount(i, minlength=n)
+            for axis in (0, 1):
+                v_align[:, axis] += np.bincount(i, weights=self.vel[j, axis], minlength=n)
+                v_cohesion[:, axis] += np.bincount(i, weights=self.pos[j, axis], minlength=n)
+
+            # for seperation, inverse square repulsion from boids that are too close
+            dist_sq = dx * dx + dy * dy
+            close = (dist_sq < SEPARATION_DISTANCE ** 2) & (dist_sq > 0)
+            dist_sq = dist_sq[close]
+            scale = 1 / (np.sqrt(dist_sq) * (dist_sq + self.separation_softening))
+            v_sep[:, 0] += np.bincount(i[close], weights=dx[close] * scale, minlength=n)
+            v_sep[:, 1] += np.bincount(i[close], weights=dy[close] * scale, minlength=n)
+
+        v_obstacle = normalize_rows(avoidance) if avoidance is not None else np.zeros((n, 2))
+
+        has_neighbours = num_neighbours > 0
+        alone = ~has_neighbours
+
+        # if there are no neighbours, move straight at current velocity (plus obstacle avoidance)
+        self.vel[alone] += v_obstacle[alone] * self.obstacle_weight
+        speed = np.hypot(self.vel[:, 0], self.vel[:, 1])
+        too_fast = alone & (speed > config.movement_speed)
+        self.vel[too_fast] *= (config.movement_speed / speed[too_fast])[:, None]
+
+        # otherwise steer towards the weighted sum of the three rules
+        counts = num_neighbours[has_neighbours, None]
+        aim = (
+            normalize_rows(v_align[has_neighbours] / counts) * config.alignment_weight
+            + normalize_rows(v_cohesion[has_neighbours] / counts - self.pos[has_neighbours]) * config.cohesion_weight
+            + normalize_rows(v_sep[has_neighbours]) * config.separation_weight
+            + v_obstacle[has_neighbours] * self.obstacle_weight
+        )
+        steering = np.flatnonzero(has_neighbours)
+        aim_length = np.hypot(aim[:, 0], aim[:, 1])
+        moving = aim_length > 0
+        self.vel[steering[moving]] = config.movement_speed * aim[moving] / aim_length[moving, None]
+
+        self.pos += self.vel
+
+
+class EngineAgent(Agent):
+    """
+    boid whose position is driven by a FlockEngine instead of its own change_position
+    """
+
+    def change_position(self):
+        # BatchedFlockingSimulation has already moved this boid
+        pass
+
+
+class BatchedFlockingSimulation(HeadlessCapableSimulation):
+    """
+    simulation that moves all EngineAgent boids with one FlockEngine step per tick
+    and copies the results back onto the sprites for drawing (or, with config.headless,
+    just for the proximity and obstacle checks)
+    """
+
+    def __init__(self, config, wrap=True, separation_softening=0.0):
+        super().__init__(config)
+        self.engine = FlockEngine(config, wrap=wrap, separation_softening=separation_softening)
+        self._boids = []
+
+    def _sync_boids(self):
+        # only reload the engine when boids were spawned or removed
+        boids = self._agents.sprites()
+        if len(boids) != len(self._boids):
+            self._boids = boids
+            self.engine.load([b.pos for b in boids], [b.move for b in boids])
+
+    def obstacle_avoidance(self):
+        """
+        summed directions away from the obstacles each boid overlaps
+        uses the baked ObstacleField when there is one (see obstacle_field.py)
+        """
+        field = getattr(self.shared, "obstacle_field", None)
+        if field is not None:
+            return field.avoidance(self.engine.pos)
+
+        avoidance = np.zeros((len(self._boids), 2))
+        for index, boid in enumerate(self._boids):
+            for intersection in boid.obstacle_intersections():
+                away = boid.pos - intersection
+                if away.length_squared() > 0:
+                    avoidance[index] += away.normalize()
+        return avoidance
+
+    def before_update(self):
+        super().before_update()
+        self._sync_boids()
+
+        avoidance = self.obstacle_avoidance() if self._obstacles else None
+        self.engine.step(avoidance)
+
+        for boid, pos, vel in zip(self._boids, self.engine.pos.tolist(), self.engine.vel.tolist()):
+            boid.pos.update(pos)
+            boid.move.update(vel)
@@ -1,7 +1,10 @@
 from dataclasses import dataclass
-from vi import Agent, Config, Simulation
+from vi import Agent, Config
 from pygame.math import Vector2
 import random
+from flock_engine import BatchedFlockingSimulation, EngineAgent
+from spatial import use_spatial_hash
+from headless import HeadlessCapableSimulation
 
 @dataclass
 class FlockingConfig(Config):
@@ -9,6 +12,8 @@ class FlockingConfig(Config):
     alignment_weight: float = 1
     cohesion_weight: float = 1.5
     separation_weight: float = 2 # higher to stop clustering
+    headless: bool = False  # Run without a window or frame pacing (batch runs)
+    neighbour_skin: float = 20  # numpy engine: Verlet list margin over radius (0 searches neighbours every step)
 
 
 
@@ -122,8 +127,16 @@ class FlockingAgent(Agent):
         self.pos += self.move  # Xboid = Xboid + Vboid · Δt  (Δt = 1)  :contentReference[oaicite:4]{index=4}
 
 '''
+# Choose which flocking engine to use
+engine = "agent"  # Change to "numpy" to move all boids in one batched step (for thousands of boids)
+
+if engine == "numpy":
+    simulation_class, agent_class = BatchedFlockingSimulation, EngineAgent
+else:
+    simulation_class, agent_class = HeadlessCapableSimulation, FlockingAgent
+
 (
-    Simulation(
+    use_spatial_hash(simulation_class(
         # TODO: Modify `movement_speed` and `radius` and observe the change in behaviour.
         FlockingConfig(
             image_rotation=True,
@@ -132,7 +145,7 @@ class FlockingAgent(Agent):
             alignment_weight=1,
             cohesion_weight=1,
             separation_weight=2)
-    )
-    .batch_spawn_agents(100, FlockingAgent, images=["images/triangle.png"])
+    ))
+    .batch_spawn_agents(100, agent_class, images=["images/triangle.png"])
     .run()
 )
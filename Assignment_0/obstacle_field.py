@@ -0,0 +1,88 @@
+from pygame.math import Vector2
+import pygame as pg
+import numpy as np
+
+
+class ObstacleField:
+    """
+    obstacles baked once into a raster over the window
+    direction[y, x] is the sum of unit vectors pointing away from every obstacle pixel within reach,
+    so a boid gets its avoidance vector with one array lookup no matter how many obstacles there are
+    """
+
+    def __init__(self, obstacles, size, reach):
+        width, height = size
+        self.width, self.height = width, height
+        self.reach = reach
+
+        solid = np.zeros((height, width), dtype=bool)
+        for obstacle in obstacles:
+            # alpha > 127 is the same test pygame uses to build sprite masks
+            pixels = pg.surfarray.array_alpha(obstacle.image).T > 127
+            left, top = obstacle.rect.topleft
+            x0, y0 = max(left, 0), max(top, 0)
+            x1, y1 = min(left + pixels.shape[1], width), min(top + pixels.shape[0], height)
+            if x0 < x1 and y0 < y1:
+                solid[y0:y1, x0:x1] |= pixels[y0 - top:y1 - top, x0 - left:x1 - left]
+
+        self.direction = np.zeros((height, width, 2), dtype=np.float32)
+        if not solid.any():
+            return
+
+        # only the obstacles' bounding box grown by reach can be affected
+        rows, cols = np.flatnonzero(solid.any(axis=1)), np.flatnonzero(solid.any(axis=0))
+        y0, y1 = max(rows[0] - reach, 0), min(rows[-1] + reach + 1, height)
+        x0, x1 = max(cols[0] - reach, 0), min(cols[-1] + reach + 1, width)
+        padded = np.pad(solid, reach).astype(np.float32)
+        away_x = np.zeros((y1 - y0, x1 - x0), dtype=np.float32)
+        away_y = np.zeros_like(away_x)
+
+        # every cell looks back at the obstacle pixels within reach: shift the solid grid
+        # by each offset inside the reach circle, nearest offsets first
+        offsets = [(ox, oy) for oy in range(-reach, reach + 1) for ox in range(-reach, reach + 1)
+                   if 0 < ox * ox + oy * oy <= reach * reach]
+        offsets.sort(key=lambda o: o[0] * o[0] + o[1] * o[1])
+        for ox, oy in offsets:
+            length = np.hypot(ox, oy)
+            # a solid pixel at (x - ox, y - oy) lies `length` away in the direction -offset
+            hit = padded[y0 + reach - oy:y1 + reach - oy, x0 + reach - ox:x1 + reach - ox]
+            away_x += hit * (ox / length)
+            away_y += hit * (oy / length)
+        self.direction[y0:y1, x0:x1, 0] = away_x
+        self.direction[y0:y1, x0:x1, 1] = away_y
+
+    def avoidance(self, positions):
+        """
+        avoidance vectors for an (N, 2) array of positions, zero outside the window
+        """
+        x = np.floor(positions[:, 0]).astype(np.int64)
+        y = np.floor(positions[:, 1]).astype(np.int64)
+        inside = (x >= 0) & (x < self.width) & (y >= 0) & (y < self.height)
+        out = np.zeros((len(positions), 2))
+        out[inside] = self.direction[y[inside], x[inside]]
+        return out
+
+    def avoidance_at(self, pos):
+        """
+        avoidance vector for a single position as a Vector2
+        """
+        x, y = int(pos.x // 1), int(pos.y // 1)
+        if 0 <= x < self.width and 0 <= y < self.height:
+            return Vector2(*self.direction[y, x].tolist())
+        return Vector2()
+
+
+def bake_obstacle_field(simulation, reach=None):
+    """
+    builds the ObstacleField for all spawned obstacles and shares it with the agents
+    reach defaults to half the diagonal of the agents' sprite, which is about where
+    their masks start overlapping an obstacle
+    """
+    if reach is None:
+        agent = next(iter(simulation._agents), None)
+        width, height = agent.image.get_size() if agent else (0, 0)
+        reach = max(1, int(np.ceil(np.hypot(width, height) / 2)))
+
+    simulation.shared.obstacle_field = ObstacleField(
+        simulation._obstacles.sprites(), simulation.config.window.as_tuple(), reach)
+    return simulation
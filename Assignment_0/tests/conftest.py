@@ -0,0 +1,47 @@
+import os
+import sys
+from types import SimpleNamespace
+import pytest
+
+# pygame may not have a display here
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+ASSIGNMENT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def use_this_assignment():
+    """
+    Put this assignment's modules first, they import each other by plain name
+
+    Assignment_0 and Assignment_2 both have a headless.py and a spatial.py, so when the
+    whole repository is tested in one run the other assignment's copies are forgotten.
+    """
+    if ASSIGNMENT in sys.path:
+        sys.path.remove(ASSIGNMENT)
+    sys.path.insert(0, ASSIGNMENT)
+    for name in ("headless", "spatial"):
+        module = sys.modules.get(name)
+        if module is not None and os.path.dirname(module.__file__) != ASSIGNMENT:
+            del sys.modules[name]
+
+
+use_this_assignment()
+
+
+@pytest.fixture
+def flocking_script():
+    """
+    Loads the config and agent classes of flocking.py or experiment.py. The scripts start
+    their simulation at the bottom, so only the part before the engine choice is run.
+    """
+
+    def load(name):
+        use_this_assignment()
+        path = os.path.join(ASSIGNMENT, name)
+        with open(path) as f:
+            source = f.read()
+        namespace = {"__name__": name.removesuffix(".py")}
+        exec(compile(source[:source.index("# Choose which flocking engine to use")], path, "exec"), namespace)
+        return SimpleNamespace(**namespace)
+
+    return load
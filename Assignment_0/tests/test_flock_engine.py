@@ -0,0 +1,138 @@
+from types import SimpleNamespace
+import numpy as np
+import pygame as pg
+import pytest
+from pygame.math import Vector2
+from vi import Agent
+from vi.config import Window
+from flock_engine import FlockEngine
+
+
+class Boid:
+    """What FlockingAgent.change_position uses of an agent, with its neighbours given up front"""
+
+    there_is_no_escape = Agent.there_is_no_escape
+
+    def __init__(self, config, pos, move):
+        self.config = config
+        self.pos = Vector2(*pos)
+        self.move = Vector2(*move)
+        self._area = pg.Rect(0, 0, *config.window.as_tuple())
+        self.shared = SimpleNamespace(obstacle_field=SimpleNamespace(avoidance_at=lambda pos: Vector2()))
+        self.neighbours = []
+
+    def in_proximity_accuracy(self):
+        return iter(self.neighbours)
+
+
+def flock(config, seed=0):
+    """A dense flock in the middle of the window and a few far-off boids, some faster than movement_speed"""
+    rng = np.random.default_rng(seed)
+    positions = np.vstack((rng.uniform(200, 400, size=(150, 2)), [(40, 40), (700, 60), (60, 700)]))
+    angles = rng.uniform(0, 2 * np.pi, size=len(positions))
+    speeds = config.movement_speed * rng.choice([0.5, 1, 2], size=len(positions))
+    velocities = speeds[:, None] * np.column_stack((np.cos(angles), np.sin(angles)))
+    return positions, velocities
+
+
+def agent_step(module, config, positions, velocities):
+    """One FlockingAgent.change_position per boid, every boid seeing the flock as it was at the start"""
+    before = [Boid(config, p, v) for p, v in zip(positions.tolist(), velocities.tolist())]
+    after = []
+    for boid in before:
+        moving = Boid(config, boid.pos, boid.move)
+        moving.neighbours = [(other, boid.pos.distance_to(other.pos)) for other in before
+                             if other is not boid and boid.pos.distance_to(other.pos) <= config.radius]
+        module.FlockingAgent.change_position(moving)
+        after.append(moving)
+    return np.array([b.pos for b in after]), np.array([b.move for b in after])
+
+
+@pytest.mark.parametrize("script, softening", [("flocking.py", 0), ("experiment.py", 1)])
+def test_step_matches_flocking_agent(flocking_script, script, softening):
+    module = flocking_script(script)
+    config = module.FlockingConfig(movement_speed=1.75, radius=50, alignment_weight=1,
+                                   cohesion_weight=1, separation_weight=2)
+    positions, velocities = flock(config)
+    expected_pos, expected_vel = agent_step(module, config, positions, velocities)
+
+    engine = FlockEngine(config, wrap=True, separation_softening=softening, skin=0)
+    engine.load(positions, velocities)
+    engine.step()
+    assert engine.vel == pytest.approx(expected_vel, rel=1e-9, abs=1e-9)
+    assert engine.pos == pytest.approx(expected_pos, rel=1e-9, abs=1e-9)
+
+
+def test_wrap_matches_there_is_no_escape(flocking_script):
+    config = flocking_script("flocking.py").FlockingConfig()
+    positions = np.array([(-1, 10), (751, 10), (10, -0.5), (10, 760), (-3, 800), (375, 375)], dtype=float)
+    engine = FlockEngine(config)
+    engine.load(positions, np.zeros_like(positions))
+    engine.wrap_positions()
+    boids = [Boid(config, p, (0, 0)) for p in positions.tolist()]
+    for boid in boids:
+        boid.there_is_no_escape()
+    assert engine.pos.tolist() == [list(boid.pos) for boid in boids]
+
+
+def test_spawn_at_movement_speed(flocking_script):
+    config = flocking_script("flocking.py").FlockingConfig(movement_speed=1.75, seed=3)
+    engine = FlockEngine(config).spawn(200)
+    assert engine.count == 200
+    assert np.hypot(engine.vel[:, 0], engine.vel[:, 1]) == pytest.approx(1.75)
+    assert ((engine.pos >= 0) & (engine.pos <= 750)).all()
+
+
+def pair_set(batches):
+    return {(i, j) for batch_i, batch_j, _, _ in batches for i, j in zip(batch_i.tolist(), batch_j.tolist())}
+
+
+@pytest.mark.parametrize("wrap", [True, False])
+def test_verlet_pairs_match_a_fresh_search(flocking_script, wrap):
+    # a crowded window, so boids wrap around and the list gets rebuilt often
+    config = flocking_script("flocking.py").FlockingConfig(movement_speed=3, radius=50, seed=1, window=Window(300, 300))
+    engine = FlockEngine(config, wrap=wrap, skin=20).spawn(300)
+    for _ in range(200):
+        if wrap:
+            engine.wrap_positions()
+        assert pair_set(engine.neighbour_pairs()) == pair_set(engine._grid_pairs(config.radius))
+        engine.step()
+    assert 1 < engine.rebuilds < 200
+
+
+def test_verlet_list_gives_the_same_flock(flocking_script):
+    config = flocking_script("flocking.py").FlockingConfig(movement_speed=1.75, radius=50, seed=2)
+    searched = FlockEngine(config, skin=0).spawn(400)
+    listed = FlockEngine(config, skin=20).spawn(400)
+    for _ in range(100):
+        searched.step()
+        listed.step()
+        # the same pairs, summed in another order
+        assert listed.vel == pytest.approx(searched.vel, rel=1e-9, abs=1e-9)
+        # the flock is chaotic, so keep the roundoff from growing (the list stays)
+        listed.pos[:] = searched.pos
+        listed.vel[:] = searched.vel
+    assert listed.rebuilds > 1
+
+
+def test_wrapped_boid_gets_its_new_neighbours_without_a_rebuild(flocking_script):
+    config = flocking_script("flocking.py").FlockingConfig(movement_speed=1, radius=50)
+    engine = FlockEngine(config, skin=20)
+    # the first boid crosses the right edge and lands 20 from the second
+    engine.load([(749.5, 300), (20, 300)], [(1, 0), (0, 1)])
+    assert pair_set(engine.neighbour_pairs()) == set()
+    engine.pos += engine.vel
+    engine.wrap_positions()
+    assert engine.pos[0].tolist() == [0, 300]
+    assert pair_set(engine.neighbour_pairs()) == {(0, 1), (1, 0)}
+    assert engine.rebuilds == 1
+
+
+def test_load_drops_the_list(flocking_script):
+    config = flocking_script("flocking.py").FlockingConfig(radius=50)
+    engine = FlockEngine(config, skin=20)
+    engine.load([(100, 100), (120, 100)], [(0, 0), (0, 0)])
+    assert pair_set(engine.neighbour_pairs()) == {(0, 1), (1, 0)}
+    engine.load([(100, 100), (400, 100)], [(0, 0), (0, 0)])
+    assert pair_set(engine.neighbour_pairs()) == set()
+    assert engine.rebuilds == 2
@@ -0,0 +1,404 @@
+import numpy as np
+import pygame as pg
+from stopping import StopCriteria
+from grass_field import GrassField
+
+# upper bound on candidate pairs held in memory at once during a neighbour search
+MAX_PAIRS_PER_BATCH = 2_000_000
+
+COLOURS = {"rabbit": (90, 140, 255), "fox": (230, 70, 40)}
+
+
+def normalize_rows(vectors):
+    """
+    normalizes every non-zero row of an (N, 2) array, zero rows stay zero
+    """
+    lengths = np.hypot(vectors[:, 0], vectors[:, 1])
+    out = np.zeros_like(vectors)
+    nonzero = lengths > 0
+    out[nonzero] = vectors[nonzero] / lengths[nonzero, None]
+    return out
+
+
+def rotate_rows(vectors, degrees):
+    """
+    rotates every row of an (N, 2) array by its own angle in degrees, like Vector2.rotate
+    """
+    theta = np.radians(degrees)
+    cos, sin = np.cos(theta), np.sin(theta)
+    x, y = vectors[:, 0], vectors[:, 1]
+    return np.column_stack((x * cos - y * sin, x * sin + y * cos))
+
+
+def close_pairs(points, targets, radius):
+    """
+    yields batches of (i, j) for every points[i], targets[j] pair at most radius apart
+    targets are binned into a grid with cell size radius so only the 3x3 block
+    of cells around a point has to be checked
+    """
+    if len(points) == 0 or len(targets) == 0 or radius <= 0:
+        return
+
+    origin = np.minimum(points.min(axis=0), targets.min(axis=0))
+    point_cells = ((points - origin) // radius).astype(np.int64)
+    target_cells = ((targets - origin) // radius).astype(np.int64)
+    grid_w = int(max(point_cells[:, 0].max(), target_cells[:, 0].max())) + 1
+    grid_h = int(max(point_cells[:, 1].max(), target_cells[:, 1].max())) + 1
+    cell = target_cells[:, 1] * grid_w + target_cells[:, 0]
+
+    # work on targets sorted by cell so every cell is one contiguous slice
+    order = np.argsort(cell, kind="stable")
+    xs = np.ascontiguousarray(targets[order, 0])
+    ys = np.ascontiguousarray(targets[order, 1])
+    cell_count = np.bincount(cell, minlength=grid_w * grid_h)
+    cell_start = np.cumsum(cell_count) - cell_count
+
+    # candidate cell of every point for each of the 9 surrounding offsets
+    indices = np.arange(len(points))
+    candidates_i = []
+    candidates_cell = []
+    for dy in (-1, 0, 1):
+        for dx in (-1, 0, 1):
+            nx = point_cells[:, 0] + dx
+            ny = point_cells[:, 1] + dy
+            valid = (nx >= 0) & (nx < grid_w) & (ny >= 0) & (ny < grid_h)
+            candidates_i.append(indices[valid])
+            candidates_cell.append(ny[valid] * grid_w + nx[valid])
+    candidates_i = np.concatenate(candidates_i)
+    candidates_cell = np.concatenate(candidates_cell)
+
+    counts = cell_count[candidates_cell]
+    keep = counts > 0
+    candidates_i, starts, counts = candidates_i[keep], cell_start[candidates_cell[keep]], counts[keep]
+
+    # expand (point, cell) candidates into (point, target) pairs in bounded batches
+    ends = np.cumsum(counts)
+    batch_start = 0
+    while batch_start < len(counts):
+        done = ends[batch_start - 1] if batch_start else 0
+        batch_end = int(np.searchsorted(ends, done + MAX_PAIRS_PER_BATCH, side="right"))
+        batch_end = max(batch_end, batch_start + 1)
+
+        batch_counts = counts[batch_start:batch_end]
+        i = np.repeat(candidates_i[batch_start:batch_end], batch_counts)
+        shift = starts[batch_start:batch_end] - (np.cumsum(batch_counts) - batch_counts)
+        j = np.arange(len(i)) + np.repeat(shift, batch_counts)
+
+        dx = points[i, 0] - xs[j]
+        dy = points[i, 1] - ys[j]
+        close = np.flatnonzero(dx * dx + dy * dy <= radius * radius)
+        yield i[close], order[j[close]]
+
+        batch_start = batch_end
+
+
+class Population:
+    """
+    struct-of-arrays state of one species: one row per agent
+    age and energy are int32 and sex/hunted flags one byte each, so an agent takes
+    42 bytes: 250,000 of them need about 10 MB
+    """
+
+    FIELDS = ("pos", "move", "age", "energy", "female", "has_hunted")
+
+    def __init__(self):
+        self.pos = np.zeros((0, 2))
+        self.move = np.zeros((0, 2))
+        self.age = np.zeros(0, dtype=np.int32)
+        self.energy = np.zeros(0, dtype=np.int32)
+        self.female = np.zeros(0, dtype=bool)
+        self.has_hunted = np.zeros(0, dtype=bool)
+
+    def __len__(self):
+        return len(self.pos)
+
+    def add(self, pos, move, energy, rng):
+        """
+        appends newborns: age 0, random sex, not hunted yet
+        """
+        count = len(pos)
+        self.pos = np.vstack((self.pos, pos))
+        self.move = np.vstack((self.move, move))
+        self.age = np.concatenate((self.age, np.zeros(count, dtype=np.int32)))
+        self.energy = np.concatenate((self.energy, np.full(count, energy, dtype=np.int32)))
+        self.female = np.concatenate((self.female, rng.random(count) < 0.5))
+        self.has_hunted = np.concatenate((self.has_hunted, np.zeros(count, dtype=bool)))
+
+    def keep(self, alive):
+        """
+        drops every agent whose entry in the boolean mask is False
+        """
+        for field in self.FIELDS:
+            setattr(self, field, getattr(self, field)[alive])
+
+
+class PredatorPreyEngine:
+    """
+    struct-of-arrays version of the rabbits and foxes from lifecycle+energy.py
+    aging, natural death, hunting, mating, movement, feeding and starvation are applied
+    to whole species at once, followed by one compaction that removes the dead and
+    appends the newborns
+    grass is the same GrassField raster the agent model uses (grass_cell_size,
+    grass_spread_prob), regrowing with grass_reproduction_prob after every step
+
+    all agents act on the state at the start of the tick instead of one after another,
+    so same-tick conflicts are resolved explicitly: every rabbit (or blade of grass) is
+    eaten at most once and every fox (or rabbit) eats at most once per tick
+    """
+
+    def __init__(self, config, rng=None):
+        self.config = config
+        self.width, self.height = config.window.as_tuple()
+        self.rng = rng or np.random.default_rng(config.seed)
+        self.rabbits = Population()
+        self.foxes = Population()
+        self.grass = GrassField(config, regrowth_prob=config.grass_reproduction_prob, rng=self.rng)
+
+    def populations(self):
+        return {"rabbit": self.rabbits, "fox": self.foxes}
+
+    def spawn(self, rabbits=0, foxes=0, grass=0):
+        """
+        adds agents at random positions, heading in random directions at movement_speed,
+        and scatters grass blades over the field
+        """
+        config = self.config
+        for population, count, energy in ((self.rabbits, rabbits, config.rabbit_start_energy),
+                                          (self.foxes, foxes, config.fox_start_energy)):
+            positions = self.rng.uniform((0, 0), (self.width, self.height), size=(count, 2))
+            angles = self.rng.uniform(0, 2 * np.pi, size=count)
+            moves = config.movement_speed * np.column_stack((np.cos(angles), np.sin(angles)))
+            population.add(positions, moves, energy, self.rng)
+        self.grass.scatter(grass)
+        return self
+
+    def report(self, tracker):
+        """
+        writes the current counts and age/energy sums into a PopulationTracker
+        """
+        for species, population in self.populations().items():
+            if species in tracker.counts:
+                tracker.counts[species] = len(population)
+                tracker.age_sums[species] = int(population.age.sum())
+                tracker.energy_sums[species] = int(population.energy.sum())
+        if "grass" in tracker.counts:
+            tracker.counts["grass"] = self.grass.total
+
+    def wrap_positions(self, pos):
+        """
+        vectorized there_is_no_escape
+        """
+        x, y = pos[:, 0], pos[:, 1]
+        x[x < 0] = self.width
+        x[x > self.width] = 0
+        y[y < 0] = self.height
+        y[y > self.height] = 0
+
+    def claim(self, hunters, hunter_pos, prey, prey_pos, radii):
+        """
+        pairs hunters with prey within each hunter's radius (a scalar or one per hunter)
+        every prey is taken by at most one hunter and every hunter takes at most one prey
+        returns the matched hunter and prey indices
+        """
+        radii = np.broadcast_to(radii, len(hunters))
+        if len(hunters) == 0:
+            return hunters, prey[:0]
+        pairs_i, pairs_j = [], []
+        for i, j in close_pairs(hunter_pos, prey_pos, float(radii.max())):
+            d = hunter_pos[i] - prey_pos[j]
+            within = d[:, 0] ** 2 + d[:, 1] ** 2 <= radii[i] ** 2
+            pairs_i.append(i[within])
+            pairs_j.append(j[within])
+        if not pairs_i:
+            return hunters[:0], prey[:0]
+        i, j = np.concatenate(pairs_i), np.concatenate(pairs_j)
+
+        # random order decides who wins when several hunters go for the same prey
+        shuffle = self.rng.permutation(len(i))
+        i, j = i[shuffle], j[shuffle]
+        matched_i, matched_j = [i[:0]], [j[:0]]
+        while len(i):
+            # one prey per hunter and one hunter per prey, then retry the losers
+            # on whatever is still free until no pair is left
+            _, first = np.unique(j, return_index=True)
+            round_i, round_j = i[first], j[first]
+            _, first = np.unique(round_i, return_index=True)
+            round_i, round_j = round_i[first], round_j[first]
+            matched_i.append(round_i)
+            matched_j.append(round_j)
+            free = ~np.isin(i, round_i) & ~np.isin(j, round_j)
+            i, j = i[free], j[free]
+        return hunters[np.concatenate(matched_i)], prey[np.concatenate(matched_j)]
+
+    def find_mates(self, population, candidates, alive):
+        """
+        candidates that have a living agent of the opposite sex within mating_radius
+        """
+        radius = self.config.mating_radius
+        found = []
+        for i, j in close_pairs(population.pos[candidates], population.pos, radius):
+            match = alive[j] & (population.female[j] != population.female[candidates[i]])
+            found.append(i[match])
+        if not found:
+            return candidates[:0]
+        return candidates[np.unique(np.concatenate(found))]
+
+    def step(self):
+        """
+        advances every agent by one tick
+        """
+        config = self.config
+        rng = self.rng
+        rabbits, foxes = self.rabbits, self.foxes
+        speed = config.movement_speed
+
+        # aging (about one year every 10 ticks) and age-based natural death
+        rabbits.age += rng.random(len(rabbits)) < 0.1
+        foxes.age += rng.random(len(foxes)) < 0.1
+        rabbit_alive = rng.random(len(rabbits)) >= np.minimum(0.001, rabbits.age / config.max_age * 0.01)
+        fox_alive = rng.random(len(foxes)) >= config.fox_death_prob + np.minimum(0.002, foxes.age / config.max_age * 0.02)
+
+        # foxes hunt, then mate, then move
+        fox_factor = np.maximum(0.2, 1 - (foxes.age / config.max_age) * 0.8)
+        hunters = np.flatnonzero(fox_alive)
+        prey = np.flatnonzero(rabbit_alive)
+        hunted_by, hunted = self.claim(hunters, foxes.pos[hunters], prey, rabbits.pos[prey],
+                                       config.fox_hunt_radius * fox_factor[hunters])
+        rabbit_alive[hunted] = False
+        foxes.energy[hunted_by] += config.fox_energy_gain_on_eat
+        foxes.has_hunted[hunted_by] = True
+
+        fox_prob = np.where(foxes.age < 10, 0,
+                            np.where(foxes.age > 100, config.fox_reproduction_prob * 0.5, config.fox_reproduction_prob))
+        wants = np.flatnonzero(fox_alive & foxes.has_hunted & (rng.random(len(foxes)) < fox_prob))
+        fox_parents = self.find_mates(foxes, wants, fox_alive)
+
+        turning = np.flatnonzero(rng.random(len(foxes)) < 0.15)
+        foxes.move[turning] = rotate_rows(foxes.move[turning], rng.uniform(-45, 45, len(turning)))
+        foxes.move = normalize_rows(foxes.move) * (speed * fox_factor)[:, None]
+        foxes.pos += foxes.move
+        self.wrap_positions(foxes.pos)
+
+        # rabbits move, then feed and mate with whoever is near their new position
+        rabbit_factor = np.maximum(0.2, 1 - (rabbits.age / config.max_age) * 0.8)
+        turning = np.flatnonzero(rng.random(len(rabbits)) < 0.1)
+        rabbits.move[turning] = rotate_rows(rabbits.move[turning], rng.uniform(-30, 30, len(turning)))
+        rabbits.move = normalize_rows(rabbits.move) * (speed * rabbit_factor)[:, None]
+        rabbits.pos += rabbits.move
+        self.wrap_positions(rabbits.pos)
+
+        feeders = np.flatnonzero(rabbit_alive)
+        fed = feeders[self.grass.consume_all(rabbits.pos[feeders], config.rabbit_feed_radius, rng)]
+        rabbits.energy[fed] += config.rabbit_energy_gain_on_eat
+
+        rabbit_prob = np.where(rabbits.age < 10, 0,
+                               np.where(rabbits.age > 80, config.rabbit_reproduction_prob * 0.5,
+                                        config.rabbit_reproduction_prob * 1.2))
+        wants = np.flatnonzero(rabbit_alive & (rng.random(len(rabbits)) < rabbit_prob))
+        rabbit_parents = self.find_mates(rabbits, wants, rabbit_alive)
+
+        # energy loss and starvation
+        if config.fox_start_energy > 0:
+            foxes.energy -= 1
+            fox_alive &= foxes.energy > 0
+        if config.rabbit_start_energy > 0:
+            rabbits.energy -= 1
+            rabbit_alive &= rabbits.energy > 0
+
+        # compaction: drop the dead, append the newborns at their parent's position and heading
+        for population, alive, parents, energy in ((rabbits, rabbit_alive, rabbit_parents, config.rabbit_start_energy),
+                                                   (foxes, fox_alive, fox_parents, config.fox_start_energy)):
+            pos, move = population.pos[parents], population.move[parents]
+            population.keep(alive)
+            population.add(pos, move, energy, rng)
+        self.grass.step()
+
+
+class ArrayLotkaVolterraSimulation:
+    """
+    runs a PredatorPreyEngine with the same recording, stop criteria and end of run
+    handling as LotkaVolterraSimulation
+    without config.headless every agent is drawn as a dot, sprites would not keep up
+    with populations this size
+    """
+
+    def __init__(self, config, tracker):
+        self.config = config
+        self.engine = PredatorPreyEngine(config)
+        self.tracker = tracker
+        self.stop_criteria = StopCriteria(config)
+        self.current_step = 0
+        self.simulation_ended = False
+        self._running = False
+        self._screen = None
+        self._clock = None
+
+    def batch_spawn(self, rabbits=0, foxes=0, grass=0):
+        self.engine.spawn(rabbits, foxes, grass)
+        return self
+
+    def tick(self):
+        # Record population every record_interval steps
+        if self.current_step % self.config.record_interval == 0:
+            self.engine.report(self.tracker)
+            self.tracker.record(self)
+            reason = self.stop_criteria.check(self.tracker.counts)
+            if reason is not None:
+                self.tracker.stop_reason = reason
+                self._running = False
+                return
+
+        self.engine.step()
+        if not self.config.headless:
+            self.draw()
+
+        if self.config.duration > 0 and self.current_step == self.config.duration:
+            self._running = False
+        self.current_step += 1
+
+    def draw(self):
+        if self._screen is None:
+            pg.init()
+            self._screen = pg.display.set_mode(self.config.window.as_tuple())
+            pg.display.set_caption("Lotka-Volterra (array engine)")
+            self._clock = pg.time.Clock()
+
+        for event in pg.event.get():
+            if event.type == pg.QUIT:
+                self._running = False
+
+        self._screen.fill((0, 0, 0))
+        self.engine.grass.draw(self._screen)
+        width, height = self._screen.get_size()
+        pixels = pg.surfarray.pixels3d(self._screen)
+        for species, population in self.engine.populations().items():
+            # 3x3 dots, clipped to the window
+            x = population.pos[:, 0].astype(np.int64)
+            y = population.pos[:, 1].astype(np.int64)
+            for ox in (-1, 0, 1):
+                for oy in (-1, 0, 1):
+                    pixels[np.clip(x + ox, 0, width - 1), np.clip(y + oy, 0, height - 1)] = COLOURS[species]
+        del pixels
+        pg.display.flip()
+        self._clock.tick(self.config.fps_limit)
+
+    def run(self):
+        self._running = True
+        while self._running:
+            self.tick()
+        self.end()
+        self.tracker.close()
+        if self._screen is not None:
+            pg.display.quit()
+        return self
+
+    def end(self):
+        if not self.simulation_ended:
+            if self.tracker.stop_reason is None:
+                self.tracker.stop_reason = "duration"
+            print(f"\nSimulation stopped ({self.tracker.stop_reason}). Generating plot...")
+            self.tracker.plot()
+            # with the default stop rule the reason follows from the final counts, so the
+            # results keep their original columns
+            self.tracker.create_summary(stop_reason=not self.stop_criteria.default)
+            self.simulation_ended = True
@@ -1,34 +1,36 @@
 from dataclasses import dataclass
-from vi import Agent, Config, Simulation
+from vi import Config
 from pygame.math import Vector2
-import random
 import matplotlib.pyplot as plt
-import pandas as pd
+from lotka_volterra import RunConfig, TrackedSimulation
+import checkpoint
+import tracker
+from tracker import TrackedAgent
+from species import RABBIT, FOX, PREY, partitions
+from replicates import run_replicates, run_forked_replicates
 
 
 @dataclass
-class LotkaVolterraConfig(Config):
+class LotkaVolterraConfig(RunConfig, Config):
     fox_death_prob: float = 0.01
     fox_hunt_radius: float = 10
     movement_speed: float = 2.0
     rabbit_reproduction_prob: float = 0.005
     fox_start_energy: int = 0
     fox_energy_gain_on_eat: int = 0
-    duration: int = 15000  # Simulation duration in steps
 
 
-class PopulationTracker:
-    def __init__(self):
-        self.data = []
-        self.step = 0
-        self.summary = {}
+class PopulationTracker(tracker.PopulationTracker):
+    def __init__(self, capacity=1024):
+        super().__init__(species=("rabbit", "fox"), capacity=capacity)
+        self.run_id = None
 
     def record(self, simulation):
         """Record current population counts"""
-        rabbit_count = sum(1 for agent in simulation._agents if hasattr(agent, 'species') and agent.species == "rabbit")
-        fox_count = sum(1 for agent in simulation._agents if hasattr(agent, 'species') and agent.species == "fox")
+        rabbit_count = self.counts["rabbit"]
+        fox_count = self.counts["fox"]
 
-        self.data.append({
+        self.append({
             'step': self.step,
             'rabbits': rabbit_count,
             'foxes': fox_count
@@ -39,25 +41,13 @@ class PopulationTracker:
         if self.step % 20 == 0:
             print(f"Step {self.step}: Rabbits={rabbit_count}, Foxes={fox_count}")
 
-        # Check if population is extinct
-        if rabbit_count == 0 and fox_count == 0:
-            print("Both populations extinct!")
-            return True
-        elif rabbit_count == 0:
-            print("All rabbits extinct!")
-            return True
-        elif fox_count == 0:
-            print("All foxes extinct!")
-            return True
-        return False
-
-    def plot(self):
+    def plot(self, show=True):
         """Create simple population dynamics plot"""
-        if not self.data:
+        if len(self) == 0:
             print("No data to plot!")
             return
 
-        df = pd.DataFrame(self.data)
+        df = self.to_frame()
         print(f"Plotting {len(df)} data points...")
 
         # Create single plot
@@ -74,7 +64,10 @@ class PopulationTracker:
         filename= f'population_dynamics_run_{self.run_id or "unknown"}.png'
         plt.savefig(filename, dpi=300, bbox_inches='tight')
         print(f"Plot saved as '{filename}'")
-        plt.show()
+        if show:
+            plt.show()
+        else:
+            plt.close()
 
         # Print basic statistics
         print(f"\n=== Population Statistics ===")
@@ -82,120 +75,85 @@ class PopulationTracker:
         print(f"Rabbits - Max: {df['rabbits'].max()}, Min: {df['rabbits'].min()}, Final: {df['rabbits'].iloc[-1]}")
         print(f"Foxes - Max: {df['foxes'].max()}, Min: {df['foxes'].min()}, Final: {df['foxes'].iloc[-1]}")
 
-    def create_summary(self):
-        df = pd.DataFrame(self.data)
-        self.summary["steps_survived"] = len(df)
-        self.summary["final_rabbits"] = df['rabbits'].iloc[-1]
-        self.summary["final_foxes"] = df['foxes'].iloc[-1]
-        self.summary["max_rabbits"] = df['rabbits'].max()
-        self.summary["max_foxes"] = df['foxes'].max()
-        self.summary["min_rabbits"] = df['rabbits'].min()
-        self.summary["min_foxes"] = df['foxes'].min()
 
-    def get_summary(self):
-        return self.summary
+class Rabbit(TrackedAgent):
+    species = "rabbit"
+    code = RABBIT
 
-
-class Rabbit(Agent):
-    def __init__(self, images, simulation, pos=None, move=None):
-        super().__init__(images, simulation, pos, move)
-        self.species = "rabbit"
+    def reset(self):
+        # reproduction is a rare per-tick chance, so it's scheduled rather than checked every tick
+        self.schedule(self.config.rabbit_reproduction_prob, self.give_birth)
 
     def starting(self):
         self.species = "rabbit"
-        angle = random.uniform(0, 360)
+        angle = self.random.angle()
         self.move = Vector2(1, 0).rotate(angle) * self.config.movement_speed
 
     def change_position(self):
         # Move randomly
-        if random.random() < 0.1:
-            self.move = self.move.rotate(random.uniform(-30, 30))
+        if self.random.random() < 0.1:
+            self.move = self.move.rotate(self.random.uniform(-30, 30))
 
         self.pos += self.move
         self.there_is_no_escape()
 
-        # Reproduction
-        if random.random() < self.config.rabbit_reproduction_prob:
-            self.reproduce()
+    def give_birth(self):
+        self.reproduce()
+        self.schedule(self.config.rabbit_reproduction_prob, self.give_birth)
 
 
-class Fox(Agent):
-    def __init__(self, images, simulation, pos=None, move=None):
-        super().__init__(images, simulation, pos, move)
-        self.species = "fox"
+class Fox(TrackedAgent):
+    species = "fox"
+    code = FOX
+    prey = partitions(PREY[FOX])  # where to look for something to hunt
+
+    def reset(self):
         self.energy = self.config.fox_start_energy
+        # Energy loss and starvation: one energy per tick, worked out lazily by TrackedAgent
+        if self.config.fox_start_energy > 0:
+            self.energy_drain = 1
+        # random death, fired at the start of the tick it happens in
+        self.schedule(self.config.fox_death_prob, self.die)
 
     def starting(self):
         self.species = "fox"
         self.energy = self.config.fox_start_energy
-        angle = random.uniform(0, 360)
+        angle = self.random.angle()
         self.move = Vector2(1, 0).rotate(angle) * self.config.movement_speed
 
-    def change_position(self):
-        # Check for random death FIRST
-        if random.random() < self.config.fox_death_prob:
-            self.kill()
-            return
+    def die(self):
+        self.kill()
 
-        # Hunt rabbits
-        neighbours = list(self.in_proximity_accuracy())
+    def intend(self):
+        # Hunt: the search stops at the first prey in reach, the catch is settled at the end of the tick
+        prey = self.first_neighbour(*self.prey, radius=self.config.fox_hunt_radius)
+        if prey is not None:
+            self.interactions.hunt(self, prey)
 
-        for agent, distance in neighbours:
-            if hasattr(agent, 'species') and agent.species == "rabbit":
-                if distance <= self.config.fox_hunt_radius:
-                    agent.kill()
-                    self.energy += self.config.fox_energy_gain_on_eat
-                    self.reproduce()
-                    break
+    def caught(self, prey):
+        self.energy += self.config.fox_energy_gain_on_eat
+        self.reproduce()
+
+    def change_position(self):
+        if self.interactions.sequential:
+            # hunt during its own turn, before moving
+            self.intend()
 
         # Random movement
-        if random.random() < 0.15:
-            self.move = self.move.rotate(random.uniform(-45, 45))
+        if self.random.random() < 0.15:
+            self.move = self.move.rotate(self.random.uniform(-45, 45))
 
         self.pos += self.move
         self.there_is_no_escape()
 
-        # Energy loss and starvation
-        # this is the no energy model so we dont want this to run
-        if self.config.fox_start_energy > 0:
-            self.energy -= 1
-            if self.energy <= 0:
-                self.kill()
-
-
-class LotkaVolterraSimulation(Simulation):
-    def __init__(self, config):
-        super().__init__(config)
-        self.tracker = PopulationTracker()
-        self.current_step = 0
-        self.simulation_ended = False
-
-    def tick(self):
-        # Record population every 5 steps
-        if self.current_step % 5 == 0:
-            extinct = self.tracker.record(self)
-            if extinct and not self.simulation_ended:
-                print("Population extinct! Generating plot...")
-                self.tracker.plot()
-                self.tracker.create_summary()
-                self.simulation_ended = True
-
-        super().tick()
-        self.current_step += 1
-
-    def end(self):
-        super().end()
-        if not self.simulation_ended:
-            print("\nSimulation ended normally. Generating plot...")
-            self.tracker.plot()
-            self.tracker.create_summary()
-
-
-def run_simulation_once(seed=None):
-    if seed is not None:
-        random.seed(seed)
-
-    config = LotkaVolterraConfig(
+
+class LotkaVolterraSimulation(TrackedSimulation):
+    tracker_class = PopulationTracker
+
+def replicate_config(seed=None):
+    # config.seed seeds both the agents' BlockRandom and vi's spawn positions
+    return LotkaVolterraConfig(
+        seed=seed,
         movement_speed=2.0,
         radius=50,
         fox_death_prob=0.01,
@@ -203,31 +161,56 @@ def run_simulation_once(seed=None):
         rabbit_reproduction_prob=0.005,
         duration=15000,
         fox_start_energy=0,
-        fox_energy_gain_on_eat=0
+        fox_energy_gain_on_eat=0,
+        headless=True
     )
 
-    simulation = LotkaVolterraSimulation(config)
+
+def run_simulation_once(seed=None, run_id=None):
+    simulation = LotkaVolterraSimulation(replicate_config(seed))
+    simulation.tracker.run_id = run_id
     simulation.batch_spawn_agents(50, Rabbit, images=["images/rabbit.png"])
     simulation.batch_spawn_agents(10, Fox, images=["images/fox.png"])
     simulation.run()
 
     return simulation.tracker.get_summary()
 
+
+BURN_IN_TICKS = 300  # Steps the initial population needs to spread out
+
+
+def burn_in(seed=0, ticks=BURN_IN_TICKS):
+    """Run the transient of a replicate once and return its snapshot, for run_forked_replicates"""
+    simulation = LotkaVolterraSimulation(replicate_config(seed))
+    simulation.batch_spawn_agents(50, Rabbit, images=["images/rabbit.png"])
+    simulation.batch_spawn_agents(10, Fox, images=["images/fox.png"])
+    while simulation.current_step < ticks and simulation.tracker.stop_reason is None:
+        simulation.tick()
+    return checkpoint.snapshot(simulation)
+
+
+def run_simulation_from(snapshot, seed=None, run_id=None):
+    """Continue a burn-in snapshot as one replicate with its own seed"""
+    simulation = LotkaVolterraSimulation(replicate_config(seed))
+    simulation.tracker.run_id = run_id
+    checkpoint.restore(simulation, snapshot, [(Rabbit, ["images/rabbit.png"]), (Fox, ["images/fox.png"])])
+    checkpoint.reseed(simulation, seed)
+    simulation.run()
+
+    return simulation.tracker.get_summary()
+
 # Run simulation with population tracking
 if __name__ == "__main__":
     print("Starting Lotka-Volterra simulation with population tracking...")
 
     num_runs = 27
-    results = []
-
-    for i in range(num_runs):
-        print(f"\n--- Simulation {i + 1} ---")
-        summary = run_simulation_once(seed=i)
-        summary['run'] = i + 1
-        results.append(summary)
+    forked = False  # True runs the first BURN_IN_TICKS steps once and continues every run from there
 
-    # create df and save
-    df_results = pd.DataFrame(results)
+    # runs go out over all cores; run N always gets seed N - 1
+    if forked:
+        df_results = run_forked_replicates(burn_in, run_simulation_from, num_runs, base_seed=0)
+    else:
+        df_results = run_replicates(run_simulation_once, num_runs, base_seed=0)
     df_results.to_csv("baseline_results.csv", index=False)
     print("\nSaved all run results to 'baseline_results.csv'.")
 
@@ -0,0 +1,182 @@
+import os
+import pickle
+import random
+import numpy as np
+from pygame.math import Vector2
+
+
+def snapshot(simulation):
+    """
+    The full state of a Lotka-Volterra simulation between two ticks, as a dict of arrays
+
+    Covers every live agent (class, id, position, heading, age, energy and its
+    snapshot_attributes), the events pending in its scheduler, the tracker's rows and
+    sums, the stop criteria window, the grass field and event log when the simulation
+    has them, and the state of every random generator a tick draws from.
+    Killed agents waiting in the AgentPool are not saved: reusing one or building a
+    new one gives the same offspring.
+    """
+    agents = list(simulation._agents)
+    index = {agent: i for i, agent in enumerate(agents)}
+    classes = sorted({type(agent) for agent in agents}, key=lambda cls: cls.species)
+    kinds = {cls: i for i, cls in enumerate(classes)}
+    attributes = sorted({name for cls in classes for name in cls.snapshot_attributes})
+
+    # callbacks are bound methods of agents, saved as (agent index, method name)
+    pending = simulation.scheduler.pending()
+    events = [(tick, order, index[callback.__self__], callback.__name__, p)
+              for tick, order, callback, p in pending]
+
+    state = {
+        "step": simulation.current_step,
+        "counter": simulation.shared.counter,
+        "next_agent_id": simulation._next_agent_id,
+        "species": [cls.species for cls in classes],
+        "agents": {
+            "kind": np.array([kinds[type(agent)] for agent in agents], dtype=np.int64),
+            "id": np.array([agent.id for agent in agents], dtype=np.int64),
+            "pos": np.array([(agent.pos.x, agent.pos.y) for agent in agents], dtype=np.float64).reshape(-1, 2),
+            "move": np.array([(agent.move.x, agent.move.y) for agent in agents], dtype=np.float64).reshape(-1, 2),
+            # int64 unless some value is a float, so integer energies come back as ints
+            "age": np.array([agent._age for agent in agents]),
+            "energy": np.array([agent._energy for agent in agents]),
+            "energy_drain": np.array([agent._energy_drain for agent in agents]),
+            "attributes": {name: [getattr(agent, name, None) for agent in agents] for name in attributes},
+        },
+        "now": simulation.scheduler.now,
+        "events": events,
+        "tracker": simulation.tracker.get_state(),
+        "stop_window": None if simulation.stop_criteria.window is None else list(simulation.stop_criteria.window),
+        "random": simulation.random.get_state(),
+        "python_random": random.getstate(),  # vi places spawned agents with it
+        "prng_move": simulation.shared.prng_move.getstate(),
+    }
+
+    grass = getattr(simulation, "grass", None)
+    if grass is not None:
+        state["grass"] = {"amount": grass.amount.copy(), "total": grass.total,
+                          "rng": grass.rng.bit_generator.state}
+    event_log = getattr(simulation, "events", None)
+    if event_log is not None:
+        state["event_log"] = event_log.get_state()
+    return state
+
+
+def restore(simulation, state, agents):
+    """
+    Put a snapshot() back into a freshly built simulation (same config, no agents spawned yet)
+
+    agents lists the (class, images) pairs to rebuild the agents with, as given to
+    batch_spawn_agents. Calling run() afterwards continues exactly where the
+    snapshotted run was: same draws, same events, same recorded rows.
+    """
+    if len(simulation._agents):
+        raise ValueError("restore into a new simulation, before spawning any agents")
+    images = {cls.species: (cls, simulation._load_images(paths)) for cls, paths in agents}
+    missing = set(state["species"]) - set(images)
+    if missing:
+        raise ValueError(f"no agent class given for {', '.join(sorted(missing))}")
+    classes = [images[species] for species in state["species"]]
+
+    saved = state["agents"]
+    # building an agent runs reset(), whose draws, events and tracker updates are all
+    # overwritten below
+    restored = []
+    for kind, pos, move in zip(saved["kind"].tolist(), saved["pos"].tolist(), saved["move"].tolist()):
+        cls, surfaces = classes[kind]
+        restored.append(cls(surfaces, simulation, Vector2(pos), Vector2(move)))
+
+    attributes = saved["attributes"]
+    for i, (agent, agent_id, age, energy, drain) in enumerate(zip(
+            restored, saved["id"].tolist(), saved["age"].tolist(),
+            saved["energy"].tolist(), saved["energy_drain"].tolist())):
+        agent.id = agent_id
+        agent._age = age
+        agent._energy = energy
+        agent._energy_drain = drain
+        agent._events = {}
+        for name in type(agent).snapshot_attributes:
+            setattr(agent, name, attributes[name][i])
+
+    pending = []
+    for tick, order, i, name, p in state["events"]:
+        agent = restored[i]
+        event = [tick, order, getattr(agent, name), p]
+        agent._events[name] = event
+        pending.append(event)
+    simulation.scheduler.restore(state["now"], pending)
+
+    simulation.tracker.set_state(state["tracker"])
+    if state["stop_window"] is not None:
+        simulation.stop_criteria.window.clear()
+        simulation.stop_criteria.window.extend(state["stop_window"])
+    if "grass" in state:
+        grass = simulation.grass
+        grass.amount[...] = state["grass"]["amount"]
+        grass.total = state["grass"]["total"]
+        grass.rng.bit_generator.state = state["grass"]["rng"]
+    if "event_log" in state:
+        simulation.events.set_state(state["event_log"])
+
+    simulation.current_step = state["step"]
+    simulation.shared.counter = state["counter"]
+    simulation._next_agent_id = state["next_agent_id"]
+    simulation.random.set_state(state["random"])
+    random.setstate(state["python_random"])
+    simulation.shared.prng_move.setstate(state["prng_move"])
+    # the grid the next tick's first queries use
+    simulation._proximity.update()
+    return simulation
+
+
+def reseed(simulation, seed):
+    """
+    Continue a restored simulation with its own randomness: every generator is reseeded
+    from seed and the pending scheduled events get new waiting times
+    """
+    simulation.random.seed(seed)
+    random.seed(seed)
+    simulation.shared.prng_move.seed(seed)
+    grass = getattr(simulation, "grass", None)
+    if grass is not None:
+        grass.rng = np.random.default_rng(seed)
+    simulation.scheduler.redraw()
+    return simulation
+
+
+def save(simulation, path):
+    """Write a snapshot() to path, replacing the previous one only once it is complete"""
+    temporary = f"{path}.tmp"
+    with open(temporary, "wb") as f:
+        pickle.dump(snapshot(simulation), f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(temporary, path)
+
+
+def continue_file(source, size, path):
+    """
+    Make path hold the first size bytes of source, the part of an output file a checkpoint covers
+
+    The same file is cut back in place, so resuming doesn't cost more the longer the
+    run was; any other path gets a copy of that part.
+    """
+    if os.path.getsize(source) < size:
+        raise ValueError(f"{source} is shorter than when the checkpoint was taken")
+    if os.path.exists(path) and os.path.samefile(source, path):
+        os.truncate(path, size)
+        return
+    with open(source, "rb") as src, open(path, "wb") as dst:
+        while size:
+            chunk = src.read(min(size, 1 << 20))
+            dst.write(chunk)
+            size -= len(chunk)
+
+
+def load(path):
+    with open(path, "rb") as f:
+        return pickle.load(f)
+
+
+def resume(simulation, path, agents):
+    """Restore the checkpoint at path into a freshly built simulation, see restore()"""
+    return restore(simulation, load(path), agents)
+
@@ -1,17 +1,23 @@
 from dataclasses import dataclass
-from vi import Agent, Config, Simulation
+from vi import Agent, Config
 from pygame.math import Vector2
 import random
+from headless import HeadlessCapableSimulation
+from spatial import use_spatial_hash
+from species import RABBIT, FOX, PREY
 
 @dataclass
 class LotkaVolterraConfig(Config):
     fox_death_prob: float = 0.01
     fox_hunt_radius: float = 30
     movement_speed: float = 2.0
+    headless: bool = False  # Run without a window, images or frame pacing (batch runs)
 
 class Rabbit(Agent):
+    species = "rabbit"
+    code = RABBIT
+
     def starting(self):
-        self.species = "rabbit"
         angle = random.uniform(0, 360)
         self.move = Vector2(1, 0).rotate(angle) * self.config.movement_speed
         
@@ -24,8 +30,11 @@ class Rabbit(Agent):
         self.there_is_no_escape()
 
 class Fox(Agent):
+    species = "fox"
+    code = FOX
+    prey = PREY[FOX]
+
     def starting(self):
-        self.species = "fox"
         self.energy = 100
         angle = random.uniform(0, 360)
         self.move = Vector2(1, 0).rotate(angle) * self.config.movement_speed
@@ -37,7 +46,7 @@ class Fox(Agent):
             
         # Hunt rabbits
         for agent, distance in self.in_proximity_accuracy():
-            if hasattr(agent, 'species') and agent.species == "rabbit" and distance < self.config.fox_hunt_radius:
+            if agent.code in self.prey and distance < self.config.fox_hunt_radius:
                 agent.kill()
                 self.energy += 30
                 break
@@ -64,7 +73,7 @@ if __name__ == "__main__":
         duration=1000
     )
     
-    sim = Simulation(config)
+    sim = use_spatial_hash(HeadlessCapableSimulation(config))
     
     print("Starting Lotka-Volterra simulation...")
     print("Spawning 50 rabbits and 20 foxes...")
@@ -82,8 +91,8 @@ if __name__ == "__main__":
     print(f"Final agent count: {len(sim._all.sprites())}")
     
     # Count remaining agents by type
-    rabbits = [agent for agent in sim._all.sprites() if hasattr(agent, 'species') and agent.species == "rabbit"]
-    foxes = [agent for agent in sim._all.sprites() if hasattr(agent, 'species') and agent.species == "fox"]
+    rabbits = [agent for agent in sim._all.sprites() if agent.code == RABBIT]
+    foxes = [agent for agent in sim._all.sprites() if agent.code == FOX]
     
     print(f"Final Statistics:")
     print(f"Rabbits remaining: {len(rabbits)}")
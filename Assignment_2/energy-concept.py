@@ -1,13 +1,17 @@
 from dataclasses import dataclass
-from vi import Agent, Config, Simulation
+from vi import Config
 from pygame.math import Vector2
-import random
 import matplotlib.pyplot as plt
 import pandas as pd
+from lotka_volterra import RunConfig, TrackedSimulation
+from grass_field import GrassField
+import tracker
+from tracker import TrackedAgent
+from species import RABBIT, FOX, PREY, partitions
 
 
 @dataclass
-class LotkaVolterraConfig(Config):
+class LotkaVolterraConfig(RunConfig, Config):
     fox_death_prob: float = 0.01
     fox_hunt_radius: float = 10
     movement_speed: float = 2.0
@@ -18,20 +22,20 @@ class LotkaVolterraConfig(Config):
     rabbit_energy_gain_on_eat: int = 2
     rabbit_feed_radius: int = 10
     grass_reproduction_prob: float = 0.005
-    duration: int = 15000  # Simulation duration in steps
+    grass_cell_size: int = 5  # Side of a grass field cell in pixels
+    grass_spread_prob: float = 0.0  # Share of new grass that grows into a neighbouring cell
 
 
-class PopulationTracker:
-    def __init__(self):
-        self.data = []
-        self.step = 0
+class PopulationTracker(tracker.PopulationTracker):
+    def __init__(self, capacity=1024):
+        super().__init__(species=("rabbit", "fox", "grass"), capacity=capacity)
 
     def record(self, simulation):
         """Record current population counts"""
-        rabbit_count = sum(1 for agent in simulation._agents if hasattr(agent, 'species') and agent.species == "rabbit")
-        fox_count = sum(1 for agent in simulation._agents if hasattr(agent, 'species') and agent.species == "fox")
+        rabbit_count = self.counts["rabbit"]
+        fox_count = self.counts["fox"]
 
-        self.data.append({
+        self.append({
             'step': self.step,
             'rabbits': rabbit_count,
             'foxes': fox_count
@@ -42,25 +46,13 @@ class PopulationTracker:
         if self.step % 20 == 0:
             print(f"Step {self.step}: Rabbits={rabbit_count}, Foxes={fox_count}")
 
-        # Check if population is extinct
-        if rabbit_count == 0 and fox_count == 0:
-            print("Both populations extinct!")
-            return True
-        elif rabbit_count == 0:
-            print("All rabbits extinct!")
-            return True
-        elif fox_count == 0:
-            print("All foxes extinct!")
-            return True
-        return False
-
-    def plot(self):
+    def plot(self, show=True):
         """Create simple population dynamics plot"""
-        if not self.data:
+        if len(self) == 0:
             print("No data to plot!")
             return
 
-        df = pd.DataFrame(self.data)
+        df = self.to_frame()
         print(f"Plotting {len(df)} data points...")
 
         # Create single plot
@@ -76,7 +68,10 @@ class PopulationTracker:
         plt.tight_layout()
         plt.savefig('population_dynamics_energy.png', dpi=300, bbox_inches='tight')
         print("Plot saved as 'population_dynamics_energy.png'")
-        plt.show()
+        if show:
+            plt.show()
+        else:
+            plt.close()
 
         # Print basic statistics
         print(f"\n=== Population Statistics ===")
@@ -84,124 +79,97 @@ class PopulationTracker:
         print(f"Rabbits - Max: {df['rabbits'].max()}, Min: {df['rabbits'].min()}, Final: {df['rabbits'].iloc[-1]}")
         print(f"Foxes - Max: {df['foxes'].max()}, Min: {df['foxes'].min()}, Final: {df['foxes'].iloc[-1]}")
 
-class Grass(Agent):
-    def __init__(self, images, simulation, pos=None, move=None):
-        super().__init__(images, simulation, pos, move)
-        self.species = "grass"
-
-    def starting(self):
-        self.species = "grass"
-        angle = random.uniform(0, 360)
-        self.move = Vector2(0, 0).rotate(angle) * 0
-
-    def change_position(self):
-        # Move randomly
-        pass
+class Rabbit(TrackedAgent):
+    species = "rabbit"
+    code = RABBIT
 
-
-class Rabbit(Agent):
     def __init__(self, images, simulation, pos=None, move=None):
         super().__init__(images, simulation, pos, move)
-        self.species = "rabbit"
+
+    def reset(self):
         self.energy = self.config.rabbit_start_energy
+        # reproduction is a rare per-tick chance, so it's scheduled rather than checked every tick
+        self.schedule(self.config.rabbit_reproduction_prob, self.give_birth)
 
     def starting(self):
         self.species = "rabbit"
-        angle = random.uniform(0, 360)
+        angle = self.random.angle()
         self.move = Vector2(1, 0).rotate(angle) * self.config.movement_speed
 
     def change_position(self):
         # Move randomly
-        if random.random() < 0.1:
-            self.move = self.move.rotate(random.uniform(-30, 30))
+        if self.random.random() < 0.1:
+            self.move = self.move.rotate(self.random.uniform(-30, 30))
 
         self.pos += self.move
         self.there_is_no_escape()
 
-        # Hunt rabbits
-        neighbours = list(self.in_proximity_accuracy())
-        for agent, distance in neighbours:
-            if hasattr(agent, 'species') and agent.species == "grass":
-                if distance <= self.config.rabbit_feed_radius:
-                    agent.kill()
-                    self.energy += self.config.rabbit_energy_gain_on_eat
-                    # self.reproduce() could changed based on if we want rabbits to only reproduce after eating
-                    break
+        # Eat grass, once every rabbit has moved
+        if self.food is not None:
+            self.interactions.feed(self)
 
-        # Reproduction
-        if random.random() < self.config.rabbit_reproduction_prob:
-            self.reproduce()
+    def feed(self):
+        if self.food.consume(self.pos, self.config.rabbit_feed_radius):
+            self.energy += self.config.rabbit_energy_gain_on_eat
+            # self.reproduce() could changed based on if we want rabbits to only reproduce after eating
 
+    def give_birth(self):
+        self.reproduce()
+        self.schedule(self.config.rabbit_reproduction_prob, self.give_birth)
 
-class Fox(Agent):
-    def __init__(self, images, simulation, pos=None, move=None):
-        super().__init__(images, simulation, pos, move)
-        self.species = "fox"
+
+class Fox(TrackedAgent):
+    species = "fox"
+    code = FOX
+    prey = partitions(PREY[FOX])  # where to look for something to hunt
+
+    def reset(self):
         self.energy = self.config.fox_start_energy
+        # Energy loss and starvation: one energy per tick, worked out lazily by TrackedAgent
+        if self.config.fox_start_energy > 0:
+            self.energy_drain = 1
+        # random death, fired at the start of the tick it happens in
+        self.schedule(self.config.fox_death_prob, self.die)
 
     def starting(self):
         self.species = "fox"
         self.energy = self.config.fox_start_energy
-        angle = random.uniform(0, 360)
+        angle = self.random.angle()
         self.move = Vector2(1, 0).rotate(angle) * self.config.movement_speed
 
-    def change_position(self):
-        # Check for random death FIRST
-        if random.random() < self.config.fox_death_prob:
-            self.kill()
-            return
+    def die(self):
+        self.kill()
+
+    def intend(self):
+        # Hunt: the search stops at the first prey in reach, the catch is settled at the end of the tick
+        prey = self.first_neighbour(*self.prey, radius=self.config.fox_hunt_radius)
+        if prey is not None:
+            self.interactions.hunt(self, prey)
 
-        # Hunt rabbits
-        neighbours = list(self.in_proximity_accuracy())
+    def caught(self, prey):
+        self.energy += self.config.fox_energy_gain_on_eat
+        self.reproduce()
 
-        for agent, distance in neighbours:
-            if hasattr(agent, 'species') and agent.species == "rabbit":
-                if distance <= self.config.fox_hunt_radius:
-                    agent.kill()
-                    self.energy += self.config.fox_energy_gain_on_eat
-                    self.reproduce()
-                    break
+    def change_position(self):
+        if self.interactions.sequential:
+            # hunt during its own turn, before moving
+            self.intend()
 
         # Random movement
-        if random.random() < 0.15:
-            self.move = self.move.rotate(random.uniform(-45, 45))
+        if self.random.random() < 0.15:
+            self.move = self.move.rotate(self.random.uniform(-45, 45))
 
         self.pos += self.move
         self.there_is_no_escape()
 
-        # Energy loss and starvation
-        # this is the no energy model so we dont want this to run
-        if self.config.fox_start_energy > 0:
-            self.energy -= 1
-            if self.energy <= 0:
-                self.kill()
 
+class LotkaVolterraSimulation(TrackedSimulation):
+    tracker_class = PopulationTracker
 
-class LotkaVolterraSimulation(Simulation):
     def __init__(self, config):
         super().__init__(config)
-        self.tracker = PopulationTracker()
-        self.current_step = 0
-        self.simulation_ended = False
-
-    def tick(self):
-        # Record population every 5 steps
-        if self.current_step % 5 == 0:
-            extinct = self.tracker.record(self)
-            if extinct and not self.simulation_ended:
-                print("Population extinct! Generating plot...")
-                self.tracker.plot()
-                self.simulation_ended = True
-
-        super().tick()
-        self.current_step += 1
-
-    def end(self):
-        super().end()
-        if not self.simulation_ended:
-            print("\nSimulation ended normally. Generating plot...")
-            self.tracker.plot()
-
+        # grass doesn't regrow in this model
+        self.grass = GrassField(config, regrowth_prob=0)
 
 # Run simulation with population tracking
 if __name__ == "__main__":
@@ -223,30 +191,21 @@ if __name__ == "__main__":
             fox_energy_gain_on_eat=2,
             rabbit_start_energy=5,
             rabbit_energy_gain_on_eat=2,
-            rabbit_feed_radius=10
+            rabbit_feed_radius=10,
+            headless=True
         )
 
         simulation = LotkaVolterraSimulation(config)
         simulation.batch_spawn_agents(50, Rabbit, images=["images/rabbit.png"])
         simulation.batch_spawn_agents(10, Fox, images=["images/fox.png"])
-        simulation.batch_spawn_agents(30, Grass, images=["images/grass.png"])
+        simulation.grass.scatter(30)
         simulation.run()
 
-        df = pd.DataFrame(simulation.tracker.data)
-        if df.empty:
+        if len(simulation.tracker) == 0:
             print(f"Run {run}: No data collected, skipping.")
             continue
 
-        stats = {
-            "run": run,
-            "steps_survived": len(df),
-            "final_rabbits": df['rabbits'].iloc[-1],
-            "final_foxes": df['foxes'].iloc[-1],
-            "max_rabbits": df['rabbits'].max(),
-            "max_foxes": df['foxes'].max(),
-            "min_rabbits": df['rabbits'].min(),
-            "min_foxes": df['foxes'].min(),
-        }
+        stats = {"run": run, **simulation.tracker.get_summary()}
         all_stats.append(stats)
 
     # Combine all runs into a DataFrame and describe
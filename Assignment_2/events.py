@@ -0,0 +1,126 @@
+from dataclasses import dataclass
+import numpy as np
+import pandas as pd
+from checkpoint import continue_file
+
+# Verbosity levels
+OFF = 0  # nothing is recorded (batch sweeps)
+RECORD = 1  # events go into the ring buffer and, with a path, to the event file
+PRINT = 2  # like RECORD, and hunts/matings are also printed as they happen
+
+# Event kinds. DEATH, STARVATION and HUNTED are deaths, by cause; a HUNT row (the predator)
+# is followed by the HUNTED row of the prey it caught
+BIRTH, DEATH, HUNT, MATING, STARVATION, HUNTED = range(6)
+KINDS = ("birth", "death", "hunt", "mating", "starvation", "hunted")
+
+EVENT_DTYPE = np.dtype([
+    ("step", np.int64),
+    ("kind", np.uint8),
+    ("species", np.uint8),
+    ("agent", np.int64),
+    ("age", np.int32),
+])
+
+MESSAGES = {
+    HUNT: "{species} (age {age}) hunted a rabbit!",
+    MATING: "{species} (age {age}) found a mate and reproduced!",
+}
+
+
+@dataclass
+class EventLogConfig:
+    """Event log settings, mixed into the configs of the models that keep one"""
+
+    event_level: int = PRINT  # OFF, RECORD or PRINT (also print hunts/matings)
+    event_log_path: str | None = None  # Binary file the recorded events are written to
+
+
+class EventLog:
+    """
+    Typed simulation events (birth, death, hunt, mating, starvation, hunted) in a fixed-size ring buffer
+
+    Every event is one row of EVENT_DTYPE. With a path the buffer is appended to that
+    file in raw binary whenever it fills up and on close(); read it back with read_events().
+    Without a path the buffer is simply reused, so it holds the events since it last filled up.
+
+    Callers check `enabled` before recording, so at level OFF an event costs one attribute lookup.
+    """
+
+    def __init__(self, level=OFF, path=None, capacity=4096, species=("rabbit", "fox")):
+        self.level = level
+        self.enabled = level > OFF
+        self.path = path
+        self.species = species
+        self._species_codes = {name: code for code, name in enumerate(species)}
+        self.buffer = np.zeros(capacity, dtype=EVENT_DTYPE)
+        self.size = 0
+        self.total = 0
+        # created at the first flush, so a run resumed from a checkpoint can continue it
+        self._file = None
+        self._written = 0  # bytes in the event file
+
+    def record(self, kind, agent):
+        if self.size == len(self.buffer):
+            self.flush()
+        self.buffer[self.size] = (agent.shared.counter, kind, self._species_codes[agent.species], agent.id, agent.age)
+        self.size += 1
+        self.total += 1
+
+        if self.level >= PRINT and kind in MESSAGES:
+            print(MESSAGES[kind].format(species=agent.species, age=agent.age))
+
+    def flush(self):
+        """Write the buffered events to the file (if any) and start a new batch"""
+        if self.size and self.path and self.enabled:
+            if self._file is None:
+                self._open()
+            events = self.buffer[:self.size]
+            self._file.write(events.tobytes())
+            self._file.flush()
+            self._written += events.nbytes
+        self.size = 0
+
+    def _open(self):
+        # after close() or set_state() the file is carried on where it ends
+        self._file = open(self.path, "ab" if self._written else "wb")
+
+    def close(self):
+        if self.path and self.enabled:
+            if self._file is None:
+                self._open()
+            self.flush()
+            self._file.close()
+            self._file = None
+
+    def get_state(self):
+        """The buffered events and counters, and how much of the event file is written, for checkpoints"""
+        return {"buffer": self.buffer[:self.size].copy(), "total": self.total,
+                "path": self.path, "written": self._written}
+
+    def set_state(self, state):
+        """
+        Continue from get_state(): the checkpointed run's event file is cut back to
+        its size at the checkpoint, or that part of it is copied to this log's file
+        """
+        self.size = len(state["buffer"])
+        self.buffer[:self.size] = state["buffer"]
+        self.total = state["total"]
+        if self.path and self.enabled and state["written"]:
+            continue_file(state["path"], state["written"], self.path)
+            self._written = state["written"]
+
+    def to_frame(self):
+        """The events still in the buffer as a DataFrame with readable kind and species names"""
+        return _decode(self.buffer[:self.size], self.species)
+
+
+def read_events(path, species=("rabbit", "fox")):
+    """Load an event file written by EventLog as a DataFrame"""
+    return _decode(np.fromfile(path, dtype=EVENT_DTYPE), species)
+
+
+def _decode(events, species):
+    df = pd.DataFrame(events)
+    df["kind"] = pd.Categorical.from_codes(df["kind"], categories=KINDS)
+    df["species"] = pd.Categorical.from_codes(df["species"], categories=species)
+    return df
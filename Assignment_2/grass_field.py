@@ -0,0 +1,138 @@
+import numpy as np
+import pygame as pg
+
+GRASS_COLOUR = (40, 160, 40)
+
+
+class GrassField:
+    """
+    Grass as a raster resource instead of one agent per blade
+
+    The window is divided into square cells of config.grass_cell_size pixels and every
+    cell holds a number of blades. Each tick every blade sprouts a new one with
+    probability regrowth_prob (a Grass agent reproducing onto its own position), and
+    a config.grass_spread_prob share of the new blades lands in a neighbouring cell.
+    Rabbits eat with consume(), which looks up the cells around them instead of
+    scanning neighbours, and `total` is what gets reported to the tracker as the grass count.
+    """
+
+    def __init__(self, config, regrowth_prob, rng=None):
+        self.cell_size = config.grass_cell_size
+        self.spread_prob = config.grass_spread_prob
+        self.regrowth_prob = regrowth_prob
+        width, height = config.window.as_tuple()
+        self.rows = -(-height // self.cell_size)
+        self.cols = -(-width // self.cell_size)
+        self.amount = np.zeros((self.rows, self.cols), dtype=np.int64)
+        self.total = 0
+        self.rng = rng or np.random.default_rng(config.seed)
+
+    def scatter(self, count):
+        """Add count blades to uniformly random cells"""
+        cells = self.rng.integers(0, self.rows * self.cols, size=count)
+        np.add.at(self.amount.reshape(-1), cells, 1)
+        self.total += count
+
+    def step(self):
+        """Vectorized regrowth and spread of every cell"""
+        if self.regrowth_prob <= 0 or self.total == 0:
+            return
+        new = self.rng.binomial(self.amount, self.regrowth_prob)
+        if self.spread_prob > 0:
+            # spreading blades go to one of the 4 neighbouring cells, wrapping like the agents do
+            spreading = self.rng.binomial(new, self.spread_prob)
+            new -= spreading
+            direction = self.rng.integers(0, 4, size=spreading.shape)
+            for d, (dy, dx) in enumerate(((-1, 0), (1, 0), (0, -1), (0, 1))):
+                new += np.roll(np.where(direction == d, spreading, 0), (dy, dx), axis=(0, 1))
+        self.amount += new
+        self.total = int(self.amount.sum())
+
+    def consume(self, pos, radius):
+        """
+        Eat one blade from the nearest non-empty cell whose centre is within radius of pos
+        Returns True when something was eaten
+        """
+        size = self.cell_size
+        x0, x1 = max(int((pos.x - radius) // size), 0), min(int((pos.x + radius) // size) + 1, self.cols)
+        y0, y1 = max(int((pos.y - radius) // size), 0), min(int((pos.y + radius) // size) + 1, self.rows)
+        if x0 >= x1 or y0 >= y1:
+            return False
+        block = self.amount[y0:y1, x0:x1]
+        if not block.any():
+            return False
+
+        cy, cx = np.nonzero(block)
+        dx = (x0 + cx + 0.5) * size - pos.x
+        dy = (y0 + cy + 0.5) * size - pos.y
+        dist_sq = dx * dx + dy * dy
+        nearest = dist_sq.argmin()
+        if dist_sq[nearest] > radius * radius:
+            return False
+        block[cy[nearest], cx[nearest]] -= 1
+        self.total -= 1
+        return True
+
+    def consume_all(self, positions, radius, rng):
+        """
+        consume() for an (N, 2) array of positions at once, for the array engine
+        Every feeder eats one blade from the nearest non-empty cell in reach. When more
+        feeders go for a cell than it has blades, the winners are drawn at random with rng
+        and the others move on to their next nearest cell, until nobody has one left.
+        Returns a boolean mask of who ate.
+        """
+        fed = np.zeros(len(positions), dtype=bool)
+        if len(positions) == 0 or self.total == 0:
+            return fed
+
+        # every (feeder, cell) pair with the cell centre within radius, nearest first per feeder
+        size = self.cell_size
+        reach = int(radius // size) + 1
+        home_x = (positions[:, 0] // size).astype(np.int64)
+        home_y = (positions[:, 1] // size).astype(np.int64)
+        feeders, cells, dist_sq = [], [], []
+        for oy in range(-reach, reach + 1):
+            for ox in range(-reach, reach + 1):
+                x, y = home_x + ox, home_y + oy
+                d = ((x + 0.5) * size - positions[:, 0]) ** 2 + ((y + 0.5) * size - positions[:, 1]) ** 2
+                valid = np.flatnonzero((x >= 0) & (x < self.cols) & (y >= 0) & (y < self.rows)
+                                       & (d <= radius * radius))
+                feeders.append(valid)
+                cells.append(y[valid] * self.cols + x[valid])
+                dist_sq.append(d[valid])
+        feeders, cells, dist_sq = np.concatenate(feeders), np.concatenate(cells), np.concatenate(dist_sq)
+        amount = self.amount.reshape(-1)
+        has_grass = amount[cells] > 0
+        feeders, cells, dist_sq = feeders[has_grass], cells[has_grass], dist_sq[has_grass]
+        order = np.lexsort((dist_sq, feeders))
+        feeders, cells = feeders[order], cells[order]
+
+        while len(feeders):
+            # each feeder tries its nearest cell that still has grass
+            first = np.flatnonzero(np.r_[True, feeders[1:] != feeders[:-1]])
+            round_feeders, round_cells = feeders[first], cells[first]
+            # random order within a cell, then the first `amount` of them get a blade
+            shuffle = rng.permutation(len(round_cells))
+            round_feeders, round_cells = round_feeders[shuffle], round_cells[shuffle]
+            by_cell = np.argsort(round_cells, kind="stable")
+            round_feeders, round_cells = round_feeders[by_cell], round_cells[by_cell]
+            starts = np.flatnonzero(np.r_[True, round_cells[1:] != round_cells[:-1]])
+            rank = np.arange(len(round_cells)) - np.repeat(starts, np.diff(np.r_[starts, len(round_cells)]))
+            eats = rank < amount[round_cells]
+            fed[round_feeders[eats]] = True
+            np.subtract.at(amount, round_cells[eats], 1)
+
+            # drop the feeders that ate and the cells that ran out
+            left = ~fed[feeders] & (amount[cells] > 0)
+            feeders, cells = feeders[left], cells[left]
+
+        self.total -= int(fed.sum())
+        return fed
+
+    def draw(self, screen):
+        """Draw every cell that has grass in it"""
+        colours = np.zeros((self.cols, self.rows, 3), dtype=np.uint8)
+        colours[self.amount.T > 0] = GRASS_COLOUR
+        surface = pg.surfarray.make_surface(colours)
+        surface.set_colorkey((0, 0, 0))
+        screen.blit(pg.transform.scale(surface, (self.cols * self.cell_size, self.rows * self.cell_size)), (0, 0))
@@ -0,0 +1,22 @@
+import os
+import sys
+
+# HeadlessCapableSimulation is shared by the assignments, from common/headless.py
+# in the repository root
+_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _root not in sys.path:
+    sys.path.insert(0, _root)
+
+from common.headless import HeadlessCapableSimulation as _HeadlessCapableSimulation
+from rng import BlockRandom
+
+
+class HeadlessCapableSimulation(_HeadlessCapableSimulation):
+    """
+    common.headless.HeadlessCapableSimulation plus `random`, the simulation's BlockRandom,
+    seeded from config.seed, for agents to draw their behaviour from
+    """
+
+    def __init__(self, config):
+        super().__init__(config)
+        self.random = BlockRandom(config.seed)
@@ -1,14 +1,24 @@
 from dataclasses import dataclass
-from vi import Agent, Config, Simulation
+from vi import Config
 from pygame.math import Vector2
-import random
+from operator import attrgetter
 import matplotlib
 matplotlib.use('Agg')  # Use non-interactive backend to avoid Tkinter issues
 import matplotlib.pyplot as plt
-import pandas as pd
+import numpy as np
+from lotka_volterra import RunConfig, TrackedSimulation
+import checkpoint
+from grass_field import GrassField
+import events
+from events import EventLog, EventLogConfig
+from array_engine import ArrayLotkaVolterraSimulation
+import tracker
+from tracker import TrackedAgent
+from species import RABBIT, FOX, SEXES, PREY, partitions, mate_partitions
+from replicates import run_replicates, run_forked_replicates
 
 @dataclass
-class LotkaVolterraConfig(Config):
+class LotkaVolterraConfig(RunConfig, EventLogConfig, Config):
     fox_death_prob: float = 0.01
     fox_hunt_radius: float = 10
     movement_speed: float = 2.0
@@ -20,33 +30,34 @@ class LotkaVolterraConfig(Config):
     rabbit_energy_gain_on_eat: int = 0
     rabbit_feed_radius: int = 10
     grass_reproduction_prob: float = 0.005
+    grass_cell_size: int = 5  # Side of a grass field cell in pixels
+    grass_spread_prob: float = 0.0  # Share of new grass that grows into a neighbouring cell
     mating_radius: float = 30.0  # Add mating radius
     max_age: int = 200  # Maximum age before natural death
     # Disable metrics to avoid polars error
     enable_logging: bool = False
     enable_recording: bool = False
-    duration: int = 15000  # Simulation duration in steps
 
 
-class PopulationTracker:
-    def __init__(self):
-        self.data = []
-        self.step = 0
+class PopulationTracker(tracker.PopulationTracker):
+    def __init__(self, capacity=1024):
+        super().__init__(
+            species=("rabbit", "fox", "grass"),
+            columns={'step': np.int64, 'rabbits': np.int64, 'foxes': np.int64, 'grass': np.int64,
+                     'avg_rabbit_age': np.float64, 'avg_fox_age': np.float64},
+            capacity=capacity)
 
     def record(self, simulation):
         """Record current population counts"""
-        rabbit_count = sum(1 for agent in simulation._agents if hasattr(agent, 'species') and agent.species == "rabbit")
-        fox_count = sum(1 for agent in simulation._agents if hasattr(agent, 'species') and agent.species == "fox")
-        grass_count = sum(1 for agent in simulation._agents if hasattr(agent, 'species') and agent.species == "grass")
+        rabbit_count = self.counts["rabbit"]
+        fox_count = self.counts["fox"]
+        grass_count = self.counts["grass"]
 
-        # Calculate average ages
-        rabbit_ages = [agent.age for agent in simulation._agents if hasattr(agent, 'species') and agent.species == "rabbit" and hasattr(agent, 'age')]
-        fox_ages = [agent.age for agent in simulation._agents if hasattr(agent, 'species') and agent.species == "fox" and hasattr(agent, 'age')]
-        
-        avg_rabbit_age = sum(rabbit_ages) / len(rabbit_ages) if rabbit_ages else 0
-        avg_fox_age = sum(fox_ages) / len(fox_ages) if fox_ages else 0
+        # Average ages from the running age sums
+        avg_rabbit_age = self.average_age("rabbit")
+        avg_fox_age = self.average_age("fox")
 
-        self.data.append({
+        self.append({
             'step': self.step,
             'rabbits': rabbit_count,
             'foxes': fox_count,
@@ -60,25 +71,13 @@ class PopulationTracker:
         if self.step % 20 == 0:
             print(f"Step {self.step}: Rabbits={rabbit_count} (avg age: {avg_rabbit_age:.1f}), Foxes={fox_count} (avg age: {avg_fox_age:.1f}), Grass={grass_count}")
 
-        # Check if population is extinct
-        if rabbit_count == 0 and fox_count == 0:
-            print("Both populations extinct!")
-            return True
-        elif rabbit_count == 0:
-            print("All rabbits extinct!")
-            return True
-        elif fox_count == 0:
-            print("All foxes extinct!")
-            return True
-        return False
-
     def plot(self):
         """Create simple population dynamics plot"""
-        if not self.data:
+        if len(self) == 0:
             print("No data to plot!")
             return
 
-        df = pd.DataFrame(self.data)
+        df = self.to_frame()
         print(f"Plotting {len(df)} data points...")
 
         # Create single plot
@@ -118,220 +117,250 @@ class PopulationTracker:
         print(f"Grass - Max: {df['grass'].max()}, Min: {df['grass'].min()}, Final: {df['grass'].iloc[-1]}")
 
 
-class Grass(Agent):
-    def __init__(self, images, simulation, pos=None, move=None):
-        super().__init__(images, simulation, pos, move)
-        self.species = "grass"
-
-    def starting(self):
-        self.species = "grass"
-        angle = random.uniform(0, 360)
-        self.move = Vector2(0, 0).rotate(angle) * 0
+class Rabbit(TrackedAgent):
+    species = "rabbit"
+    code = RABBIT
+    mates = mate_partitions(RABBIT)  # where to look for a mate, by own sex
+    snapshot_attributes = ("sex",)
 
-    def change_position(self):
-        # Grass reproduction
-        if random.random() < self.config.grass_reproduction_prob:
-            self.reproduce()
-
-
-class Rabbit(Agent):
     def __init__(self, images, simulation, pos=None, move=None):
         super().__init__(images, simulation, pos, move)
-        self.species = "rabbit"
-        self.sex = random.choice(["male", "female"])  
+        self.events = simulation.events
+
+    def reset(self):
+        self.sex = self.random.choice(SEXES)  
         self.age = 0  
         self.energy = self.config.rabbit_start_energy  
+        # Energy loss and starvation: one energy per tick, worked out lazily by TrackedAgent
+        if self.config.rabbit_start_energy > 0:
+            self.energy_drain = 1
+        # ageing, death and reproduction are rare per-tick chances, so they're scheduled
+        self.schedule(0.1, self.grow_older)  # Age every 10 ticks instead of 2
+        self.schedule(self.death_prob(), self.die)
+        self.schedule(self.reproduction_prob(), self.mate)
 
     def starting(self):
         self.species = "rabbit"
-        self.sex = random.choice(["male", "female"])  
+        self.sex = self.random.choice(SEXES)  
         self.age = 0  
         self.energy = self.config.rabbit_start_energy  
-        angle = random.uniform(0, 360)
+        angle = self.random.angle()
         self.move = Vector2(1, 0).rotate(angle) * self.config.movement_speed
 
-    def change_position(self):
-        # Age the rabbit much slower
-        if random.random() < 0.1:  # Age every 10 ticks instead of 2
-            self.age += 1
-
+    def death_prob(self):
         # Much lower age-based death probability 
-        age_death_prob = min(0.001, self.age / self.config.max_age * 0.01)
-        if random.random() < age_death_prob:
-            self.kill()
-            return
+        return min(0.001, self.age / self.config.max_age * 0.01)
+
+    def reproduction_prob(self):
+        # Age-based reproduction probability 
+        if self.age < 10:  # Too young 
+            return 0
+        elif self.age > 80:  # Too old
+            return self.config.rabbit_reproduction_prob * 0.5
+        else:  # Prime reproductive age
+            return self.config.rabbit_reproduction_prob * 1.2
+
+    def grow_older(self):
+        death_prob, reproduction_prob = self.death_prob(), self.reproduction_prob()
+        self.age += 1
+        self.schedule(0.1, self.grow_older)
+
+        # waiting times are memoryless, so a changed probability just needs a fresh one
+        if self.death_prob() != death_prob:
+            self.schedule(self.death_prob(), self.die)
+        if self.reproduction_prob() != reproduction_prob:
+            self.schedule(self.reproduction_prob(), self.mate)
 
+    def die(self):
+        if self.events.enabled:
+            self.events.record(events.DEATH, self)
+        self.kill()
+
+    def starve(self):
+        if self.events.enabled:
+            self.events.record(events.STARVATION, self)
+        self.kill()
+
+    def mate(self):
+        self.schedule(self.reproduction_prob(), self.mate)
+
+        # Sexual reproduction - look for opposite sex mate
+        mate = self.first_neighbour(*self.mates[self.sex], radius=self.config.mating_radius)
+        if mate is not None:
+            # Found a mate! Reproduce once the tick's pairs are settled
+            self.interactions.mate(self, mate)
+
+    def mated(self, partner):
+        offspring = self.reproduce()
+        if self.events.enabled:
+            self.events.record(events.MATING, self)
+            self.events.record(events.BIRTH, offspring)
+
+    def change_position(self):
         # Age-based movement speed 
         age_factor = max(0.2, 1 - (self.age / self.config.max_age) * 0.8)
         current_speed = self.config.movement_speed * age_factor
 
         # Move randomly
-        if random.random() < 0.1:
-            self.move = self.move.rotate(random.uniform(-30, 30))
+        if self.random.random() < 0.1:
+            self.move = self.move.rotate(self.random.uniform(-30, 30))
 
         # Update movement with age-adjusted speed
         self.move = self.move.normalize() * current_speed
         self.pos += self.move
         self.there_is_no_escape()
 
-        # Feed on grass 
-        neighbours = list(self.in_proximity_accuracy())
-        for agent, distance in neighbours:
-            if hasattr(agent, 'species') and agent.species == "grass":
-                if distance <= self.config.rabbit_feed_radius:
-                    agent.kill()
-                    self.energy += self.config.rabbit_energy_gain_on_eat
-                    break
+        # Feed on grass, once every rabbit has moved
+        if self.food is not None:
+            self.interactions.feed(self)
 
-        # Age-based reproduction probability 
-        if self.age < 10:  # Too young 
-            reproduction_prob = 0
-        elif self.age > 80:  # Too old
-            reproduction_prob = self.config.rabbit_reproduction_prob * 0.5
-        else:  # Prime reproductive age
-            reproduction_prob = self.config.rabbit_reproduction_prob * 1.2
+    def feed(self):
+        if self.food.consume(self.pos, self.config.rabbit_feed_radius):
+            self.energy += self.config.rabbit_energy_gain_on_eat
 
-        # Sexual reproduction - look for opposite sex mate
-        if random.random() < reproduction_prob:
-            for agent, distance in neighbours:
-                if (hasattr(agent, 'species') and agent.species == "rabbit" and 
-                    hasattr(agent, 'sex') and agent.sex != self.sex and
-                    distance <= self.config.mating_radius):
-                    # Found a mate! Reproduce
-                    print(f"{self.species} (age {self.age}) found a mate and reproduced!")
-                    offspring = self.reproduce()
-                    if offspring:
-                        offspring.age = 0  # Offspring starts at age 0
-                        offspring.energy = self.config.rabbit_start_energy  # Reset energy
-                    break
-
-        # Energy loss and starvation 
-        if self.config.rabbit_start_energy > 0:
-            self.energy -= 1
-            if self.energy <= 0:
-                self.kill()
 
+class Fox(TrackedAgent):
+    species = "fox"
+    code = FOX
+    prey = partitions(PREY[FOX], sexed=True)  # where to look for something to hunt
+    mates = mate_partitions(FOX)  # where to look for a mate, by own sex
+    snapshot_attributes = ("sex", "has_hunted")
 
-class Fox(Agent):
     def __init__(self, images, simulation, pos=None, move=None):
         super().__init__(images, simulation, pos, move)
-        self.species = "fox"
-        self.sex = random.choice(["male", "female"])  
+        self.events = simulation.events
+
+    def reset(self):
+        self.sex = self.random.choice(SEXES)  
         self.energy = self.config.fox_start_energy  
+        # Energy loss and starvation: one energy per tick, worked out lazily by TrackedAgent
+        if self.config.fox_start_energy > 0:
+            self.energy_drain = 1
         self.age = 0  
         self.has_hunted = False  
+        # ageing, death and reproduction are rare per-tick chances, so they're scheduled
+        self.schedule(0.1, self.grow_older)  # Age every 10 ticks instead of 2
+        self.schedule(self.death_prob(), self.die)
+        self.schedule(self.reproduction_prob(), self.mate)
+
     def starting(self):
         self.species = "fox"
-        self.sex = random.choice(["male", "female"]) 
+        self.sex = self.random.choice(SEXES) 
         self.energy = self.config.fox_start_energy
         self.age = 0  
         self.has_hunted = False  
-        angle = random.uniform(0, 360)
+        angle = self.random.angle()
         self.move = Vector2(1, 0).rotate(angle) * self.config.movement_speed
 
-    def change_position(self):
-        # Age the fox much slower
-        if random.random() < 0.1:  # Age every 10 ticks instead of 2
-            self.age += 1
-
+    def death_prob(self):
         # Much lower age-based death probability
         age_death_prob = min(0.002, self.age / self.config.max_age * 0.02)
-        base_death_prob = self.config.fox_death_prob + age_death_prob
-
-        if random.random() < base_death_prob:
-            self.kill()
-            return
-
-        # Age-based movement speed and hunting ability
-        age_factor = max(0.2, 1 - (self.age / self.config.max_age) * 0.8)
-        current_speed = self.config.movement_speed * age_factor
-        current_hunt_radius = self.config.fox_hunt_radius * age_factor
-
-        # Hunt rabbits
-        neighbours = list(self.in_proximity_accuracy())
-
-        for agent, distance in neighbours:
-            if hasattr(agent, 'species') and agent.species == "rabbit":
-                if distance <= current_hunt_radius:
-                    agent.kill()
-                    print(f"{self.species} (age {self.age}) hunted a rabbit!")
-                    self.energy += self.config.fox_energy_gain_on_eat
-                    self.has_hunted = True  
-                    break
+        return self.config.fox_death_prob + age_death_prob
 
+    def reproduction_prob(self):
         # Age-based reproduction probability 
         if self.age < 10:  # Too young
-            reproduction_prob = 0
+            return 0
         elif self.age > 100:  # Too old
-            reproduction_prob = self.config.fox_reproduction_prob * 0.5
+            return self.config.fox_reproduction_prob * 0.5
         else:  # Prime reproductive age
-            reproduction_prob = self.config.fox_reproduction_prob
+            return self.config.fox_reproduction_prob
+
+    def grow_older(self):
+        death_prob, reproduction_prob = self.death_prob(), self.reproduction_prob()
+        self.age += 1
+        self.schedule(0.1, self.grow_older)
+
+        # waiting times are memoryless, so a changed probability just needs a fresh one
+        if self.death_prob() != death_prob:
+            self.schedule(self.death_prob(), self.die)
+        if self.reproduction_prob() != reproduction_prob:
+            self.schedule(self.reproduction_prob(), self.mate)
+
+    def die(self):
+        if self.events.enabled:
+            self.events.record(events.DEATH, self)
+        self.kill()
+
+    def starve(self):
+        if self.events.enabled:
+            self.events.record(events.STARVATION, self)
+        self.kill()
+
+    def mate(self):
+        self.schedule(self.reproduction_prob(), self.mate)
 
         # Sexual reproduction - uses persistent has_hunted status
         if self.has_hunted == True:  # fox has hunted at least once in their lifetime
-            if random.random() < reproduction_prob:
-                for agent, distance in neighbours:
-                    if (hasattr(agent, 'species') and agent.species == "fox" and 
-                        hasattr(agent, 'sex') and agent.sex != self.sex and
-                        distance <= self.config.mating_radius):
-                        # Found a mate! Reproduce
-                        offspring = self.reproduce()
-                        if offspring:
-                            offspring.age = 0  # Offspring starts at age 0
-                            offspring.has_hunted = False  # Offspring hasn't hunted yet
-                            offspring.energy = self.config.fox_start_energy  # Reset energy
-                        print(f"{self.species} (age {self.age}) found a mate and reproduced!")
-                        break
+            mate = self.first_neighbour(*self.mates[self.sex], radius=self.config.mating_radius)
+            if mate is not None:
+                # Found a mate! Reproduce once the tick's pairs are settled
+                self.interactions.mate(self, mate)
+
+    def mated(self, partner):
+        offspring = self.reproduce()
+        if self.events.enabled:
+            self.events.record(events.MATING, self)
+            self.events.record(events.BIRTH, offspring)
+
+    def age_factor(self):
+        # Age-based movement speed and hunting ability
+        return max(0.2, 1 - (self.age / self.config.max_age) * 0.8)
+
+    def intend(self):
+        current_hunt_radius = self.config.fox_hunt_radius * self.age_factor()
+
+        # Hunt: the search stops at the first prey in reach, the catch is settled at the end of the tick
+        prey = self.first_neighbour(*self.prey, radius=current_hunt_radius)
+        if prey is not None:
+            self.interactions.hunt(self, prey)
+
+    def caught(self, prey):
+        if self.events.enabled:
+            self.events.record(events.HUNT, self)
+            self.events.record(events.HUNTED, prey)
+        self.energy += self.config.fox_energy_gain_on_eat
+        self.has_hunted = True  
+
+    def change_position(self):
+        if self.interactions.sequential:
+            # hunt during its own turn, before moving
+            self.intend()
+
+        current_speed = self.config.movement_speed * self.age_factor()
 
         # Random movement with age-adjusted speed
-        if random.random() < 0.15:
-            self.move = self.move.rotate(random.uniform(-45, 45))
+        if self.random.random() < 0.15:
+            self.move = self.move.rotate(self.random.uniform(-45, 45))
 
         self.move = self.move.normalize() * current_speed
         self.pos += self.move
         self.there_is_no_escape()
 
-        # Energy loss and starvation (from both files)
-        if self.config.fox_start_energy > 0:
-            self.energy -= 1
-            if self.energy <= 0:
-                self.kill()
 
+class LotkaVolterraSimulation(TrackedSimulation):
+    tracker_class = PopulationTracker
+    partition = attrgetter("code", "sex")
 
-class LotkaVolterraSimulation(Simulation):
     def __init__(self, config):
         super().__init__(config)
-        self.tracker = PopulationTracker()
-        self.current_step = 0
-        self.simulation_ended = False
-
-    def tick(self):
-        # Record population every 5 steps
-        if self.current_step % 5 == 0:
-            extinct = self.tracker.record(self)
-            if extinct and not self.simulation_ended:
-                print("Population extinct! Generating plot...")
-                self.tracker.plot()
-                self.simulation_ended = True
+        self.grass = GrassField(config, regrowth_prob=config.grass_reproduction_prob)
+        self.events = EventLog(config.event_level, config.event_log_path)
 
+    def update_agents(self):
         # Call parent tick but skip metrics if they cause issues
         try:
-            super().tick()
+            super().update_agents()
         except Exception as e:
             if "polars" in str(e).lower() or "dataframe" in str(e).lower():
                 # Skip metrics-related errors and continue simulation
                 pass
             else:
                 raise e
-            
-        self.current_step += 1
-
-    def end(self):
-        super().end()
-        if not self.simulation_ended:
-            print("\nSimulation ended normally. Generating plot...")
-            self.tracker.plot()
 
+    def plot(self):
+        # the lifecycle plots are saved, never shown
+        self.tracker.plot()
 
 # Run simulation with both sexual reproduction and energy concepts
 if __name__ == "__main__":
@@ -356,10 +385,17 @@ if __name__ == "__main__":
         duration=1000
     )
 
-    simulation = LotkaVolterraSimulation(config)
-    simulation.batch_spawn_agents(100, Rabbit, images=["images/rabbit.png"])  
-    simulation.batch_spawn_agents(20, Fox, images=["images/fox.png"])
-    simulation.batch_spawn_agents(50, Grass, images=["images/grass.png"])
+    engine = "agent"  # Change to "numpy" for the array-backed engine (scales to 100k+ agents)
+
+    if engine == "numpy":
+        simulation = ArrayLotkaVolterraSimulation(
+            config, PopulationTracker(capacity=config.duration // config.record_interval + 1))
+        simulation.batch_spawn(rabbits=100, foxes=20, grass=50)
+    else:
+        simulation = LotkaVolterraSimulation(config)
+        simulation.batch_spawn_agents(100, Rabbit, images=["images/rabbit.png"])  
+        simulation.batch_spawn_agents(20, Fox, images=["images/fox.png"])
+        simulation.grass.scatter(50)
     simulation.run()
 
     # Ensure plot is generated even if end() wasn't called
@@ -368,60 +404,71 @@ if __name__ == "__main__":
         simulation.tracker.plot()
 
 
-def run_multiple_simulations(n_runs=10):
-    all_results = []
-
-    for run in range(n_runs):
-        print(f"\n--- Running simulation {run + 1}/{n_runs} ---")
-
-        config = LotkaVolterraConfig(
-            movement_speed=2.0,
-            fox_death_prob=0.0005,
-            fox_hunt_radius=50,
-            rabbit_reproduction_prob=0.01,
-            fox_reproduction_prob=0.05,
-            mating_radius=40.0,
-            fox_start_energy=1000,
-            fox_energy_gain_on_eat=500,
-            rabbit_start_energy=800,
-            rabbit_energy_gain_on_eat=400,
-            rabbit_feed_radius=15,
-            grass_reproduction_prob=0.01,
-            max_age=200,
-            enable_logging=False,
-            enable_recording=False,
-            duration=1000
-        )
-
-        sim = LotkaVolterraSimulation(config)
-        sim.batch_spawn_agents(100, Rabbit, images=["images/rabbit.png"])
-        sim.batch_spawn_agents(20, Fox, images=["images/fox.png"])
-        sim.batch_spawn_agents(50, Grass, images=["images/grass.png"])
-        sim.run()
-
-        # Extract population data
-        df = pd.DataFrame(sim.tracker.data)
-        steps_survived = len(df)
-        final_rabbits = df['rabbits'].iloc[-1]
-        final_foxes = df['foxes'].iloc[-1]
-        max_rabbits = df['rabbits'].max()
-        max_foxes = df['foxes'].max()
-        min_rabbits = df['rabbits'].min()
-        min_foxes = df['foxes'].min()
-
-        all_results.append({
-            'run': run + 1,
-            'steps_survived': steps_survived,
-            'final_rabbits': final_rabbits,
-            'final_foxes': final_foxes,
-            'max_rabbits': max_rabbits,
-            'max_foxes': max_foxes,
-            'min_rabbits': min_rabbits,
-            'min_foxes': min_foxes,
-        })
+def replicate_config(seed=None):
+    return LotkaVolterraConfig(
+        seed=seed,
+        movement_speed=2.0,
+        fox_death_prob=0.0005,
+        fox_hunt_radius=50,
+        rabbit_reproduction_prob=0.01,
+        fox_reproduction_prob=0.05,
+        mating_radius=40.0,
+        fox_start_energy=1000,
+        fox_energy_gain_on_eat=500,
+        rabbit_start_energy=800,
+        rabbit_energy_gain_on_eat=400,
+        rabbit_feed_radius=15,
+        grass_reproduction_prob=0.01,
+        max_age=200,
+        enable_logging=False,
+        enable_recording=False,
+        duration=1000,
+        event_level=events.OFF,
+        headless=True
+    )
+
+
+def run_simulation_once(seed=None, run_id=None):
+    sim = LotkaVolterraSimulation(replicate_config(seed))
+    sim.batch_spawn_agents(100, Rabbit, images=["images/rabbit.png"])
+    sim.batch_spawn_agents(20, Fox, images=["images/fox.png"])
+    sim.grass.scatter(50)
+    sim.run()
+
+    return sim.tracker.get_summary()
+
+
+BURN_IN_TICKS = 200  # Steps the initial population needs to spread out
+
+
+def burn_in(seed=0, ticks=BURN_IN_TICKS):
+    """Run the transient of a replicate once and return its snapshot, for run_forked_replicates"""
+    sim = LotkaVolterraSimulation(replicate_config(seed))
+    sim.batch_spawn_agents(100, Rabbit, images=["images/rabbit.png"])
+    sim.batch_spawn_agents(20, Fox, images=["images/fox.png"])
+    sim.grass.scatter(50)
+    while sim.current_step < ticks and sim.tracker.stop_reason is None:
+        sim.tick()
+    return checkpoint.snapshot(sim)
+
+
+def run_simulation_from(snapshot, seed=None, run_id=None):
+    """Continue a burn-in snapshot as one replicate with its own seed"""
+    sim = LotkaVolterraSimulation(replicate_config(seed))
+    checkpoint.restore(sim, snapshot, [(Rabbit, ["images/rabbit.png"]), (Fox, ["images/fox.png"])])
+    checkpoint.reseed(sim, seed)
+    sim.run()
+
+    return sim.tracker.get_summary()
+
 
-    # Convert to DataFrame and print stats
-    summary_df = pd.DataFrame(all_results)
+def run_multiple_simulations(n_runs=10, processes=None, forked=False):
+    # replicates run in parallel, one process per core unless processes is given.
+    # forked=True runs the first BURN_IN_TICKS steps once and continues every replicate from there
+    if forked:
+        summary_df = run_forked_replicates(burn_in, run_simulation_from, n_runs, base_seed=0, processes=processes)
+    else:
+        summary_df = run_replicates(run_simulation_once, n_runs, base_seed=0, processes=processes)
     print("\n=== Summary Statistics ===")
     print(summary_df.describe())
 
@@ -1,14 +1,21 @@
 from dataclasses import dataclass
-from vi import Agent, Config, Simulation
+from vi import Config
 from pygame.math import Vector2
-import random
+from operator import attrgetter
 import matplotlib
 matplotlib.use('Agg')  # Use non-interactive backend to avoid Tkinter issues
 import matplotlib.pyplot as plt
+import numpy as np
 import pandas as pd
+from lotka_volterra import RunConfig, TrackedSimulation
+import events
+from events import EventLog, EventLogConfig
+import tracker
+from tracker import TrackedAgent
+from species import RABBIT, FOX, SEXES, PREY, partitions, mate_partitions
 
 @dataclass
-class LotkaVolterraConfig(Config):
+class LotkaVolterraConfig(RunConfig, EventLogConfig, Config):
     fox_death_prob: float = 0.01
     fox_hunt_radius: float = 10
     movement_speed: float = 2.0
@@ -21,27 +28,26 @@ class LotkaVolterraConfig(Config):
     # Disable metrics to avoid polars error
     enable_logging: bool = False
     enable_recording: bool = False
-    duration: int = 15000  # Simulation duration in steps
 
 
-class PopulationTracker:
-    def __init__(self):
-        self.data = []
-        self.step = 0
+class PopulationTracker(tracker.PopulationTracker):
+    def __init__(self, capacity=1024):
+        super().__init__(
+            species=("rabbit", "fox"),
+            columns={'step': np.int64, 'rabbits': np.int64, 'foxes': np.int64,
+                     'avg_rabbit_age': np.float64, 'avg_fox_age': np.float64},
+            capacity=capacity)
 
     def record(self, simulation):
         """Record current population counts"""
-        rabbit_count = sum(1 for agent in simulation._agents if hasattr(agent, 'species') and agent.species == "rabbit")
-        fox_count = sum(1 for agent in simulation._agents if hasattr(agent, 'species') and agent.species == "fox")
+        rabbit_count = self.counts["rabbit"]
+        fox_count = self.counts["fox"]
 
-        # Calculate average ages
-        rabbit_ages = [agent.age for agent in simulation._agents if hasattr(agent, 'species') and agent.species == "rabbit" and hasattr(agent, 'age')]
-        fox_ages = [agent.age for agent in simulation._agents if hasattr(agent, 'species') and agent.species == "fox" and hasattr(agent, 'age')]
-        
-        avg_rabbit_age = sum(rabbit_ages) / len(rabbit_ages) if rabbit_ages else 0
-        avg_fox_age = sum(fox_ages) / len(fox_ages) if fox_ages else 0
+        # Average ages from the running age sums
+        avg_rabbit_age = self.average_age("rabbit")
+        avg_fox_age = self.average_age("fox")
 
-        self.data.append({
+        self.append({
             'step': self.step,
             'rabbits': rabbit_count,
             'foxes': fox_count,
@@ -54,25 +60,13 @@ class PopulationTracker:
         if self.step % 20 == 0:
             print(f"Step {self.step}: Rabbits={rabbit_count} (avg age: {avg_rabbit_age:.1f}), Foxes={fox_count} (avg age: {avg_fox_age:.1f})")
 
-        # Check if population is extinct
-        if rabbit_count == 0 and fox_count == 0:
-            print("Both populations extinct!")
-            return True
-        elif rabbit_count == 0:
-            print("All rabbits extinct!")
-            return True
-        elif fox_count == 0:
-            print("All foxes extinct!")
-            return True
-        return False
-
     def plot(self):
         """Create simple population dynamics plot"""
-        if not self.data:
+        if len(self) == 0:
             print("No data to plot!")
             return
 
-        df = pd.DataFrame(self.data)
+        df = self.to_frame()
         print(f"Plotting {len(df)} data points...")
 
         # Create single plot
@@ -97,186 +91,230 @@ class PopulationTracker:
         print(f"Foxes - Max: {df['foxes'].max()}, Min: {df['foxes'].min()}, Final: {df['foxes'].iloc[-1]}")
 
 
-class Rabbit(Agent):
+class Rabbit(TrackedAgent):
+    species = "rabbit"
+    code = RABBIT
+    mates = mate_partitions(RABBIT)  # where to look for a mate, by own sex
+    snapshot_attributes = ("sex",)
+
     def __init__(self, images, simulation, pos=None, move=None):
         super().__init__(images, simulation, pos, move)
-        self.species = "rabbit"
-        self.sex = random.choice(["male", "female"])
+        self.events = simulation.events
+
+    def reset(self):
+        self.sex = self.random.choice(SEXES)
         self.age = 0  # Add age tracking
+        # ageing, death and reproduction are rare per-tick chances, so they're scheduled
+        self.schedule(0.1, self.grow_older)  # Age every 10 ticks instead of 2
+        self.schedule(self.death_prob(), self.die)
+        self.schedule(self.reproduction_prob(), self.mate)
 
     def starting(self):
         self.species = "rabbit"
-        self.sex = random.choice(["male", "female"])
+        self.sex = self.random.choice(SEXES)
         self.age = 0
-        angle = random.uniform(0, 360)
+        angle = self.random.angle()
         self.move = Vector2(1, 0).rotate(angle) * self.config.movement_speed
 
-    def change_position(self):
-        # Age the rabbit much slower
-        if random.random() < 0.1:  # Age every 10 ticks instead of 2
-            self.age += 1
-
+    def death_prob(self):
         # Much lower age-based death probability
-        age_death_prob = min(0.001, self.age / self.config.max_age * 0.01)  # Reduced from 0.01 and 0.05
-        if random.random() < age_death_prob:
-            self.kill()
-            return
+        return min(0.001, self.age / self.config.max_age * 0.01)  # Reduced from 0.01 and 0.05
+
+    def reproduction_prob(self):
+        # Age-based reproduction probability (more forgiving age ranges)
+        if self.age < 10:  # Too young
+            return 0
+        elif self.age > 80:  # Too old
+            return self.config.rabbit_reproduction_prob * 0.5
+        else:  # Prime reproductive age
+            return self.config.rabbit_reproduction_prob * 1.2
+
+    def grow_older(self):
+        death_prob, reproduction_prob = self.death_prob(), self.reproduction_prob()
+        self.age += 1
+        self.schedule(0.1, self.grow_older)
 
+        # waiting times are memoryless, so a changed probability just needs a fresh one
+        if self.death_prob() != death_prob:
+            self.schedule(self.death_prob(), self.die)
+        if self.reproduction_prob() != reproduction_prob:
+            self.schedule(self.reproduction_prob(), self.mate)
+
+    def die(self):
+        if self.events.enabled:
+            self.events.record(events.DEATH, self)
+        self.kill()
+
+    def mate(self):
+        self.schedule(self.reproduction_prob(), self.mate)
+
+        # Sexual reproduction - look for opposite sex mate
+        mate = self.first_neighbour(*self.mates[self.sex], radius=self.config.mating_radius)
+        if mate is not None:
+            # Found a mate! Reproduce once the tick's pairs are settled
+            self.interactions.mate(self, mate)
+
+    def mated(self, partner):
+        offspring = self.reproduce()
+        if self.events.enabled:
+            self.events.record(events.MATING, self)
+            self.events.record(events.BIRTH, offspring)
+
+    def change_position(self):
         # Age-based movement speed (less penalty for aging)
         age_factor = max(0.2, 1 - (self.age / self.config.max_age) * 0.8)  # 20% to 100% efficiency
         current_speed = self.config.movement_speed * age_factor
 
         # Move randomly
-        if random.random() < 0.1:
-            self.move = self.move.rotate(random.uniform(-30, 30))
+        if self.random.random() < 0.1:
+            self.move = self.move.rotate(self.random.uniform(-30, 30))
 
         # Update movement with age-adjusted speed
         self.move = self.move.normalize() * current_speed
         self.pos += self.move
         self.there_is_no_escape()
 
-        # Age-based reproduction probability (more forgiving age ranges)
-        if self.age < 10:  # Too young 
-            reproduction_prob = 0
-        elif self.age > 80:  # Too old
-            reproduction_prob = self.config.rabbit_reproduction_prob * 0.5
-        else:  # Prime reproductive age
-            reproduction_prob = self.config.rabbit_reproduction_prob * 1.2
+class Fox(TrackedAgent):
+    species = "fox"
+    code = FOX
+    prey = partitions(PREY[FOX], sexed=True)  # where to look for something to hunt
+    mates = mate_partitions(FOX)  # where to look for a mate, by own sex
+    snapshot_attributes = ("sex", "has_hunted")
 
-        # Sexual reproduction - look for opposite sex mate
-        if random.random() < reproduction_prob:
-            neighbours = list(self.in_proximity_accuracy())
-            for agent, distance in neighbours:
-                if (hasattr(agent, 'species') and agent.species == "rabbit" and 
-                    hasattr(agent, 'sex') and agent.sex != self.sex and
-                    distance <= self.config.mating_radius):
-                    # Found a mate! Reproduce
-                    print(f"{self.species} (age {self.age}) found a mate and reproduced!")
-                    offspring = self.reproduce()
-                    if offspring:
-                        offspring.age = 0  # Offspring starts at age 0
-                    break
-
-class Fox(Agent):
     def __init__(self, images, simulation, pos=None, move=None):
         super().__init__(images, simulation, pos, move)
-        self.species = "fox"
-        self.sex = random.choice(["male", "female"])
+        self.events = simulation.events
+
+    def reset(self):
+        self.sex = self.random.choice(SEXES)
         self.energy = self.config.fox_start_energy
+        # Energy loss and starvation: one energy per tick, worked out lazily by TrackedAgent
+        if self.config.fox_start_energy > 0:
+            self.energy_drain = 1
         self.age = 0  # Add age tracking
         self.has_hunted = False  # Persistent hunting status
+        # ageing, death and reproduction are rare per-tick chances, so they're scheduled
+        self.schedule(0.1, self.grow_older)  # Age every 10 ticks instead of 2
+        self.schedule(self.death_prob(), self.die)
+        self.schedule(self.reproduction_prob(), self.mate)
 
     def starting(self):
         self.species = "fox"
-        self.sex = random.choice(["male", "female"])
+        self.sex = self.random.choice(SEXES)
         self.energy = self.config.fox_start_energy
         self.age = 0
         self.has_hunted = False  # Initialize hunting status
-        angle = random.uniform(0, 360)
+        angle = self.random.angle()
         self.move = Vector2(1, 0).rotate(angle) * self.config.movement_speed
 
-    def change_position(self):
-        # Age the fox much slower
-        if random.random() < 0.1:  # Age every 10 ticks instead of 2
-            self.age += 1
-
+    def death_prob(self):
         # Much lower age-based death probability
         age_death_prob = min(0.002, self.age / self.config.max_age * 0.02)  # Reduced from 0.02 and 0.08
-        base_death_prob = self.config.fox_death_prob + age_death_prob
-
-        if random.random() < base_death_prob:
-            self.kill()
-            return
-
-        # Age-based movement speed and hunting ability (less penalty)
-        age_factor = max(0.2, 1 - (self.age / self.config.max_age) * 0.8)  # 20% to 100% efficiency
-        current_speed = self.config.movement_speed * age_factor
-        current_hunt_radius = self.config.fox_hunt_radius * age_factor
-
-        # Hunt rabbits
-        neighbours = list(self.in_proximity_accuracy())
-
-        for agent, distance in neighbours:
-            if hasattr(agent, 'species') and agent.species == "rabbit":
-                if distance <= current_hunt_radius:
-                    agent.kill()
-                    print(f"{self.species} (age {self.age}) hunted a rabbit!")
-                    self.energy += self.config.fox_energy_gain_on_eat
-                    self.has_hunted = True  # Set persistent hunting status
-                    break
+        return self.config.fox_death_prob + age_death_prob
 
+    def reproduction_prob(self):
         # Age-based reproduction probability 
         if self.age < 10:  # Too young
-            reproduction_prob = 0
+            return 0
         elif self.age > 100:  # Too old
-            reproduction_prob = self.config.fox_reproduction_prob * 0.5
+            return self.config.fox_reproduction_prob * 0.5
         else:  # Prime reproductive age
-            reproduction_prob = self.config.fox_reproduction_prob
+            return self.config.fox_reproduction_prob
+
+    def grow_older(self):
+        death_prob, reproduction_prob = self.death_prob(), self.reproduction_prob()
+        self.age += 1
+        self.schedule(0.1, self.grow_older)
+
+        # waiting times are memoryless, so a changed probability just needs a fresh one
+        if self.death_prob() != death_prob:
+            self.schedule(self.death_prob(), self.die)
+        if self.reproduction_prob() != reproduction_prob:
+            self.schedule(self.reproduction_prob(), self.mate)
+
+    def die(self):
+        if self.events.enabled:
+            self.events.record(events.DEATH, self)
+        self.kill()
+
+    def starve(self):
+        if self.events.enabled:
+            self.events.record(events.STARVATION, self)
+        self.kill()
+
+    def mate(self):
+        self.schedule(self.reproduction_prob(), self.mate)
 
         # Sexual reproduction - now uses persistent has_hunted status
         if self.has_hunted == True:  # fox has hunted at least once in their lifetime
-            if random.random() < reproduction_prob:
-                for agent, distance in neighbours:
-                    if (hasattr(agent, 'species') and agent.species == "fox" and 
-                        hasattr(agent, 'sex') and agent.sex != self.sex and
-                        distance <= self.config.mating_radius):
-                        # Found a mate! Reproduce
-                        offspring = self.reproduce()
-                        if offspring:
-                            offspring.age = 0  # Offspring starts at age 0
-                            offspring.has_hunted = False  # Offspring hasn't hunted yet
-                        print(f"{self.species} (age {self.age}) found a mate and reproduced!")
-                        break
+            mate = self.first_neighbour(*self.mates[self.sex], radius=self.config.mating_radius)
+            if mate is not None:
+                # Found a mate! Reproduce once the tick's pairs are settled
+                self.interactions.mate(self, mate)
+
+    def mated(self, partner):
+        offspring = self.reproduce()
+        if self.events.enabled:
+            self.events.record(events.MATING, self)
+            self.events.record(events.BIRTH, offspring)
+
+    def age_factor(self):
+        # Age-based movement speed and hunting ability (less penalty)
+        return max(0.2, 1 - (self.age / self.config.max_age) * 0.8)  # 20% to 100% efficiency
+
+    def intend(self):
+        current_hunt_radius = self.config.fox_hunt_radius * self.age_factor()
+
+        # Hunt: the search stops at the first prey in reach, the catch is settled at the end of the tick
+        prey = self.first_neighbour(*self.prey, radius=current_hunt_radius)
+        if prey is not None:
+            self.interactions.hunt(self, prey)
+
+    def caught(self, prey):
+        if self.events.enabled:
+            self.events.record(events.HUNT, self)
+            self.events.record(events.HUNTED, prey)
+        self.energy += self.config.fox_energy_gain_on_eat
+        self.has_hunted = True  # Set persistent hunting status
+
+    def change_position(self):
+        if self.interactions.sequential:
+            # hunt during its own turn, before moving
+            self.intend()
+
+        current_speed = self.config.movement_speed * self.age_factor()
 
         # Random movement with age-adjusted speed
-        if random.random() < 0.15:
-            self.move = self.move.rotate(random.uniform(-45, 45))
+        if self.random.random() < 0.15:
+            self.move = self.move.rotate(self.random.uniform(-45, 45))
 
         self.move = self.move.normalize() * current_speed
         self.pos += self.move
         self.there_is_no_escape()
 
-        # Energy loss and starvation
-        if self.config.fox_start_energy > 0:
-            self.energy -= 1
-            if self.energy <= 0:
-                self.kill()
 
+class LotkaVolterraSimulation(TrackedSimulation):
+    tracker_class = PopulationTracker
+    partition = attrgetter("code", "sex")
 
-class LotkaVolterraSimulation(Simulation):
     def __init__(self, config):
         super().__init__(config)
-        self.tracker = PopulationTracker()
-        self.current_step = 0
-        self.simulation_ended = False
-
-    def tick(self):
-        # Record population every 5 steps
-        if self.current_step % 5 == 0:
-            extinct = self.tracker.record(self)
-            if extinct and not self.simulation_ended:
-                print("Population extinct! Generating plot...")
-                self.tracker.plot()
-                self.simulation_ended = True
+        self.events = EventLog(config.event_level, config.event_log_path)
 
+    def update_agents(self):
         # Call parent tick but skip metrics if they cause issues
         try:
-            super().tick()
+            super().update_agents()
         except Exception as e:
             if "polars" in str(e).lower() or "dataframe" in str(e).lower():
                 # Skip metrics-related errors and continue simulation
                 pass
             else:
                 raise e
-            
-        self.current_step += 1
-
-    def end(self):
-        super().end()
-        if not self.simulation_ended:
-            print("\nSimulation ended normally. Generating plot...")
-            self.tracker.plot()
 
+    def plot(self):
+        # the lifecycle plots are saved, never shown
+        self.tracker.plot()
 
 # Run simulation with sexual reproduction and aging
 if __name__ == "__main__":
@@ -298,7 +336,9 @@ if __name__ == "__main__":
             fox_energy_gain_on_eat=0,
             max_age=200,
             enable_logging=False,  # Disable metrics
-            enable_recording=False
+            enable_recording=False,
+            event_level=events.OFF,
+            headless=True
         )
 
         simulation = LotkaVolterraSimulation(config)
@@ -306,21 +346,11 @@ if __name__ == "__main__":
         simulation.batch_spawn_agents(20, Fox, images=["images/fox.png"])
         simulation.run()
 
-        df = pd.DataFrame(simulation.tracker.data)
-        if df.empty:
+        if len(simulation.tracker) == 0:
             print(f"Run {run}: No data collected, skipping.")
             continue
 
-        stats = {
-            "run": run,
-            "steps_survived": len(df),
-            "final_rabbits": df['rabbits'].iloc[-1],
-            "final_foxes": df['foxes'].iloc[-1],
-            "max_rabbits": df['rabbits'].max(),
-            "max_foxes": df['foxes'].max(),
-            "min_rabbits": df['rabbits'].min(),
-            "min_foxes": df['foxes'].min(),
-        }
+        stats = {"run": run, **simulation.tracker.get_summary()}
         all_stats.append(stats)
 
     stats_df = pd.DataFrame(all_stats)
@@ -0,0 +1,136 @@
+from dataclasses import dataclass
+from operator import attrgetter
+from headless import HeadlessCapableSimulation
+from spatial import SpatialHash
+from stopping import StopCriteria
+from scheduler import EventScheduler
+from pool import AgentPool
+from interactions import InteractionResolver
+import checkpoint
+
+
+@dataclass
+class RunConfig:
+    """
+    Run settings shared by the Lotka-Volterra models: length, recording, checkpoints and
+    stop criteria. Mixed into each model's config as LotkaVolterraConfig(RunConfig, Config).
+    """
+
+    duration: int = 15000  # Simulation duration in steps
+    headless: bool = False  # Run without a window, images or frame pacing (batch runs)
+    record_interval: int = 5  # Record population every N steps
+    output_path: str | None = None  # Stream recorded rows to this CSV instead of keeping them in memory
+    output_chunk_size: int = 1000  # Rows per chunk written to output_path
+    checkpoint_path: str | None = None  # Save the full simulation state here every checkpoint_interval steps
+    checkpoint_interval: int = 500  # Steps between checkpoints (resume a run with checkpoint.resume)
+    stop_on_extinction: str = "any"  # Stop when "any" or "all" of rabbits/foxes die out ("" never stops)
+    max_population: int = 0  # Stop when rabbits + foxes exceed this (0 disables)
+    steady_state_window: int = 0  # Stop when counts stay steady over this many records (0 disables)
+    steady_state_tolerance: float = 0.05  # Allowed spread within the window, as a fraction of the mean
+    interaction_order: str = "batched"  # "batched" (settled at the end of the tick) or "sequential" (in turn order)
+
+
+class TrackedSimulation(HeadlessCapableSimulation):
+    """
+    The tick, run and end of every Lotka-Volterra model
+
+    Each tick, in order: a checkpoint every checkpoint_interval steps, a tracker record
+    every record_interval steps (which ends the run if a stop criterion is met), the
+    scheduler's bulk events, every agent's intend(), vi's tick (the agents move and
+    after_update commits the interactions), recycling of the agents killed in it and
+    the grass growth. With interaction_order = "sequential" there is no intend() pass:
+    foxes hunt during their own turn and every interaction applies when it is made.
+
+    Subclasses set `tracker_class`, their PopulationTracker, and `partition`, the key
+    agents are filed under in the SpatialHash. Models with grass or an event log create
+    `grass` and `events` in their __init__; both are None otherwise.
+    """
+
+    tracker_class = None
+    partition = attrgetter("code")
+    grass = None
+    events = None
+
+    def __init__(self, config):
+        super().__init__(config)
+        # grid neighbour lookups so proximity cost doesn't blow up with population size
+        self._proximity = SpatialHash(self._agents, config.radius, partition=self.partition)
+        # one row per recorded step, so the columns never need to grow
+        self.tracker = self.tracker_class(capacity=config.duration // config.record_interval + 1)
+        if config.output_path:
+            self.tracker.stream_to(config.output_path, config.output_chunk_size)
+        self.stop_criteria = StopCriteria(config)
+        # rare per-tick chances (births, deaths, ageing) fire from here instead of every agent's turn
+        self.scheduler = EventScheduler(self.random)
+        # killed agents are reused as offspring
+        self.pool = AgentPool(self)
+        # hunts, feeding and matings are declared during the tick and applied together at its end
+        self.interactions = InteractionResolver(config.interaction_order)
+        self.current_step = 0
+        self.simulation_ended = False
+
+    def tick(self):
+        # Snapshot to resume from, taken between two ticks
+        if (self.config.checkpoint_path and self.current_step
+                and self.current_step % self.config.checkpoint_interval == 0):
+            checkpoint.save(self, self.config.checkpoint_path)
+
+        # Record population every record_interval steps
+        if self.current_step % self.config.record_interval == 0:
+            if self.grass is not None:
+                self.tracker.counts["grass"] = self.grass.total
+            self.tracker.record(self)
+            reason = self.stop_criteria.check(self.tracker.counts)
+            if reason is not None:
+                # end the run now instead of ticking an empty world until duration
+                self.tracker.stop_reason = reason
+                self.stop()
+                return
+
+        self.scheduler.advance()
+        if not self.interactions.sequential:
+            for agent in self._agents:
+                agent.intend()
+        self.update_agents()
+        self.pool.recycle()
+        if self.grass is not None:
+            self.grass.step()
+        self.current_step += 1
+
+    def update_agents(self):
+        """vi's tick: every agent moves, then after_update commits the interactions"""
+        super().tick()
+
+    def before_update(self):
+        super().before_update()
+        if self.grass is not None and not self.config.headless:
+            # grass goes under the agents, which are drawn in after_update
+            self.grass.draw(self._screen)
+
+    def after_update(self):
+        # every agent has moved: settle and apply this tick's interactions
+        self.interactions.commit()
+        super().after_update()
+
+    def run(self):
+        # vi doesn't call end() itself
+        metrics = super().run()
+        self.end()
+        self.tracker.close()
+        if self.events is not None:
+            self.events.close()
+        return metrics
+
+    def end(self):
+        if not self.simulation_ended:
+            if self.tracker.stop_reason is None:
+                self.tracker.stop_reason = "duration"
+            print(f"\nSimulation stopped ({self.tracker.stop_reason}). Generating plot...")
+            self.plot()
+            # with the default stop rule the reason follows from the final counts, so the
+            # results keep their original columns
+            self.tracker.create_summary(stop_reason=not self.stop_criteria.default)
+            self.simulation_ended = True
+
+    def plot(self):
+        self.tracker.plot(show=not self.config.headless)
@@ -0,0 +1,47 @@
+from collections import defaultdict
+
+
+class AgentPool:
+    """
+    Recycles killed agents as offspring instead of building new sprite objects
+
+    TrackedAgent.kill() hands the agent to release() and TrackedAgent.reproduce() asks
+    spawn() for the offspring. Agents killed during a tick only become reusable when
+    the simulation calls recycle() at the end of it, because vi still runs the turn of
+    an agent that was killed earlier in the same tick and a recycled one would be
+    alive again by then.
+
+    Reused agents get a new id, the parent's position and heading, and go through the
+    same reset() hook as a freshly built agent.
+    """
+
+    def __init__(self, simulation):
+        self.simulation = simulation
+        self._free = defaultdict(list)
+        self._released = []
+        self.created = 0
+        self.reused = 0
+
+    def __len__(self):
+        return sum(len(free) for free in self._free.values())
+
+    def release(self, agent):
+        self._released.append(agent)
+
+    def recycle(self):
+        """Make the agents killed this tick available for reuse"""
+        for agent in self._released:
+            self._free[type(agent)].append(agent)
+        self._released.clear()
+
+    def spawn(self, parent):
+        """An offspring of parent's class at its position, reused from the pool when possible"""
+        free = self._free.get(type(parent))
+        if free:
+            self.reused += 1
+            agent = free.pop()
+            agent.respawn(self.simulation, parent.pos, parent.move)
+            return agent
+        self.created += 1
+        # passing pos and move skips vi's random placement, which copy() would just overwrite
+        return type(parent)(parent._images, self.simulation, parent.pos.copy(), parent.move.copy())
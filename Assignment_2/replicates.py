@@ -0,0 +1,103 @@
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import partial
+import multiprocessing
+import traceback
+import pandas as pd
+
+# the burn-in snapshot forked workers continue from, see run_forked_replicates
+_burn_in = None
+
+
+def replicate_seed(base_seed, run):
+    """Seed for replicate `run` (1-based), so run N always gets the same seed"""
+    return base_seed + run - 1
+
+
+def _run_safely(run_once, run, seed):
+    """Run one replicate in a worker, returning the error instead of raising it"""
+    try:
+        return run, run_once(seed=seed, run_id=run), None
+    except Exception:
+        return run, None, traceback.format_exc()
+
+
+def run_replicates(run_once, n_runs, base_seed=0, processes=None):
+    """
+    Run `run_once(seed=..., run_id=...)` for n_runs replicates on a process pool
+
+    run_once must be a module-level function that runs one headless simulation and
+    returns its tracker summary (a dict). Every replicate gets a deterministic seed from
+    replicate_seed, so a sweep gives the same results whatever the number of processes.
+    A replicate that raises is reported and skipped, the rest of the sweep keeps going.
+
+    Returns a DataFrame with one row per successful run: 'run' followed by the summary columns.
+    """
+    return _run_pool(run_once, n_runs, base_seed, ProcessPoolExecutor(max_workers=processes))
+
+
+def run_forked_replicates(burn_in, run_from, n_runs, base_seed=0, processes=None):
+    """
+    Run the transient once with burn_in(), then continue n_runs replicates from its end
+
+    burn_in() builds and runs a headless simulation through its warm-up and returns a
+    checkpoint.snapshot() of it. run_from(snapshot, seed=..., run_id=...) must be a
+    module-level function that restores the snapshot into a new simulation, gives it the
+    replicate's seed with checkpoint.reseed() and runs it, returning the tracker summary
+    like run_once does for run_replicates. Replicates share everything up to the snapshot
+    and diverge from there.
+
+    Where the platform can fork, workers are forked after the burn-in and read the
+    snapshot copy-on-write instead of each unpickling one.
+    """
+    global _burn_in
+    snapshot = burn_in()
+    reason = snapshot["tracker"]["stop_reason"]
+    if reason is not None:
+        raise ValueError(f"the burn-in already ended the run ({reason})")
+
+    if "fork" in multiprocessing.get_all_start_methods():
+        _burn_in = snapshot
+        pool = ProcessPoolExecutor(max_workers=processes, mp_context=multiprocessing.get_context("fork"))
+    else:
+        pool = ProcessPoolExecutor(max_workers=processes, initializer=_set_burn_in, initargs=(snapshot,))
+    try:
+        return _run_pool(partial(_run_from_burn_in, run_from), n_runs, base_seed, pool)
+    finally:
+        _burn_in = None
+
+
+def _set_burn_in(snapshot):
+    global _burn_in
+    _burn_in = snapshot
+
+
+def _run_from_burn_in(run_from, seed, run_id):
+    return run_from(_burn_in, seed=seed, run_id=run_id)
+
+
+def _run_pool(run_once, n_runs, base_seed, pool):
+    results = []
+    failed = []
+
+    with pool:
+        futures = {
+            pool.submit(_run_safely, run_once, run, replicate_seed(base_seed, run)): run
+            for run in range(1, n_runs + 1)
+        }
+        for future in as_completed(futures):
+            try:
+                run, summary, error = future.result()
+            except Exception as e:
+                # the worker process itself died (e.g. killed for running out of memory)
+                run, summary, error = futures[future], None, repr(e)
+            if error is not None:
+                print(f"Run {run} (seed {replicate_seed(base_seed, run)}) failed:\n{error}")
+                failed.append(run)
+                continue
+            print(f"Run {run} finished after {summary.get('steps_survived')} recorded steps")
+            results.append({'run': run, **summary})
+
+    if failed:
+        print(f"{len(failed)}/{n_runs} runs failed: {sorted(failed)}")
+
+    return pd.DataFrame(results).sort_values('run').reset_index(drop=True) if results else pd.DataFrame()
@@ -0,0 +1,66 @@
+import copy
+from itertools import chain
+import numpy as np
+
+
+class BlockRandom:
+    """
+    Per-simulation random source that draws its numbers from NumPy in large blocks
+
+    Agents call random() / uniform() / angle() / choice() several times per tick, and
+    going through the `random` module for each of those is a Python-level call into a
+    shared global generator. Here the numbers are drawn block_size at a time from one
+    seeded np.random.Generator and handed out one by one from a Python list, so a draw
+    is a single C-level next() and a run is reproducible from its seed alone, whatever
+    else uses `random` in the same process.
+
+    Uniforms in [0, 1) and angles in [0, 360) come from separate blocks.
+
+    get_state() / set_state() save and restore it for checkpoints: the generator state
+    plus the unread part of each current block. Taking the state draws nothing, so a run
+    gives the same numbers whether or not it is checkpointed.
+    """
+
+    def __init__(self, seed=None, block_size=8192):
+        self.generator = np.random.default_rng(seed)
+        self.block_size = block_size
+        self._start_blocks()
+
+    def _start_blocks(self, uniforms=(), angles=()):
+        # the iterator over the current block of each kind, by scale, read by get_state()
+        self._current = {1.0: iter(list(uniforms)), 360.0: iter(list(angles))}
+        # bound __next__ of an endless iterator over the blocks: the cheapest call there is.
+        # New blocks are only drawn once the given unread numbers run out.
+        self.random = chain.from_iterable(self._blocks(1.0)).__next__
+        self.angle = chain.from_iterable(self._blocks(360.0)).__next__
+
+    def seed(self, seed):
+        """Start over from a new seed, in place (agents keep a reference to this object)"""
+        self.generator = np.random.default_rng(seed)
+        self._start_blocks()
+
+    def get_state(self):
+        return {
+            "generator": self.generator.bit_generator.state,
+            "uniforms": self._unread(1.0),
+            "angles": self._unread(360.0),
+        }
+
+    def set_state(self, state):
+        self.generator.bit_generator.state = state["generator"]
+        self._start_blocks(state["uniforms"], state["angles"])
+
+    def _unread(self, scale):
+        # a copy of a list iterator starts where the original is, without advancing it
+        return list(copy.copy(self._current[scale]))
+
+    def _blocks(self, scale):
+        while True:
+            yield self._current[scale]
+            self._current[scale] = iter((self.generator.random(self.block_size) * scale).tolist())
+
+    def uniform(self, a, b):
+        return a + (b - a) * self.random()
+
+    def choice(self, seq):
+        return seq[int(self.random() * len(seq))]
@@ -0,0 +1,101 @@
+import heapq
+import math
+from itertools import count
+
+
+class EventScheduler:
+    """
+    Fires rare per-tick Bernoulli trials from a priority queue instead of flipping a coin every tick
+
+    A trial with probability p per tick first succeeds after a geometric number of ticks,
+    so schedule() draws that waiting time once and queues the callback for the tick it
+    fires in. advance() is called at the start of every tick and runs the callbacks due
+    in it. An agent waiting for its next event costs nothing until then.
+
+    The statistics are the per-tick checks' as long as p stays fixed. When it changes
+    (e.g. with age), cancel() the pending event and schedule a new one with the new p;
+    waiting times are memoryless, so nothing is lost by redrawing.
+
+    Whoever schedules for an agent cancels its pending events when it dies
+    (TrackedAgent.kill does), so callbacks never fire for a dead agent.
+
+    pending() and restore() take the queue out and put it back, for checkpoints, and
+    redraw() gives a restored copy of a run waiting times of its own.
+    """
+
+    def __init__(self, random):
+        self.random = random
+        # the tick currently being run, -1 before the first one
+        self.now = -1
+        self._queue = []
+        self._order = count()
+
+    def __len__(self):
+        return len(self._queue)
+
+    def waiting_time(self, p):
+        """Ticks until a trial with per-tick probability p first succeeds (at least 1), None if p <= 0"""
+        if p <= 0:
+            return None
+        if p >= 1:
+            return 1
+        return 1 + int(math.log(1.0 - self.random.random()) / math.log1p(-p))
+
+    def schedule(self, p, callback):
+        """
+        Queue callback for the first success of a per-tick trial with probability p,
+        counting from the next tick. Returns the event (for cancel()), or None when p <= 0
+        """
+        delay = self.waiting_time(p)
+        if delay is None:
+            return None
+        return self.schedule_at(self.now + delay, callback, p)
+
+    def schedule_at(self, tick, callback, p=None):
+        """Queue callback for a known tick (fired at the start of it). Returns the event, for cancel()"""
+        # the counter breaks ties in scheduling order and keeps callbacks from being compared,
+        # p is kept for redraw()
+        event = [max(tick, self.now + 1), next(self._order), callback, p]
+        heapq.heappush(self._queue, event)
+        return event
+
+    @staticmethod
+    def cancel(event):
+        # cancelled events stay in the queue and are skipped when they come up
+        if event is not None:
+            event[2] = None
+
+    def advance(self):
+        """Start the next tick and fire every event due in it"""
+        self.now += 1
+        queue = self._queue
+        while queue and queue[0][0] <= self.now:
+            callback = heapq.heappop(queue)[2]
+            if callback is not None:
+                callback()
+
+    def pending(self):
+        """The events still to fire, as [tick, order, callback, p] lists in no particular order"""
+        return [event for event in self._queue if event[2] is not None]
+
+    def restore(self, now, events):
+        """Continue from tick `now` with the given pending() events in the queue"""
+        self.now = now
+        self._queue = list(events)
+        heapq.heapify(self._queue)
+        # new events only need to sort after the restored ones
+        self._order = count(max((event[1] for event in self._queue), default=-1) + 1)
+
+    def redraw(self):
+        """
+        Draw a new waiting time for every pending schedule() event
+
+        A trial that hasn't succeeded yet is as far from its next success as a fresh one,
+        so this keeps the statistics while making the run diverge from any copy of it
+        (e.g. replicates continued from one checkpoint) as soon as the generator is reseeded.
+        Events queued with schedule_at() for a known tick stay where they are.
+        """
+        for event in self._queue:
+            if event[2] is not None and event[3] is not None:
+                event[0] = self.now + self.waiting_time(event[3])
+        heapq.heapify(self._queue)
@@ -0,0 +1,206 @@
+from dataclasses import replace
+from itertools import product
+import math
+import numpy as np
+import pandas as pd
+import tracker
+from stopping import StopCriteria
+
+# Reactions of the well-mixed model
+RABBIT_BIRTH, RABBIT_DEATH, RABBIT_STARVE, FOX_BIRTH, FOX_DEATH, FOX_STARVE, HUNT, FEED, GRASS_GROWTH = range(9)
+REACTIONS = ("rabbit_birth", "rabbit_death", "rabbit_starve", "fox_birth", "fox_death", "fox_starve",
+             "hunt", "feed", "grass_growth")
+
+# State vector layout
+R, F, G, RABBIT_ENERGY, FOX_ENERGY = range(5)
+
+
+class WellMixedModel:
+    """
+    Non-spatial version of the Lotka-Volterra agent models, for screening parameters
+
+    Rabbits, foxes and grass are counts in one well-mixed window. Two agents meet within
+    a radius r at the rate of collision theory: the area a moving agent sweeps per tick
+    (2 r times the relative speed) over the window area, where two agents heading in
+    random directions at movement_speed close in at 4 / pi times that speed and grass
+    doesn't move. All rates are per tick and come from the same LotkaVolterraConfig
+    fields the agent models use:
+    - hunting: every fox catches a rabbit when at least one is within fox_hunt_radius.
+      Without mating_radius in the config a catch also gives a new fox (baseline and
+      energy-concept), with it foxes mate separately (the lifecycle models)
+    - with mating_radius, births need an opposite-sex partner within mating_radius
+      (prime-age rates are used, age itself is not modelled)
+    - with max_age, the age-based death chance is taken at its cap
+    - with start energy > 0, each species' energy is one pool drained by one per agent
+      per tick; an agent starves at rate 1 / (mean energy)
+
+    grass_regrowth overrides grass_reproduction_prob (energy-concept's grass never regrows).
+    """
+
+    def __init__(self, config, grass_regrowth=None):
+        self.config = config
+        width, height = config.window.as_tuple()
+        area = width * height
+
+        def encounter(radius, speed):
+            return 2 * radius * speed / area
+
+        moving = 4 / math.pi * config.movement_speed
+        self.sexual = hasattr(config, "mating_radius")
+        self.hunt_rate = encounter(config.fox_hunt_radius, moving)
+        self.feed_rate = encounter(getattr(config, "rabbit_feed_radius", 0), config.movement_speed)
+        self.mating_rate = encounter(config.mating_radius, moving) if self.sexual else 0
+        self.rabbit_birth = config.rabbit_reproduction_prob * (1.2 if self.sexual else 1)
+        self.fox_birth = getattr(config, "fox_reproduction_prob", 0)
+        aging = hasattr(config, "max_age")
+        self.rabbit_death = 0.001 if aging else 0
+        self.fox_death = config.fox_death_prob + (0.002 if aging else 0)
+        self.rabbit_start_energy = getattr(config, "rabbit_start_energy", 0)
+        self.fox_start_energy = config.fox_start_energy
+        self.grass_regrowth = getattr(config, "grass_reproduction_prob", 0) if grass_regrowth is None else grass_regrowth
+
+    def propensities(self, state):
+        rabbits, foxes, grass = state[R], state[F], state[G]
+        a = np.zeros(len(REACTIONS))
+        a[RABBIT_BIRTH] = self.rabbit_birth * rabbits
+        if self.sexual:
+            # about half the others are of the opposite sex
+            a[RABBIT_BIRTH] *= -math.expm1(-self.mating_rate * rabbits / 2)
+            a[FOX_BIRTH] = self.fox_birth * foxes * -math.expm1(-self.mating_rate * foxes / 2)
+        a[RABBIT_DEATH] = self.rabbit_death * rabbits
+        a[FOX_DEATH] = self.fox_death * foxes
+        a[HUNT] = foxes * -math.expm1(-self.hunt_rate * rabbits)
+        a[FEED] = rabbits * -math.expm1(-self.feed_rate * grass)
+        a[GRASS_GROWTH] = self.grass_regrowth * grass
+        if self.rabbit_start_energy > 0 and rabbits:
+            a[RABBIT_STARVE] = rabbits / max(state[RABBIT_ENERGY] / rabbits, 1)
+        if self.fox_start_energy > 0 and foxes:
+            a[FOX_STARVE] = foxes / max(state[FOX_ENERGY] / foxes, 1)
+        return a
+
+    def fire(self, state, reaction, times=1):
+        """Apply a reaction `times` times (limited by what is left to remove)"""
+        config = self.config
+        if reaction == RABBIT_BIRTH:
+            state[R] += times
+            state[RABBIT_ENERGY] += times * self.rabbit_start_energy
+        elif reaction in (RABBIT_DEATH, RABBIT_STARVE):
+            times = min(times, state[R])
+            mean_energy = state[RABBIT_ENERGY] / state[R] if state[R] else 0
+            state[R] -= times
+            state[RABBIT_ENERGY] -= times * mean_energy
+        elif reaction == FOX_BIRTH:
+            state[F] += times
+            state[FOX_ENERGY] += times * self.fox_start_energy
+        elif reaction in (FOX_DEATH, FOX_STARVE):
+            times = min(times, state[F])
+            mean_energy = state[FOX_ENERGY] / state[F] if state[F] else 0
+            state[F] -= times
+            state[FOX_ENERGY] -= times * mean_energy
+        elif reaction == HUNT:
+            times = min(times, state[R])
+            mean_energy = state[RABBIT_ENERGY] / state[R] if state[R] else 0
+            state[R] -= times
+            state[RABBIT_ENERGY] -= times * mean_energy
+            state[FOX_ENERGY] += times * config.fox_energy_gain_on_eat
+            if not self.sexual:
+                state[F] += times
+                state[FOX_ENERGY] += times * self.fox_start_energy
+        elif reaction == FEED:
+            times = min(times, state[G])
+            state[G] -= times
+            state[RABBIT_ENERGY] += times * config.rabbit_energy_gain_on_eat
+        elif reaction == GRASS_GROWTH:
+            state[G] += times
+
+    def drain(self, state, dt):
+        """Energy use of every living agent over dt ticks"""
+        if self.rabbit_start_energy > 0:
+            state[RABBIT_ENERGY] = max(state[RABBIT_ENERGY] - state[R] * dt, 0)
+        if self.fox_start_energy > 0:
+            state[FOX_ENERGY] = max(state[FOX_ENERGY] - state[F] * dt, 0)
+
+
+def run_well_mixed(config, rabbits, foxes, grass=0, method="tau", tau=1.0, grass_regrowth=None, rng=None):
+    """
+    Run the well-mixed model for config.duration ticks
+
+    method is "ssa" (exact Gillespie, one reaction at a time) or "tau" (tau-leaping,
+    Poisson numbers of every reaction per leap of tau ticks; much faster once populations
+    are large). Populations are recorded every config.record_interval ticks into a
+    PopulationTracker and the run ends early on the config's stop criteria, so
+    tracker.to_frame() and tracker.get_summary() match the agent models.
+    """
+    if method not in ("ssa", "tau"):
+        raise ValueError(f'method must be "ssa" or "tau", not {method!r}')
+    rng = rng or np.random.default_rng(config.seed)
+    model = WellMixedModel(config, grass_regrowth)
+    stop_criteria = StopCriteria(config)
+    run_tracker = tracker.PopulationTracker(
+        species=("rabbit", "fox", "grass"),
+        columns={'step': np.int64, 'rabbits': np.int64, 'foxes': np.int64, 'grass': np.int64},
+        capacity=config.duration // config.record_interval + 1)
+    state = np.array([rabbits, foxes, grass,
+                      rabbits * model.rabbit_start_energy, foxes * model.fox_start_energy], dtype=float)
+
+    t = 0.0
+    next_record = 0
+    while True:
+        if t >= next_record:
+            counts = run_tracker.counts
+            counts["rabbit"], counts["fox"], counts["grass"] = int(state[R]), int(state[F]), int(state[G])
+            run_tracker.append({'step': run_tracker.step, 'rabbits': counts["rabbit"],
+                                'foxes': counts["fox"], 'grass': counts["grass"]})
+            run_tracker.step += 1
+            reason = stop_criteria.check(counts)
+            if reason is not None:
+                run_tracker.stop_reason = reason
+                break
+            next_record += config.record_interval
+            if next_record > config.duration:
+                run_tracker.stop_reason = "duration"
+                break
+
+        a = model.propensities(state)
+        total = a.sum()
+        if method == "ssa":
+            dt = rng.exponential(1 / total) if total > 0 else math.inf
+            if t + dt >= next_record:
+                # nothing happens before the next record (waiting times are memoryless)
+                model.drain(state, next_record - t)
+                t = next_record
+                continue
+            model.drain(state, dt)
+            t += dt
+            reaction = np.searchsorted(np.cumsum(a), rng.random() * total, side="right")
+            model.fire(state, min(int(reaction), len(a) - 1))
+        else:
+            dt = min(tau, next_record - t)
+            for reaction, times in enumerate(rng.poisson(a * dt)):
+                if times:
+                    model.fire(state, reaction, times)
+            model.drain(state, dt)
+            t += dt
+
+    run_tracker.create_summary()
+    return run_tracker
+
+
+def screen(base_config, parameters, rabbits, foxes, grass=0, replicates=1, **kwargs):
+    """
+    Run the well-mixed model for every combination of parameter values
+
+    parameters maps config field names to lists of values, e.g.
+    {"fox_death_prob": [0.005, 0.01], "rabbit_reproduction_prob": [0.005, 0.01]}.
+    Each combination runs `replicates` times with seeds base_config.seed (or 0) + replicate.
+    Returns one row per run: the parameter values, 'replicate' and the summary columns.
+    """
+    names = list(parameters)
+    base_seed = base_config.seed if isinstance(base_config.seed, int) else 0
+    rows = []
+    for values in product(*(parameters[name] for name in names)):
+        for replicate in range(replicates):
+            config = replace(base_config, seed=base_seed + replicate, **dict(zip(names, values)))
+            summary = run_well_mixed(config, rabbits, foxes, grass, **kwargs).get_summary()
+            rows.append({**dict(zip(names, values)), 'replicate': replicate, **summary})
+    return pd.DataFrame(rows)
@@ -0,0 +1,43 @@
+# Small-int codes for the Lotka-Volterra agents. The hunt and mating loops compare these
+# instead of species/sex strings; the names are kept for the tracker, plots and event log.
+RABBIT, FOX = range(2)
+SPECIES = ("rabbit", "fox")
+
+MALE, FEMALE = range(2)
+SEXES = (MALE, FEMALE)
+OPPOSITE_SEX = (FEMALE, MALE)  # indexed by sex
+
+# Interaction tables, indexed by species code. A new species is a code and name above plus
+# a row in each; the agents and the InteractionResolver look these up instead of testing
+# species themselves.
+
+# the species each one hunts
+PREY = (
+    (),  # rabbit
+    (RABBIT,),  # fox
+)
+
+# what each one feeds on besides its prey: the name of the simulation attribute holding the
+# food (a GrassField), or None
+FOOD = (
+    "grass",  # rabbit
+    None,  # fox
+)
+
+# the species each one mates with; where the model has sexes, only with the opposite sex
+MATES = (
+    (RABBIT,),  # rabbit
+    (FOX,),  # fox
+)
+
+
+def partitions(codes, sexed=False):
+    """The SpatialHash partitions agents of the given species are filed under"""
+    if sexed:
+        return tuple((code, sex) for code in codes for sex in SEXES)
+    return tuple(codes)
+
+
+def mate_partitions(code):
+    """The SpatialHash partitions an agent of a sexed species looks for mates in, indexed by its sex"""
+    return tuple(tuple((mate, OPPOSITE_SEX[sex]) for mate in MATES[code]) for sex in SEXES)
@@ -0,0 +1,58 @@
+from collections import deque
+
+
+class StopCriteria:
+    """
+    Decides when a Lotka-Volterra run is over, based on the recorded population counts
+
+    Reads its settings from the simulation config:
+    - stop_on_extinction: "any" stops as soon as one species dies out, "all" once every
+      species has, "" never stops on extinction
+    - max_population: stop when the species together exceed this many agents (0 disables)
+    - steady_state_window / steady_state_tolerance: stop when, over the last window records,
+      every species count stayed within tolerance (a fraction of its mean) of itself (0 disables)
+
+    check() returns the reason the run should stop, or None to keep going.
+    `default` is True when the settings are the models' original rule, stop as soon as a
+    species dies out.
+    """
+
+    def __init__(self, config, species=("rabbit", "fox")):
+        self.species = species
+        self.extinction = config.stop_on_extinction
+        self.max_population = config.max_population
+        self.tolerance = config.steady_state_tolerance
+        self.window = deque(maxlen=config.steady_state_window) if config.steady_state_window > 0 else None
+
+        if self.extinction not in ("any", "all", ""):
+            raise ValueError(f'stop_on_extinction must be "any", "all" or "", not {self.extinction!r}')
+
+    @property
+    def default(self):
+        return self.extinction == "any" and not self.max_population and self.window is None
+
+    def check(self, counts):
+        populations = [counts[species] for species in self.species]
+
+        extinct = [species for species, count in zip(self.species, populations) if count == 0]
+        if self.extinction == "all" and len(extinct) == len(self.species):
+            return "extinction: all species"
+        if self.extinction == "any" and extinct:
+            return "extinction: " + ", ".join(extinct)
+
+        if self.max_population and sum(populations) > self.max_population:
+            return f"population cap: {sum(populations)} > {self.max_population}"
+
+        if self.window is not None:
+            self.window.append(populations)
+            if len(self.window) == self.window.maxlen and self._steady():
+                return f"steady state over {self.window.maxlen} records"
+
+        return None
+
+    def _steady(self):
+        for history in zip(*self.window):
+            mean = sum(history) / len(history)
+            if max(history) - min(history) > self.tolerance * max(mean, 1):
+                return False
+        return True
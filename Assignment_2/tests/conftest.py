@@ -0,0 +1,46 @@
+import os
+import runpy
+import sys
+from types import SimpleNamespace
+import pytest
+
+# the model scripts open pygame and matplotlib, neither may need a display here
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("MPLBACKEND", "Agg")
+
+ASSIGNMENT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def use_this_assignment():
+    """
+    Put this assignment's modules first, they import each other by plain name
+
+    Assignment_0 and Assignment_2 both have a headless.py and a spatial.py, so when the
+    whole repository is tested in one run the other assignment's copies are forgotten.
+    """
+    if ASSIGNMENT in sys.path:
+        sys.path.remove(ASSIGNMENT)
+    sys.path.insert(0, ASSIGNMENT)
+    for name in ("headless", "spatial"):
+        module = sys.modules.get(name)
+        if module is not None and os.path.dirname(module.__file__) != ASSIGNMENT:
+            del sys.modules[name]
+
+
+use_this_assignment()
+
+
+@pytest.fixture
+def model(tmp_path, monkeypatch):
+    """
+    Loads a model script (the file names aren't importable) by file name, with the
+    working directory an empty one the runs can save their plots and CSVs to
+    """
+    (tmp_path / "images").symlink_to(os.path.join(ASSIGNMENT, "images"))
+    monkeypatch.chdir(tmp_path)
+
+    def load(name):
+        use_this_assignment()
+        return SimpleNamespace(**runpy.run_path(os.path.join(ASSIGNMENT, name), run_name="lib"))
+
+    return load
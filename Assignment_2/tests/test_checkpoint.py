@@ -0,0 +1,86 @@
+import shutil
+import pytest
+import checkpoint
+
+DURATION = 500
+
+
+@pytest.fixture
+def lifecycle_energy(model):
+    return model("lifecycle+energy.py")
+
+
+def build(module, spawn=True, **settings):
+    config = module.replicate_config(seed=11)
+    config.duration = DURATION
+    for name, value in settings.items():
+        setattr(config, name, value)
+    simulation = module.LotkaVolterraSimulation(config)
+    if spawn:
+        simulation.batch_spawn_agents(100, module.Rabbit, images=["images/rabbit.png"])
+        simulation.batch_spawn_agents(20, module.Fox, images=["images/fox.png"])
+        simulation.grass.scatter(50)
+    return simulation
+
+
+def resume(module, path, **settings):
+    simulation = build(module, spawn=False, **settings)
+    checkpoint.resume(simulation, path, [(module.Rabbit, ["images/rabbit.png"]), (module.Fox, ["images/fox.png"])])
+    return simulation
+
+
+def run_with_checkpoints(module, tmp_path, steps, **settings):
+    """Run with checkpoints every 250 steps, keeping a copy of the ones taken at steps"""
+    simulation = build(module, checkpoint_path=str(tmp_path / "run.pkl"), checkpoint_interval=250, **settings)
+    copies = {}
+    for step in steps:
+        while simulation.current_step <= step:
+            simulation.tick()
+        copies[step] = tmp_path / f"step{step}.pkl"
+        shutil.copy(tmp_path / "run.pkl", copies[step])
+    simulation.run()
+    return simulation, copies
+
+
+def test_resumed_run_equals_the_uninterrupted_one(lifecycle_energy, tmp_path):
+    uninterrupted = build(lifecycle_energy)
+    uninterrupted.run()
+    expected = uninterrupted.tracker.to_frame()
+    assert uninterrupted.tracker.stop_reason == "duration"
+
+    checkpointed, copies = run_with_checkpoints(lifecycle_energy, tmp_path, (250, 500))
+    # taking checkpoints changes nothing
+    assert checkpointed.tracker.to_frame().equals(expected)
+
+    for step, path in copies.items():
+        resumed = resume(lifecycle_energy, path)
+        assert resumed.current_step == step
+        resumed.run()
+        assert resumed.tracker.to_frame().equals(expected), f"resumed at step {step}"
+        assert resumed.tracker.counts == uninterrupted.tracker.counts
+        assert resumed.grass.total == uninterrupted.grass.total
+
+
+def test_resumed_output_files_continue_the_checkpointed_ones(lifecycle_energy, tmp_path):
+    files = dict(output_chunk_size=7, event_level=lifecycle_energy.events.RECORD)
+    uninterrupted = build(lifecycle_energy, output_path=str(tmp_path / "whole.csv"),
+                          event_log_path=str(tmp_path / "whole.bin"), **files)
+    uninterrupted.run()
+
+    paths = dict(output_path=str(tmp_path / "run.csv"), event_log_path=str(tmp_path / "run.bin"))
+    _, copies = run_with_checkpoints(lifecycle_energy, tmp_path, (250,), **paths, **files)
+    # the finished run wrote past the checkpoint, resuming cuts its files back first
+    resume(lifecycle_energy, copies[250], **paths, **files).run()
+    for name in ("csv", "bin"):
+        assert (tmp_path / f"run.{name}").read_bytes() == (tmp_path / f"whole.{name}").read_bytes()
+
+
+def test_restore_needs_a_new_simulation(lifecycle_energy, tmp_path):
+    simulation = build(lifecycle_energy)
+    checkpoint.save(simulation, tmp_path / "start.pkl")
+    with pytest.raises(ValueError):
+        checkpoint.resume(simulation, tmp_path / "start.pkl", [(lifecycle_energy.Rabbit, ["images/rabbit.png"])])
+    # the snapshot has foxes, which can't be rebuilt without their class
+    empty = build(lifecycle_energy, spawn=False)
+    with pytest.raises(ValueError):
+        checkpoint.resume(empty, tmp_path / "start.pkl", [(lifecycle_energy.Rabbit, ["images/rabbit.png"])])
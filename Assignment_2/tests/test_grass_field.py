@@ -0,0 +1,108 @@
+from dataclasses import dataclass, field
+import numpy as np
+import pytest
+from pygame.math import Vector2
+from vi.config import Window
+from grass_field import GrassField
+
+
+@dataclass
+class Settings:
+    grass_cell_size: int = 5
+    grass_spread_prob: float = 0.0
+    seed: int = 0
+    window: Window = field(default_factory=lambda: Window(100, 60))
+
+
+def test_grid_covers_the_window():
+    grass = GrassField(Settings(grass_cell_size=7), regrowth_prob=0)
+    assert grass.amount.shape == (9, 15)
+
+
+def test_scatter_and_total():
+    grass = GrassField(Settings(), regrowth_prob=0)
+    grass.scatter(500)
+    assert grass.total == grass.amount.sum() == 500
+    grass.step()
+    assert grass.total == 500
+
+
+def test_regrowth_rate():
+    grass = GrassField(Settings(), regrowth_prob=0.1)
+    grass.amount[:] = 100
+    grass.total = int(grass.amount.sum())
+    start = grass.total
+    grass.step()
+    assert grass.total == grass.amount.sum()
+    assert grass.total - start == pytest.approx(0.1 * start, rel=0.05)
+
+
+def test_empty_cells_never_regrow():
+    grass = GrassField(Settings(grass_spread_prob=0), regrowth_prob=0.5)
+    grass.amount[3, 4] = 10
+    grass.total = 10
+    for _ in range(5):
+        grass.step()
+    assert grass.amount.sum() == grass.amount[3, 4] == grass.total > 10
+
+
+def test_spread_goes_to_neighbours_and_wraps():
+    grass = GrassField(Settings(grass_spread_prob=1.0), regrowth_prob=0.5)
+    grass.amount[0, 0] = 1000
+    grass.total = 1000
+    grass.step()
+    grown = grass.amount.copy()
+    grown[0, 0] -= 1000
+    neighbours = {(1, 0), (grass.rows - 1, 0), (0, 1), (0, grass.cols - 1)}
+    # all of a cell's spreading blades of one tick go the same way
+    assert len(np.argwhere(grown)) == 1
+    assert {tuple(cell) for cell in np.argwhere(grown)} <= neighbours
+    assert grass.total == grass.amount.sum()
+
+
+def test_consume_takes_the_nearest_cell_in_reach():
+    grass = GrassField(Settings(), regrowth_prob=0)
+    grass.amount[2, 2] = 1  # centre (12.5, 12.5)
+    grass.amount[2, 5] = 1  # centre (27.5, 12.5)
+    grass.total = 2
+    assert grass.consume(Vector2(25, 12), 10)
+    assert grass.amount[2, 5] == 0 and grass.amount[2, 2] == 1
+    assert not grass.consume(Vector2(25, 12), 10)
+    assert grass.consume(Vector2(25, 12), 15)
+    assert grass.total == 0
+    # outside the window
+    assert not grass.consume(Vector2(-50, -50), 10)
+
+
+def test_consume_all_matches_consume_for_one_feeder():
+    for seed in range(20):
+        rng = np.random.default_rng(seed)
+        one, many = GrassField(Settings(seed=seed), 0), GrassField(Settings(seed=seed), 0)
+        one.scatter(60)
+        many.scatter(60)
+        pos = rng.uniform((0, 0), (100, 60))
+        ate = one.consume(Vector2(*pos), 12)
+        assert list(many.consume_all(pos[None], 12, rng)) == [ate]
+        assert (one.amount == many.amount).all() and one.total == many.total
+
+
+def test_consume_all_shares_out_a_cell():
+    grass = GrassField(Settings(), regrowth_prob=0)
+    grass.amount[2, 2] = 2
+    grass.amount[2, 4] = 1
+    grass.total = 3
+    # four feeders on the first cell, the second one is in reach of them as well
+    positions = np.array([(12.5, 12.5)] * 4, dtype=float)
+    fed = grass.consume_all(positions, 11, np.random.default_rng(1))
+    assert fed.sum() == 3
+    assert grass.total == grass.amount.sum() == 0
+
+
+def test_consume_all_conserves_grass():
+    grass = GrassField(Settings(), regrowth_prob=0)
+    grass.scatter(200)
+    rng = np.random.default_rng(2)
+    positions = rng.uniform((0, 0), (100, 60), size=(150, 2))
+    fed = grass.consume_all(positions, 8, rng)
+    assert grass.total == grass.amount.sum() == 200 - fed.sum()
+    assert (grass.amount >= 0).all()
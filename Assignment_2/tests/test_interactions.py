@@ -0,0 +1,126 @@
+import pytest
+from pygame.math import Vector2
+from interactions import InteractionResolver
+from species import RABBIT, FOX
+
+
+class Animal:
+    """Records what the resolver does to it"""
+
+    def __init__(self, id, code, x=0, y=0):
+        self.id = id
+        self.code = code
+        self.pos = Vector2(x, y)
+        self.dead = False
+        self.caught_prey = []
+        self.meals = 0
+        self.partners = []
+
+    def alive(self):
+        return not self.dead
+
+    def kill(self):
+        self.dead = True
+
+    def caught(self, prey):
+        self.caught_prey.append(prey)
+
+    def feed(self):
+        self.meals += 1
+
+    def mated(self, partner):
+        self.partners.append(partner)
+
+
+def test_unknown_order():
+    with pytest.raises(ValueError):
+        InteractionResolver("random")
+
+
+def test_nothing_happens_before_commit():
+    resolver = InteractionResolver()
+    fox, rabbit = Animal(1, FOX), Animal(2, RABBIT)
+    resolver.hunt(fox, rabbit)
+    resolver.feed(rabbit)
+    resolver.mate(rabbit, Animal(3, RABBIT))
+    assert len(resolver) == 3
+    assert rabbit.alive() and rabbit.meals == 0 and rabbit.partners == []
+    resolver.commit()
+    assert len(resolver) == 0
+
+
+def test_contested_prey_goes_to_the_nearest_predator():
+    resolver = InteractionResolver()
+    rabbit = Animal(1, RABBIT, 0, 0)
+    far, near, tied = Animal(2, FOX, 10, 0), Animal(5, FOX, 3, 0), Animal(4, FOX, 0, 3)
+    for fox in (far, near, tied):
+        resolver.hunt(fox, rabbit)
+    resolver.commit()
+    assert rabbit.dead
+    # near and tied are as close, the lower id wins
+    assert tied.caught_prey == [rabbit]
+    assert far.caught_prey == near.caught_prey == []
+
+
+def test_only_allowed_intents_are_kept():
+    resolver = InteractionResolver()
+    fox, other_fox, rabbit = Animal(1, FOX), Animal(2, FOX), Animal(3, RABBIT)
+    resolver.hunt(fox, other_fox)
+    resolver.hunt(rabbit, fox)
+    resolver.feed(fox)
+    resolver.mate(fox, rabbit)
+    assert len(resolver) == 0
+
+
+def test_the_dead_neither_eat_nor_mate():
+    resolver = InteractionResolver()
+    fox, rabbit, mate = Animal(1, FOX), Animal(2, RABBIT), Animal(3, RABBIT)
+    resolver.feed(rabbit)
+    resolver.mate(mate, rabbit)
+    resolver.hunt(fox, rabbit)
+    resolver.commit()
+    assert rabbit.dead and fox.caught_prey == [rabbit]
+    assert rabbit.meals == 0
+    assert mate.partners == []
+
+
+def test_feeding_in_id_order():
+    resolver = InteractionResolver()
+    order = []
+    rabbits = [Animal(i, RABBIT) for i in (3, 1, 2)]
+    for rabbit in rabbits:
+        rabbit.feed = lambda rabbit=rabbit: order.append(rabbit.id)
+        resolver.feed(rabbit)
+    resolver.commit()
+    assert order == [1, 2, 3]
+
+
+def test_one_mating_per_agent():
+    resolver = InteractionResolver()
+    a, b, c, d = (Animal(i, RABBIT) for i in range(1, 5))
+    # b is asked by a and c, and asks d itself; a asked first by id
+    resolver.mate(c, b)
+    resolver.mate(b, d)
+    resolver.mate(a, b)
+    resolver.mate(d, c)
+    resolver.commit()
+    assert a.partners == [b]
+    assert b.partners == [] and c.partners == []
+    # c was still free when d asked
+    assert d.partners == [c]
+
+
+def test_sequential_applies_at_once():
+    resolver = InteractionResolver("sequential")
+    assert resolver.sequential
+    first, second, rabbit = Animal(1, FOX), Animal(2, FOX), Animal(3, RABBIT)
+    resolver.hunt(second, rabbit)
+    resolver.hunt(first, rabbit)
+    # the first to ask gets it, however far away
+    assert rabbit.dead and second.caught_prey == [rabbit] and first.caught_prey == []
+    mate = Animal(4, RABBIT)
+    resolver.mate(mate, rabbit)
+    assert mate.partners == []
+    resolver.feed(mate)
+    assert mate.meals == 1
+    assert len(resolver) == 0
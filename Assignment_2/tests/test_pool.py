@@ -0,0 +1,52 @@
+def lifecycle_energy(model, seed=2):
+    module = model("lifecycle+energy.py")
+    simulation = module.LotkaVolterraSimulation(module.replicate_config(seed))
+    simulation.batch_spawn_agents(50, module.Rabbit, images=["images/rabbit.png"])
+    simulation.batch_spawn_agents(10, module.Fox, images=["images/fox.png"])
+    return module, simulation
+
+
+def test_killed_agents_come_back_after_the_tick(model):
+    module, simulation = lifecycle_energy(model)
+    simulation.tick()
+    rabbit = next(agent for agent in simulation._agents if agent.species == "rabbit")
+    rabbit.kill()
+    # still finishing this tick: not reusable yet
+    assert len(simulation.pool) == 0
+    simulation.pool.recycle()
+    assert len(simulation.pool) == 1
+
+    parent = next(agent for agent in simulation._agents if agent.species == "rabbit")
+    next_id = simulation._next_agent_id
+    offspring = simulation.pool.spawn(parent)
+    assert offspring is rabbit
+    assert offspring.alive() and offspring in simulation._agents
+    assert offspring.id == next_id
+    assert offspring.pos == parent.pos and offspring.pos is not parent.pos
+    assert offspring.move == parent.move
+    assert offspring.age == 0
+    assert simulation.pool.reused == 1 and len(simulation.pool) == 0
+
+
+def test_pool_is_per_class(model):
+    module, simulation = lifecycle_energy(model)
+    simulation.tick()
+    fox = next(agent for agent in simulation._agents if agent.species == "fox")
+    fox.kill()
+    simulation.pool.recycle()
+    rabbit = next(agent for agent in simulation._agents if agent.species == "rabbit")
+    offspring = simulation.pool.spawn(rabbit)
+    assert type(offspring) is module.Rabbit and offspring is not fox
+    assert simulation.pool.created == 1 and len(simulation.pool) == 1
+
+
+def test_reused_agents_are_counted_like_new_ones(model):
+    module, simulation = lifecycle_energy(model, seed=5)
+    for _ in range(400):
+        simulation.tick()
+    assert simulation.pool.reused > 0
+    for species in ("rabbit", "fox"):
+        alive = [agent for agent in simulation._agents if agent.species == species]
+        assert simulation.tracker.counts[species] == len(alive)
+    ids = [agent.id for agent in simulation._agents]
+    assert len(ids) == len(set(ids))
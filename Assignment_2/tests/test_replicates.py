@@ -0,0 +1,63 @@
+import os
+import pytest
+from replicates import replicate_seed, run_replicates, run_forked_replicates
+
+
+# replicates run in worker processes, so what they run has to be importable from here
+
+def run_once(seed, run_id):
+    if seed == 13:
+        raise RuntimeError("replicate failed")
+    return {"seed": seed, "steps_survived": 10 * run_id, "pid": os.getpid()}
+
+
+def burn_in():
+    return {"tracker": {"stop_reason": None}, "population": [1, 2, 3]}
+
+
+def burn_in_to_extinction():
+    return {"tracker": {"stop_reason": "extinction: fox"}}
+
+
+def run_from(snapshot, seed, run_id):
+    return {"seed": seed, "steps_survived": run_id, "population": sum(snapshot["population"])}
+
+
+def test_replicate_seeds():
+    assert [replicate_seed(10, run) for run in (1, 2, 3)] == [10, 11, 12]
+
+
+def test_runs_get_their_own_seed_in_order():
+    results = run_replicates(run_once, 6, base_seed=5, processes=3)
+    assert list(results["run"]) == [1, 2, 3, 4, 5, 6]
+    assert list(results["seed"]) == [5, 6, 7, 8, 9, 10]
+    assert list(results["steps_survived"]) == [10, 20, 30, 40, 50, 60]
+    assert os.getpid() not in set(results["pid"])
+
+
+def test_results_do_not_depend_on_the_number_of_processes():
+    one = run_replicates(run_once, 5, base_seed=1, processes=1).drop(columns="pid")
+    many = run_replicates(run_once, 5, base_seed=1, processes=4).drop(columns="pid")
+    assert one.equals(many)
+
+
+def test_failed_replicates_are_skipped(capsys):
+    results = run_replicates(run_once, 5, base_seed=10, processes=2)
+    assert list(results["run"]) == [1, 2, 3, 5]
+    assert "Run 4 (seed 13) failed" in capsys.readouterr().out
+
+
+def test_nothing_succeeded():
+    assert run_replicates(run_once, 1, base_seed=13, processes=1).empty
+
+
+def test_forked_replicates_continue_the_burn_in():
+    results = run_forked_replicates(burn_in, run_from, 4, base_seed=3, processes=2)
+    assert list(results["run"]) == [1, 2, 3, 4]
+    assert list(results["seed"]) == [3, 4, 5, 6]
+    assert set(results["population"]) == {6}
+
+
+def test_burn_in_that_ended_the_run():
+    with pytest.raises(ValueError, match="extinction"):
+        run_forked_replicates(burn_in_to_extinction, run_from, 2)
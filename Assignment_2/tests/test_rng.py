@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+from rng import BlockRandom
+
+
+def draws(rng, n):
+    return [(rng.random(), rng.angle(), rng.uniform(2, 5), rng.choice("abcd")) for _ in range(n)]
+
+
+def test_same_seed_same_numbers():
+    assert draws(BlockRandom(7, block_size=16), 100) == draws(BlockRandom(7, block_size=16), 100)
+    assert draws(BlockRandom(7), 10) != draws(BlockRandom(8), 10)
+
+
+def test_ranges():
+    rng = BlockRandom(1, block_size=64)
+    uniforms = np.array([rng.random() for _ in range(1000)])
+    angles = np.array([rng.angle() for _ in range(1000)])
+    assert ((0 <= uniforms) & (uniforms < 1)).all()
+    assert ((0 <= angles) & (angles < 360)).all()
+    assert uniforms.mean() == pytest.approx(0.5, abs=0.05)
+
+
+@pytest.mark.parametrize("taken", [0, 5, 16, 37])
+def test_state_round_trip(taken):
+    # the state is taken mid-block, at a block boundary and before anything was drawn
+    rng = BlockRandom(3, block_size=16)
+    draws(rng, taken)
+    state = rng.get_state()
+    expected = draws(rng, 50)
+
+    restored = BlockRandom(99, block_size=16)
+    restored.set_state(state)
+    assert draws(restored, 50) == expected
+
+
+def test_get_state_draws_nothing():
+    checked, plain = BlockRandom(4, block_size=8), BlockRandom(4, block_size=8)
+    sequence = []
+    for _ in range(30):
+        checked.get_state()
+        sequence.append(checked.random())
+    assert sequence == [plain.random() for _ in range(30)]
+
+
+def test_seed_restarts_in_place():
+    rng = BlockRandom(5)
+    draws(rng, 3)
+    rng.seed(6)
+    assert draws(rng, 20) == draws(BlockRandom(6), 20)
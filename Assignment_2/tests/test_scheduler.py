@@ -0,0 +1,87 @@
+import random
+import pytest
+from scheduler import EventScheduler
+
+
+@pytest.mark.parametrize("p", [0.5, 0.05, 0.002])
+def test_waiting_time_is_geometric(p):
+    scheduler = EventScheduler(random.Random(1))
+    waits = [scheduler.waiting_time(p) for _ in range(50_000)]
+    mean = sum(waits) / len(waits)
+    variance = sum((w - mean) ** 2 for w in waits) / len(waits)
+    assert min(waits) >= 1
+    assert mean == pytest.approx(1 / p, rel=0.03)
+    assert variance == pytest.approx((1 - p) / p ** 2, rel=0.1)
+
+
+def test_waiting_time_edges():
+    scheduler = EventScheduler(random.Random(1))
+    assert scheduler.waiting_time(0) is None
+    assert scheduler.waiting_time(1) == 1
+    assert scheduler.schedule(0, lambda: None) is None
+
+
+def test_fire_rate_matches_per_tick_trials():
+    # an event rescheduling itself on every firing fires about p * ticks times
+    p, ticks = 0.1, 50_000
+    scheduler = EventScheduler(random.Random(2))
+    fired = []
+
+    def fire():
+        fired.append(scheduler.now)
+        scheduler.schedule(p, fire)
+
+    scheduler.schedule(p, fire)
+    for _ in range(ticks):
+        scheduler.advance()
+    assert len(fired) == pytest.approx(p * ticks, rel=0.05)
+    assert fired == sorted(fired) and fired[0] >= 1
+
+
+def test_schedule_at_and_cancel():
+    scheduler = EventScheduler(random.Random(3))
+    fired = []
+    scheduler.schedule_at(2, lambda: fired.append("b"))
+    scheduler.schedule_at(2, lambda: fired.append("c"))
+    scheduler.schedule_at(1, lambda: fired.append("a"))
+    cancelled = scheduler.schedule_at(1, lambda: fired.append("x"))
+    scheduler.cancel(cancelled)
+    scheduler.cancel(None)
+
+    scheduler.advance()
+    scheduler.advance()
+    assert fired == ["a"]
+    scheduler.advance()
+    # same tick: in scheduling order
+    assert fired == ["a", "b", "c"]
+    assert scheduler.pending() == []
+
+
+def test_restore_continues_the_queue():
+    original = EventScheduler(random.Random(4))
+    fired = []
+    for tick in (3, 5, 8):
+        original.schedule_at(tick, lambda tick=tick: fired.append(tick))
+    for _ in range(4):
+        original.advance()
+    assert fired == [3]
+
+    copy = EventScheduler(random.Random(4))
+    copy.restore(original.now, [list(event) for event in original.pending()])
+    late = copy.schedule_at(5, lambda: fired.append("new"))
+    for _ in range(5):
+        copy.advance()
+    # the restored event of tick 5 keeps its place ahead of the new one
+    assert fired == [3, 5, "new", 8]
+    assert late[1] > 2
+
+
+def test_redraw_keeps_fixed_ticks():
+    scheduler = EventScheduler(random.Random(5))
+    fixed = scheduler.schedule_at(10, lambda: None)
+    drawn = [scheduler.schedule(0.01, lambda: None) for _ in range(50)]
+    before = [event[0] for event in drawn]
+    scheduler.redraw()
+    assert fixed[0] == 10
+    assert [event[0] for event in drawn] != before
+    assert all(event[0] >= 0 for event in drawn)
@@ -0,0 +1,67 @@
+from dataclasses import replace
+import math
+import numpy as np
+import pytest
+from screening import WellMixedModel, run_well_mixed, screen, HUNT, RABBIT_BIRTH, R, F
+
+
+@pytest.fixture
+def baseline(model):
+    return replace(model("baseline-model.py").replicate_config(seed=0), duration=100, stop_on_extinction="")
+
+
+def final_mean(config, rabbits, foxes, method, runs=40):
+    finals = [run_well_mixed(replace(config, seed=seed), rabbits, foxes, method=method).get_summary()
+              for seed in range(runs)]
+    return np.mean([row["final_rabbits"] for row in finals]), np.mean([row["final_foxes"] for row in finals])
+
+
+def test_unknown_method(baseline):
+    with pytest.raises(ValueError):
+        run_well_mixed(baseline, 10, 10, method="euler")
+
+
+@pytest.mark.parametrize("method", ["ssa", "tau"])
+def test_same_seed_same_run(baseline, method):
+    first = run_well_mixed(baseline, 50, 10, method=method).to_frame()
+    assert first.equals(run_well_mixed(baseline, 50, 10, method=method).to_frame())
+    assert len(first) == baseline.duration // baseline.record_interval + 1
+
+
+@pytest.mark.parametrize("method", ["ssa", "tau"])
+def test_birth_and_death_rates(baseline, method):
+    # without the other species the populations grow and decay exponentially
+    rabbits, _ = final_mean(baseline, 100, 0, method)
+    assert rabbits == pytest.approx(100 * math.exp(baseline.rabbit_reproduction_prob * 100), rel=0.05)
+    _, foxes = final_mean(baseline, 0, 100, method)
+    assert foxes == pytest.approx(100 * math.exp(-baseline.fox_death_prob * 100), rel=0.05)
+
+
+def test_hunting_propensity(baseline):
+    model = WellMixedModel(baseline)
+    state = np.array([50, 10, 0, 0, 0], dtype=float)
+    a = model.propensities(state)
+    assert a[RABBIT_BIRTH] == pytest.approx(baseline.rabbit_reproduction_prob * 50)
+    assert 0 < a[HUNT] < 10
+    # baseline foxes breed by catching
+    model.fire(state, HUNT, 3)
+    assert state[R] == 47 and state[F] == 13
+    # never more catches than rabbits
+    model.fire(state, HUNT, 100)
+    assert state[R] == 0 and state[F] == 60
+
+
+def test_default_stop_rule(baseline):
+    run = run_well_mixed(replace(baseline, stop_on_extinction="any"), 50, 0)
+    assert run.stop_reason == "extinction: fox"
+    assert len(run) == 1
+    assert run.get_summary()["stop_reason"] == "extinction: fox"
+
+
+def test_screen_runs_every_combination(baseline):
+    parameters = {"fox_death_prob": [0.005, 0.02], "rabbit_reproduction_prob": [0.005, 0.01, 0.02]}
+    results = screen(baseline, parameters, 50, 10, replicates=2)
+    assert len(results) == 12
+    assert set(map(tuple, results[list(parameters) + ["replicate"]].values.tolist())) == {
+        (d, r, replicate) for d in (0.005, 0.02) for r in (0.005, 0.01, 0.02) for replicate in (0, 1)}
+    assert {"steps_survived", "final_rabbits", "final_foxes"} <= set(results.columns)
@@ -0,0 +1,181 @@
+import random
+from operator import attrgetter
+import pytest
+from pygame.math import Vector2
+from spatial import SpatialHash, use_spatial_hash
+
+
+class Dot:
+    """The parts of an agent SpatialHash uses"""
+
+    def __init__(self, id, x, y, code=0, sex=0):
+        self.id = id
+        self.pos = Vector2(x, y)
+        self.code = code
+        self.sex = sex
+        self.dead = False
+
+    def alive(self):
+        return not self.dead
+
+    def __repr__(self):
+        return f"Dot({self.id})"
+
+
+def scatter(n, size=400, seed=0):
+    rng = random.Random(seed)
+    return [Dot(i, rng.uniform(0, size), rng.uniform(0, size), code=i % 2, sex=i // 2 % 2) for i in range(n)]
+
+
+def brute_force(agent, agents, radius):
+    return {other for other in agents
+            if other is not agent and agent.pos.distance_to(other.pos) <= radius}
+
+
+def test_accuracy_matches_brute_force():
+    agents = scatter(300)
+    grid = SpatialHash(agents, 30)
+    grid.update()
+    for agent in agents:
+        found = list(grid.in_proximity_accuracy(agent))
+        assert {other for other, _ in found} == brute_force(agent, agents, 30)
+        assert all(d == pytest.approx(agent.pos.distance_to(other.pos)) for other, d in found)
+
+
+def test_performance_is_a_superset():
+    agents = scatter(300, seed=1)
+    grid = SpatialHash(agents, 25)
+    grid.update()
+    for agent in agents:
+        nearby = set(grid.in_proximity_performance(agent))
+        assert agent not in nearby
+        assert brute_force(agent, agents, 25) <= nearby
+
+
+def test_dead_agents_see_nobody():
+    agents = scatter(50, size=50)
+    grid = SpatialHash(agents, 30)
+    grid.update()
+    agents[0].dead = True
+    assert list(grid.in_proximity_accuracy(agents[0])) == []
+    assert list(grid.in_proximity_performance(agents[0])) == []
+
+
+def test_update_follows_moves():
+    a, b = Dot(0, 10, 10), Dot(1, 300, 300)
+    grid = SpatialHash([a, b], 30)
+    grid.update()
+    assert list(grid.in_proximity_accuracy(a)) == []
+    b.pos.update(20, 10)
+    grid.update()
+    assert [other for other, _ in grid.in_proximity_accuracy(a)] == [b]
+
+
+def test_radius_change_resizes_the_grid():
+    agents = scatter(200, seed=2)
+    grid = SpatialHash(agents, 20)
+    grid._set_radius(45)
+    grid.update()
+    assert grid.chunk_size == 45
+    for agent in agents[:50]:
+        assert {other for other, _ in grid.in_proximity_accuracy(agent)} == brute_force(agent, agents, 45)
+
+
+def test_use_spatial_hash_swaps_the_provider():
+    class Config:
+        radius = 30
+
+    class Simulation:
+        config = Config()
+        _agents = []
+        _proximity = None
+
+    simulation = use_spatial_hash(Simulation())
+    assert isinstance(simulation._proximity, SpatialHash)
+    assert simulation._proximity.radius == 30
+
+
+def partitioned(agents, radius=30):
+    grid = SpatialHash(agents, radius, partition=attrgetter("code", "sex"))
+    grid.update()
+    return grid
+
+
+def test_partitions_only_return_their_agents():
+    agents = scatter(300, seed=3)
+    grid = partitioned(agents)
+    for agent in agents:
+        found = {other for other, _ in grid.in_partitions(agent, [(1, 0)])}
+        expected = {other for other in brute_force(agent, agents, 30) if (other.code, other.sex) == (1, 0)}
+        assert found == expected
+
+
+def test_single_partition_keeps_the_unpartitioned_order():
+    # one partition gives what the plain grid gives, in the same order, minus the rest
+    agents = scatter(300, seed=4)
+    plain = SpatialHash(agents, 30)
+    plain.update()
+    grid = partitioned(agents)
+    for agent in agents:
+        expected = [other for other, _ in plain.in_proximity_accuracy(agent) if (other.code, other.sex) == (0, 1)]
+        assert [other for other, _ in grid.in_partitions(agent, [(0, 1)])] == expected
+
+
+def test_partitioned_grid_still_answers_unfiltered_queries():
+    agents = scatter(200, seed=5)
+    grid = partitioned(agents)
+    for agent in agents:
+        assert {other for other, _ in grid.in_proximity_accuracy(agent)} == brute_force(agent, agents, 30)
+        assert brute_force(agent, agents, 30) <= set(grid.in_proximity_performance(agent))
+
+
+def test_missing_partition_is_empty():
+    agents = [Dot(0, 10, 10), Dot(1, 12, 10)]
+    grid = partitioned(agents)
+    assert list(grid.in_partitions(agents[0], [(5, 5)])) == []
+
+
+@pytest.mark.parametrize("radius", [10, 30, 75])
+def test_within_takes_any_radius(radius):
+    # smaller and larger than the cell size
+    agents = scatter(300, seed=6)
+    grid = SpatialHash(agents, 30)
+    grid.update()
+    for agent in agents:
+        assert {other for other, _ in grid.within(agent, radius)} == brute_force(agent, agents, radius)
+
+
+def test_first_within():
+    agents = scatter(300, seed=8)
+    grid = partitioned(agents)
+    for agent in agents:
+        first = grid.first_within(agent, 40, [(1, 1)])
+        candidates = [other for other, _ in grid.within(agent, 40, [(1, 1)])]
+        assert first is (candidates[0] if candidates else None)
+    assert grid.first_within(Dot(999, -500, -500), 40) is None
+
+
+def test_nearest():
+    agents = scatter(300, seed=9)
+    grid = SpatialHash(agents, 30)
+    grid.update()
+    for agent in agents:
+        nearest = grid.nearest(agent, 3, 50)
+        expected = sorted(brute_force(agent, agents, 50), key=lambda other: agent.pos.distance_to(other.pos))[:3]
+        assert [other for other, _ in nearest] == expected
+        distances = [d for _, d in nearest]
+        assert distances == sorted(distances)
+
+
+@pytest.mark.parametrize("partition", [None, attrgetter("code")])
+def test_discard(partition):
+    agents = scatter(100, size=60, seed=10)
+    grid = SpatialHash(agents, 30, partition=partition)
+    grid.update()
+    killed = agents[1]
+    grid.discard(killed)
+    assert all(killed not in {other for other, _ in grid.within(agent, 100)} for agent in agents)
+    # discarding twice, or an agent born after the last update, does nothing
+    grid.discard(killed)
+    grid.discard(Dot(500, 5, 5, code=7))
+    assert len({other for other, _ in grid.within(agents[0], 100)}) == len(agents) - 2
@@ -0,0 +1,91 @@
+from dataclasses import dataclass
+import pytest
+from stopping import StopCriteria
+
+
+@dataclass
+class Settings:
+    stop_on_extinction: str = "any"
+    max_population: int = 0
+    steady_state_window: int = 0
+    steady_state_tolerance: float = 0.05
+
+
+def counts(rabbits, foxes):
+    return {"rabbit": rabbits, "fox": foxes, "grass": 100}
+
+
+def test_default_rule():
+    criteria = StopCriteria(Settings())
+    assert criteria.default
+    assert criteria.check(counts(10, 5)) is None
+    assert criteria.check(counts(0, 5)) == "extinction: rabbit"
+    assert criteria.check(counts(0, 0)) == "extinction: rabbit, fox"
+
+
+def test_all_extinct():
+    criteria = StopCriteria(Settings(stop_on_extinction="all"))
+    assert not criteria.default
+    assert criteria.check(counts(0, 5)) is None
+    assert criteria.check(counts(0, 0)) == "extinction: all species"
+
+
+def test_never_on_extinction():
+    assert StopCriteria(Settings(stop_on_extinction="")).check(counts(0, 0)) is None
+
+
+def test_invalid_extinction_setting():
+    with pytest.raises(ValueError):
+        StopCriteria(Settings(stop_on_extinction="some"))
+
+
+def test_population_cap():
+    criteria = StopCriteria(Settings(max_population=100))
+    assert not criteria.default
+    assert criteria.check(counts(60, 40)) is None
+    assert criteria.check(counts(60, 41)) == "population cap: 101 > 100"
+
+
+def test_steady_state():
+    criteria = StopCriteria(Settings(steady_state_window=3, steady_state_tolerance=0.1))
+    assert not criteria.default
+    # the window has to fill first
+    assert criteria.check(counts(100, 20)) is None
+    assert criteria.check(counts(104, 20)) is None
+    assert criteria.check(counts(140, 20)) is None
+    assert criteria.check(counts(141, 20)) is None
+    assert criteria.check(counts(139, 21)) == "steady state over 3 records"
+
+
+def test_small_counts_use_a_spread_of_at_least_tolerance():
+    criteria = StopCriteria(Settings(stop_on_extinction="", steady_state_window=2, steady_state_tolerance=1))
+    criteria.check(counts(1, 0))
+    assert criteria.check(counts(2, 1)) == "steady state over 2 records"
+
+
+def rabbits_only(baseline, **settings):
+    config = baseline.replicate_config(seed=1)
+    config.duration = 200
+    for name, value in settings.items():
+        setattr(config, name, value)
+    simulation = baseline.LotkaVolterraSimulation(config)
+    simulation.batch_spawn_agents(20, baseline.Rabbit, images=["images/rabbit.png"])
+    simulation.run()
+    return simulation
+
+
+def test_run_stops_at_the_record_that_meets_the_criterion(model):
+    simulation = rabbits_only(model("baseline-model.py"))
+    assert simulation.tracker.stop_reason == "extinction: fox"
+    assert simulation.current_step == 0
+    assert len(simulation.tracker) == 1
+    assert "stop_reason" not in simulation.tracker.get_summary()
+
+
+def test_run_without_stop_criteria_lasts_its_duration(model):
+    simulation = rabbits_only(model("baseline-model.py"), stop_on_extinction="")
+    assert simulation.tracker.stop_reason == "duration"
+    # vi runs ticks 0 through duration
+    assert simulation.current_step == 201
+    assert len(simulation.tracker) == 41
+    assert simulation.tracker.get_summary()["stop_reason"] == "duration"
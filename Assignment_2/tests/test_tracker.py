@@ -0,0 +1,82 @@
+import pytest
+
+
+def lifecycle_energy(model, seed=3):
+    module = model("lifecycle+energy.py")
+    simulation = module.LotkaVolterraSimulation(module.replicate_config(seed))
+    simulation.batch_spawn_agents(100, module.Rabbit, images=["images/rabbit.png"])
+    simulation.batch_spawn_agents(20, module.Fox, images=["images/fox.png"])
+    simulation.grass.scatter(50)
+    return simulation
+
+
+def scan(simulation, species):
+    return [agent for agent in simulation._agents if agent.alive() and agent.species == species]
+
+
+def test_running_counts_match_a_scan(model):
+    simulation = lifecycle_energy(model)
+    tracker = simulation.tracker
+    for _ in range(300):
+        simulation.tick()
+        for species in ("rabbit", "fox"):
+            agents = scan(simulation, species)
+            assert tracker.counts[species] == len(agents)
+            assert tracker.age_sums[species] == sum(agent.age for agent in agents)
+            expected = sum(agent.age for agent in agents) / len(agents) if agents else 0
+            assert tracker.average_age(species) == pytest.approx(expected)
+    # births and deaths both happened, so the counts were kept through both
+    assert simulation.pool.created + simulation.pool.reused > 0
+    assert len(simulation.pool) > 0
+
+
+def test_recorded_rows_are_the_counts_at_the_start_of_the_tick(model):
+    simulation = lifecycle_energy(model, seed=4)
+    expected = []
+    for step in range(50):
+        if step % simulation.config.record_interval == 0:
+            rabbits = scan(simulation, "rabbit")
+            expected.append((len(rabbits), len(scan(simulation, "fox")), simulation.grass.total,
+                             sum(agent.age for agent in rabbits) / len(rabbits)))
+        simulation.tick()
+    frame = simulation.tracker.to_frame()
+    assert list(frame["step"]) == list(range(10))
+    assert list(zip(frame["rabbits"], frame["foxes"], frame["grass"])) == [row[:3] for row in expected]
+    assert list(frame["avg_rabbit_age"]) == pytest.approx([row[3] for row in expected])
+
+
+def test_lazy_energy_matches_the_per_tick_drain(model):
+    simulation = lifecycle_energy(model, seed=5)
+    tracker, scheduler = simulation.tracker, simulation.scheduler
+    for _ in range(200):
+        simulation.tick()
+        for species in ("rabbit", "fox"):
+            agents = scan(simulation, species)
+            expected = sum(agent.energy for agent in agents) / len(agents) if agents else 0
+            assert tracker.average_energy(species, scheduler.now) == pytest.approx(expected)
+            # nobody alive has run out: they starve the tick after their energy reaches 0
+            assert all(agent.energy >= 0 for agent in agents)
+
+
+def test_starvation_is_scheduled_for_the_tick_after_energy_runs_out(model):
+    simulation = lifecycle_energy(model, seed=6)
+    simulation.tick()
+    fox = scan(simulation, "fox")[0]
+    fox.energy = 3
+    energies = []
+    while fox.alive():
+        energies.append(fox.energy)
+        simulation.scheduler.advance()
+    assert energies == [3, 2, 1, 0]
+
+
+def test_energy_drain_can_be_switched_off(model):
+    simulation = lifecycle_energy(model, seed=7)
+    simulation.tick()
+    rabbit = scan(simulation, "rabbit")[0]
+    rabbit.energy = 2
+    rabbit.energy_drain = 0
+    for _ in range(5):
+        simulation.scheduler.advance()
+    assert rabbit.alive() and rabbit.energy == 2
+    assert simulation.tracker.energy_drains["rabbit"] == len(scan(simulation, "rabbit")) - 1
@@ -0,0 +1,401 @@
+from vi import Agent
+import numpy as np
+import pandas as pd
+from checkpoint import continue_file
+from species import FOOD
+
+
+class PopulationTracker:
+    """
+    Base class for the per-model population trackers
+
+    Keeps live per-species counts plus running age and energy sums.
+    TrackedAgent updates them on every birth, death and age/energy change,
+    so reading the current population never has to scan simulation._agents.
+
+    Recorded rows are stored column by column in preallocated NumPy arrays
+    (`columns` maps each column name to its dtype) that double in size when full.
+    `column(name)` and `to_frame()` hand out views of the filled part without copying.
+
+    After stream_to(path) the arrays become a fixed-size buffer instead: every full
+    chunk is appended to a CSV file and dropped from memory, so memory use no longer
+    grows with the duration of the run. A checkpoint only saves how much of that file
+    was written; the resumed run cuts it back to that size and appends from there.
+    """
+
+    def __init__(self, species=("rabbit", "fox"), columns=None, capacity=1024):
+        if columns is None:
+            columns = {'step': np.int64, 'rabbits': np.int64, 'foxes': np.int64}
+        self.columns = {name: np.empty(capacity, dtype=dtype) for name, dtype in columns.items()}
+        self.rows = 0
+        self.step = 0
+        self.summary = {}
+        self.stop_reason = None
+        # streaming state, see stream_to
+        self.stream_path = None
+        self._stream = None
+        self._stream_size = 0  # bytes written to the stream file, header included
+        self._flushed_rows = 0
+        self._flushed_min = {}
+        self._flushed_max = {}
+        self._flushed_last = {}
+        self.counts = dict.fromkeys(species, 0)
+        self.age_sums = dict.fromkeys(species, 0)
+        # energies drain lazily (see TrackedAgent.energy), so these hold each agent's energy
+        # at tick 0 of its current drain, and the total drain per tick
+        self.energy_sums = dict.fromkeys(species, 0)
+        self.energy_drains = dict.fromkeys(species, 0)
+
+    def __len__(self):
+        return self._flushed_rows + self.rows
+
+    def append(self, row):
+        """Store one record (a dict with a value for every column)"""
+        if self.rows == len(self.columns['step']):
+            if self.stream_path is not None:
+                self.flush()
+            else:
+                for name, values in self.columns.items():
+                    grown = np.empty(2 * len(values), dtype=values.dtype)
+                    grown[:self.rows] = values
+                    self.columns[name] = grown
+        for name, values in self.columns.items():
+            values[self.rows] = row[name]
+        self.rows += 1
+
+    def column(self, name):
+        """The values of one column still in memory (a view, not a copy)"""
+        return self.columns[name][:self.rows]
+
+    def to_frame(self):
+        """
+        All recorded rows as a DataFrame
+
+        Without streaming it is backed by the column arrays, otherwise the rows
+        already written are read back from the stream file.
+        """
+        buffered = pd.DataFrame({name: self.column(name) for name in self.columns}, copy=False)
+        if self._flushed_rows == 0:
+            return buffered
+        written = pd.read_csv(self.stream_path)
+        return pd.concat([written, buffered], ignore_index=True) if self.rows else written
+
+    def stream_to(self, path, chunk_size=1000):
+        """
+        Write recorded rows to a CSV file at `path`, chunk_size rows at a time
+
+        Call before the first record. Each chunk is flushed to disk as soon as it is
+        written, so if the process dies the file still holds every complete chunk.
+        The file is only created at the first flush, so a run resumed from a checkpoint
+        can still continue the file of the run it was taken from.
+        """
+        self.stream_path = path
+        self.columns = {name: np.empty(chunk_size, dtype=values.dtype)
+                        for name, values in self.columns.items()}
+        self.rows = 0
+
+    def _open_stream(self):
+        if self._stream_size:
+            # after close() or set_state(): carry on where the file ends
+            self._stream = open(self.stream_path, "a", newline="")
+            return
+        self._stream = open(self.stream_path, "w", newline="")
+        self._stream.write(",".join(self.columns) + "\n")
+        self._stream.flush()
+        self._stream_size = self._stream.tell()
+
+    def flush(self):
+        """Append the buffered rows to the stream file and empty the buffer"""
+        if self.stream_path is None or self.rows == 0:
+            return
+        if self._stream is None:
+            self._open_stream()
+        for name in self.columns:
+            values = self.column(name)
+            low, high = values.min(), values.max()
+            self._flushed_min[name] = min(self._flushed_min.get(name, low), low)
+            self._flushed_max[name] = max(self._flushed_max.get(name, high), high)
+            self._flushed_last[name] = values[-1]
+        pd.DataFrame({name: self.column(name) for name in self.columns}, copy=False).to_csv(
+            self._stream, header=False, index=False)
+        self._stream.flush()
+        self._stream_size = self._stream.tell()
+        self._flushed_rows += self.rows
+        self.rows = 0
+
+    def close(self):
+        """Write the last partial chunk and close the stream file"""
+        if self.stream_path is not None:
+            if self._stream is None:
+                # a run too short to fill a chunk still leaves a file with its header
+                self._open_stream()
+            self.flush()
+            self._stream.close()
+            self._stream = None
+
+    def get_state(self):
+        """
+        The recorded rows and running sums, for checkpoints
+
+        Rows already streamed stay in the stream file: only its path and size are saved.
+        """
+        return {
+            "columns": {name: values.copy() for name, values in self.columns.items()},
+            "rows": self.rows,
+            "step": self.step,
+            "stop_reason": self.stop_reason,
+            "stream_path": self.stream_path,
+            "stream_size": self._stream_size,
+            "flushed_rows": self._flushed_rows,
+            "flushed_min": dict(self._flushed_min),
+            "flushed_max": dict(self._flushed_max),
+            "flushed_last": dict(self._flushed_last),
+            "counts": dict(self.counts),
+            "age_sums": dict(self.age_sums),
+            "energy_sums": dict(self.energy_sums),
+            "energy_drains": dict(self.energy_drains),
+        }
+
+    def set_state(self, state):
+        """
+        Continue from get_state(). A streamed run must be resumed streaming (to any path)
+
+        The checkpointed run's stream file is cut back to the size it had at the
+        checkpoint, or that part of it is copied when resuming to another path.
+        """
+        if (state["stream_path"] is None) != (self.stream_path is None):
+            raise ValueError("resume with output_path set if and only if the checkpointed run had one")
+        self.columns = {name: values.copy() for name, values in state["columns"].items()}
+        self.rows = state["rows"]
+        self.step = state["step"]
+        self.stop_reason = state["stop_reason"]
+        if state["stream_size"]:
+            continue_file(state["stream_path"], state["stream_size"], self.stream_path)
+        self._stream_size = state["stream_size"]
+        self._flushed_rows = state["flushed_rows"]
+        self._flushed_min = dict(state["flushed_min"])
+        self._flushed_max = dict(state["flushed_max"])
+        self._flushed_last = dict(state["flushed_last"])
+        self.counts = dict(state["counts"])
+        self.age_sums = dict(state["age_sums"])
+        self.energy_sums = dict(state["energy_sums"])
+        self.energy_drains = dict(state["energy_drains"])
+
+    def final(self, name):
+        if self.rows:
+            return self.column(name)[-1].item()
+        return self._flushed_last[name].item()
+
+    def minimum(self, name):
+        values = self.column(name)
+        low = values.min() if self.rows else self._flushed_min[name]
+        return min(self._flushed_min.get(name, low), low).item()
+
+    def maximum(self, name):
+        values = self.column(name)
+        high = values.max() if self.rows else self._flushed_max[name]
+        return max(self._flushed_max.get(name, high), high).item()
+
+    def born(self, agent):
+        """Count a newly spawned or reproduced agent"""
+        species = agent.species
+        self.counts[species] += 1
+        self.age_sums[species] += agent.age
+        self.energy_sums[species] += agent._energy
+        self.energy_drains[species] += agent._energy_drain
+
+    def died(self, agent):
+        """Remove a killed agent from the counts"""
+        species = agent.species
+        self.counts[species] -= 1
+        self.age_sums[species] -= agent.age
+        self.energy_sums[species] -= agent._energy
+        self.energy_drains[species] -= agent._energy_drain
+
+    def average_age(self, species):
+        count = self.counts[species]
+        return self.age_sums[species] / count if count else 0
+
+    def average_energy(self, species, now=0):
+        """Mean energy of a species at tick `now` (only matters when energy drains)"""
+        count = self.counts[species]
+        return (self.energy_sums[species] - now * self.energy_drains[species]) / count if count else 0
+
+    def create_summary(self, stop_reason=True):
+        """
+        Summarise the recorded run: length, final/max/min population sizes and, unless
+        stop_reason is False, why it stopped
+        """
+        self.summary["steps_survived"] = len(self)
+        self.summary["final_rabbits"] = self.final('rabbits')
+        self.summary["final_foxes"] = self.final('foxes')
+        self.summary["max_rabbits"] = self.maximum('rabbits')
+        self.summary["max_foxes"] = self.maximum('foxes')
+        self.summary["min_rabbits"] = self.minimum('rabbits')
+        self.summary["min_foxes"] = self.minimum('foxes')
+        if stop_reason:
+            self.summary["stop_reason"] = self.stop_reason
+
+    def get_summary(self):
+        return self.summary
+
+
+class TrackedAgent(Agent):
+    """
+    Agent that reports its birth, death, age and energy to the simulation's tracker
+
+    Subclasses set `species` and `code` as class attributes. `age` and `energy` are properties,
+    so plain assignments like `self.age += 1` keep the tracker's running sums in sync.
+    Random draws go through `self.random`, the simulation's BlockRandom, and neighbour
+    queries for a species (or species and sex) through neighbours(), first_neighbour()
+    and nearest_neighbours(), which take their own radius and need the simulation's
+    SpatialHash to be partitioned.
+
+    Hunts, feeding and matings go through the simulation's InteractionResolver:
+    intend() runs for every agent before anyone moves and declares what the agent
+    is after, and the resolver applies the outcomes once all agents have moved.
+
+    Energy is not decremented every tick. With energy_drain set, the agent loses that
+    much energy per tick and `energy` is worked out from the tick it was last set at
+    when it is read. Running out is a starve() call scheduled for the tick after the
+    one the energy reaches 0 in, and moved every time the energy changes.
+
+    Per-life state (sex, age, energy, first scheduled events) is set in reset(), which
+    runs for a newly built agent and for a dead one the simulation's AgentPool hands
+    out again as offspring. Events go through schedule() / schedule_at(), which keep
+    one pending event per callback and cancel them all when the agent is killed.
+    """
+
+    species = None
+    code = None  # species code from species.py, for cheap comparisons in neighbour loops
+    # per-life attributes reset() sets besides age and energy, saved with the agent by checkpoint.py
+    snapshot_attributes = ()
+
+    def __init__(self, images, simulation, pos=None, move=None):
+        self._age = 0
+        # energy + energy_drain * tick, constant while the agent only drains
+        self._energy = 0
+        self._energy_drain = 0
+        self._events = {}
+        self._counted = False
+        super().__init__(images, simulation, pos, move)
+        self.tracker = simulation.tracker
+        self.random = simulation.random
+        self.scheduler = simulation.scheduler
+        self.pool = simulation.pool
+        self.proximity = simulation._proximity
+        self.interactions = simulation.interactions
+        # what this species feeds on (species.FOOD), None if the simulation doesn't have it
+        self.food = getattr(simulation, FOOD[self.code]) if FOOD[self.code] else None
+        self.tracker.born(self)
+        self._counted = True
+        self.reset()
+
+    def reset(self):
+        """Set up the state of a new life (age, energy and so on start at 0)"""
+
+    def intend(self):
+        """Declare this tick's hunt, feeding or mating intents (positions are the start of tick ones)"""
+
+    def respawn(self, simulation, pos, move):
+        """Bring a killed agent back as a new one at pos, heading along move"""
+        self.add(simulation._all, simulation._agents)
+        self.id = simulation._agent_id()
+        self.pos = pos.copy()
+        self.move = move.copy()
+        self._age = self._energy = self._energy_drain = 0
+        self.tracker.born(self)
+        self._counted = True
+        self.reset()
+
+    def reproduce(self):
+        return self.pool.spawn(self)
+
+    def neighbours(self, *parts, radius=None):
+        """
+        (agent, distance) pairs within radius (Config.radius by default) from the given
+        partitions of the simulation's SpatialHash, or from everyone without parts
+        """
+        return self.proximity.within(self, self.proximity.radius if radius is None else radius, parts or None)
+
+    def first_neighbour(self, *parts, radius=None):
+        """The first neighbour within radius that neighbours() would give, or None, without looking further"""
+        return self.proximity.first_within(self, self.proximity.radius if radius is None else radius, parts or None)
+
+    def nearest_neighbours(self, k, *parts, radius=None):
+        """The k nearest (agent, distance) pairs within radius, nearest first"""
+        return self.proximity.nearest(self, k, self.proximity.radius if radius is None else radius, parts or None)
+
+    def schedule(self, p, callback):
+        """Schedule a per-tick chance p of callback, replacing the one already pending"""
+        if not self._counted:
+            # killed earlier this tick but still finishing its turn: nothing more happens to it
+            return None
+        self.scheduler.cancel(self._events.get(callback.__name__))
+        self._events[callback.__name__] = event = self.scheduler.schedule(p, callback)
+        return event
+
+    def schedule_at(self, tick, callback):
+        if not self._counted:
+            return None
+        self.scheduler.cancel(self._events.get(callback.__name__))
+        self._events[callback.__name__] = event = self.scheduler.schedule_at(tick, callback)
+        return event
+
+    @property
+    def age(self):
+        return self._age
+
+    @age.setter
+    def age(self, value):
+        if self._counted:
+            self.tracker.age_sums[self.species] += value - self._age
+        self._age = value
+
+    @property
+    def energy(self):
+        return self._energy - self._energy_drain * self.scheduler.now
+
+    @energy.setter
+    def energy(self, value):
+        drain = self._energy_drain
+        offset = value + drain * self.scheduler.now
+        if self._counted:
+            self.tracker.energy_sums[self.species] += offset - self._energy
+        self._energy = offset
+
+        if drain:
+            # energy is 0 or less after the tick offset / drain, rounded up
+            self.schedule_at(-(-offset // drain) + 1, self.starve)
+
+    @property
+    def energy_drain(self):
+        return self._energy_drain
+
+    @energy_drain.setter
+    def energy_drain(self, rate):
+        energy = self.energy
+        if self._counted:
+            self.tracker.energy_drains[self.species] += rate - self._energy_drain
+        self._energy_drain = rate
+        if not rate:
+            self.scheduler.cancel(self._events.pop("starve", None))
+        # re-anchor at the current tick with the new rate
+        self.energy = energy
+
+    def starve(self):
+        """Called when the agent runs out of energy"""
+        self.kill()
+
+    def kill(self):
+        # an agent can be killed twice in one tick (e.g. two foxes catching the same rabbit)
+        if self._counted:
+            self._counted = False
+            self.tracker.died(self)
+            for event in self._events.values():
+                self.scheduler.cancel(event)
+            self._events.clear()
+            super().kill()
+            # later neighbour queries this tick no longer find it
+            self.proximity.discard(self)
+            self.pool.release(self)
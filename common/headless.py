@@ -0,0 +1,84 @@
+from vi import HeadlessSimulation, Simulation
+import pygame as pg
+import struct
+
+
+def _image_size(path):
+    """Width and height of an image, read from the PNG header without decoding the pixels"""
+    with open(path, "rb") as f:
+        header = f.read(24)
+    if header[:8] == b"\x89PNG\r\n\x1a\n":
+        return struct.unpack(">II", header[16:24])
+    return pg.image.load(path).get_size()
+
+
+class HeadlessCapableSimulation(Simulation):
+    """
+    Simulation that can also run without a window (config.headless = True)
+
+    In headless mode no display is created, sprite images are never decoded
+    (agents get a blank surface of the same size, so spawn positions match a windowed
+    run with the same seed), replay/metrics collection is skipped and ticks run as
+    fast as possible instead of being paced to fps_limit.
+    Agent logic and proximity updates are unchanged.
+
+    Simulations whose agents collide through their image masks (the boids and obstacles
+    of Assignment_0) set blank_images = False: images are then still decoded, just never
+    converted for a display.
+
+    Every assignment imports this class through its own headless.py.
+    """
+
+    blank_images = True
+    _blank_images = {}
+
+    def __init__(self, config):
+        if config.headless:
+            # skip Simulation.__init__, which opens the window and starts the clock
+            HeadlessSimulation.__init__(self, config)
+        else:
+            super().__init__(config)
+
+    def _load_image(self, path):
+        if not self.config.headless:
+            return super()._load_image(path)
+        if not self.blank_images:
+            # Simulation's convert_alpha() needs a display
+            return HeadlessSimulation._load_image(self, path)
+        blank = self._blank_images.get(path)
+        if blank is None:
+            blank = self._blank_images[path] = pg.Surface(_image_size(path))
+        return blank
+
+    def before_update(self):
+        if not self.config.headless:
+            super().before_update()
+
+    def after_update(self):
+        # drawing, display flip and frame pacing
+        if not self.config.headless:
+            super().after_update()
+
+    def tick(self):
+        if not self.config.headless:
+            super().tick()
+            return
+
+        # Same order as vi's tick, minus replay data and metrics collection
+        self.before_update()
+
+        for agent in self._agents.sprites():
+            agent.change_position()
+
+        self._proximity._set_radius(self.config.radius)
+        self._proximity.update()
+
+        self._all.update()
+
+        self.after_update()
+
+        if self.config.duration > 0 and self.shared.counter == self.config.duration:
+            self.stop()
+            return
+
+        self.shared.counter += 1